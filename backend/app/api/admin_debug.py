@@ -0,0 +1,110 @@
+import os
+import tracemalloc
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Scope
+
+from ..db import get_db
+from ..utils import profiling
+from .auth import get_current_principal
+from .publications import require_admin
+
+router = APIRouter(
+    prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+def _check_admin(request: Request) -> None:
+    get_session = request.app.dependency_overrides.get(get_db, get_db)
+    sessions = get_session()
+    db = next(sessions)
+    try:
+        require_admin(get_current_principal(request.headers.get("authorization"), db))
+    finally:
+        sessions.close()
+
+
+async def authorize_profiling(scope: Scope) -> None:
+    """Solo los admins (mismas reglas que require_admin) pueden perfilar pedidos."""
+    await run_in_threadpool(_check_admin, Request(scope))
+
+
+@router.get("/profiles")
+def list_profiles():
+    """Perfiles guardados por ProfilingMiddleware, del más nuevo al más viejo."""
+    return {"profiles": profiling.saved_profiles()}
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str):
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    media_type = "text/plain" if path.endswith(".collapsed") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+
+# tracemalloc solo corre entre start y stop: trazar cada asignación hace
+# todo más lento y usa memoria, así que no se deja prendido
+_baseline: Optional[tracemalloc.Snapshot] = None
+
+
+@router.post("/tracemalloc/start")
+def start_tracemalloc(frames: int = Query(1, ge=1, le=50)):
+    global _baseline
+    if tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="tracemalloc ya está activo")
+    tracemalloc.start(frames)
+    _baseline = tracemalloc.take_snapshot()
+    return {"tracing": True, "frames": frames}
+
+
+@router.get("/tracemalloc")
+def tracemalloc_snapshot(
+    limit: int = Query(20, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    since_start: bool = False,
+):
+    """
+    Sitios que más memoria asignaron (y siguen vivos). Con
+    ``since_start=true``, lo que creció desde que se activó tracemalloc.
+    """
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="tracemalloc no está activo")
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+    if since_start and _baseline is not None:
+        stats = snapshot.compare_to(_baseline, group_by)
+    else:
+        stats = snapshot.statistics(group_by)
+
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "traced_kib": round(current / 1024, 1),
+        "peak_kib": round(peak / 1024, 1),
+        "top": [_stat_out(stat) for stat in stats[:limit]],
+    }
+
+
+def _stat_out(stat) -> dict:
+    out = {
+        "site": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        "size_kib": round(stat.size / 1024, 1),
+        "count": stat.count,
+    }
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        out["size_diff_kib"] = round(stat.size_diff / 1024, 1)
+        out["count_diff"] = stat.count_diff
+    return out
+
+
+@router.post("/tracemalloc/stop")
+def stop_tracemalloc():
+    global _baseline
+    tracemalloc.stop()
+    _baseline = None
+    return {"tracing": False}
@@ -1,82 +1,108 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from ..db import get_db
-from .. import models, security, schemas
+from .. import models, points_ledger, security, schemas
 from ..models import User
+from ..utils import principal_cache, rate_limit
+from ..utils.principal_cache import Principal
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 
-def award_invitation_points(inviter_id: int, invited_username: str, db: Session):
-    """Otorga 50 puntos al usuario que invitó por invitación exitosa."""
-    user_points = (
-        db.query(models.UserPoints)
-        .filter(models.UserPoints.user_id == inviter_id)
-        .first()
-    )
-
-    if not user_points:
-        user_points = models.UserPoints(user_id=inviter_id, total_points=0)
-        db.add(user_points)
-        db.flush()
-
-    user_points.total_points += 50
-    transaction = models.PointsTransaction(
+def award_invitation_points(
+    inviter_id: int,
+    invited_username: str,
+    db: Session,
+    invitation_id: Optional[int] = None,
+):
+    """
+    Otorga 50 puntos al usuario que invitó por invitación exitosa.
+    No hace commit: se confirma junto con el registro del invitado.
+    """
+    points_ledger.record_movement(
+        db,
         user_id=inviter_id,
         points=50,
         transaction_type="invitation_bonus",
         description=f"Invitación exitosa de {invited_username}",
+        reference_id=invitation_id,
+        idempotency_key=(
+            f"invitation_bonus:{invitation_id}" if invitation_id is not None else None
+        ),
     )
 
-    db.add(transaction)
-    db.commit()
-
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
-def get_current_user(
+def _principal_from_claims(data: dict, db: Session) -> Optional[Principal]:
+    user_id = int(data["sub"])
+    issued_at = int(data.get("iat") or 0)
+
+    principal = principal_cache.get(user_id, issued_at)
+    if principal is not None:
+        return principal
+
+    row = (
+        db.query(models.User.id, models.User.username, models.User.role)
+        .filter(models.User.id == user_id)
+        .first()
+    )
+    if not row:
+        return None
+    principal = Principal(id=row.id, username=row.username, role=row.role)
+    principal_cache.put(user_id, issued_at, principal)
+    return principal
+
+
+def get_current_principal(
     authorization: str | None = Header(default=None), db: Session = Depends(get_db)
-) -> models.User:
-    print(f"[DEBUG] get_current_user: authorization={authorization}")
+) -> Principal:
+    """
+    Usuario autenticado en su forma liviana (id, username, role).
+    Usa la caché de principals, así que no consulta la DB en cada request.
+    """
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Token faltante")
     token = authorization.split()[1]
     data = security.decode_token(token)
-    print(f"[DEBUG] token decoded: {data}")
     if not data:
         raise HTTPException(status_code=401, detail="Token inválido")
-
-    user_id = data.get("sub")
-    if user_id is None:
+    if data.get("sub") is None:
         raise HTTPException(status_code=401, detail="Token inválido (no sub)")
 
-    user = db.query(models.User).get(int(user_id))
+    principal = _principal_from_claims(data, db)
+    if not principal:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return principal
+
+
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+) -> models.User:
+    """Usuario autenticado como entidad ORM (para endpoints que lo modifican)."""
+    user = db.get(models.User, principal.id)
     if not user:
+        principal_cache.invalidate_user(principal.id)
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return user
 
 
 def get_optional_user(
     authorization: Optional[str] = Header(None), db: Session = Depends(get_db)
-) -> Optional[models.User]:
+) -> Optional[Principal]:
     """Obtiene el usuario si está autenticado, sino devuelve None"""
     if not authorization or not authorization.lower().startswith("bearer "):
         return None
     try:
-        from ..security import decode_token
-
         token = authorization.split()[1]
-        data = decode_token(token)
-        if not data:
-            return None
-        user_id = data.get("sub")
-        if user_id is None:
+        data = security.decode_token(token)
+        if not data or data.get("sub") is None:
             return None
-        user = db.query(models.User).get(int(user_id))
-        return user
+        return _principal_from_claims(data, db)
     except Exception:
         return None
 
@@ -112,13 +138,14 @@ def register(payload: schemas.UserCreate, db: Session = Depends(get_db)):
                 detail="El código de invitación no corresponde a este email.",
             )
 
-    hashed_answer_1 = security.hash_password(payload.security_answer_1)
-    hashed_answer_2 = security.hash_password(payload.security_answer_2)
+    hashed_password, hashed_answer_1, hashed_answer_2 = security.hash_passwords(
+        payload.password, payload.security_answer_1, payload.security_answer_2
+    )
 
     user = models.User(
         email=payload.email,
         username=payload.username,
-        hashed_password=security.hash_password(payload.password),
+        hashed_password=hashed_password,
         first_name=getattr(payload, "first_name", None),
         last_name=getattr(payload, "last_name", None),
         birth_date=getattr(payload, "birth_date", None),
@@ -136,7 +163,9 @@ def register(payload: schemas.UserCreate, db: Session = Depends(get_db)):
         invitation.used = True
         invitation.used_at = datetime.now(timezone.utc)
         invitation.invited_user_id = user.id
-        award_invitation_points(invitation.inviter_id, user.username, db)
+        award_invitation_points(
+            invitation.inviter_id, user.username, db, invitation_id=invitation.id
+        )
 
     db.commit()
     db.refresh(user)
@@ -144,7 +173,10 @@ def register(payload: schemas.UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(payload: schemas.UserLogin, db: Session = Depends(get_db)):
+def login(
+    payload: schemas.UserLogin, request: Request, db: Session = Depends(get_db)
+):
+    rate_limit.check_auth_attempt("login", request, payload.identifier)
     user = (
         db.query(models.User)
         .filter(
@@ -162,11 +194,18 @@ def login(payload: schemas.UserLogin, db: Session = Depends(get_db)):
             detail="Usuario no registrado. Por favor crea una cuenta.",
         )
 
-    if not security.verify_password(payload.password, user.hashed_password):
+    is_valid, new_hash = security.verify_and_update_password(
+        payload.password, user.hashed_password
+    )
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Contraseña o usuario incorrecta.",
         )
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+    rate_limit.reset_auth_identifier("login", payload.identifier)
 
     token_data = {"sub": str(user.id), "email": user.email, "username": user.username}
     token = security.create_access_token(token_data)
@@ -191,6 +230,7 @@ def update_me(
     user.travel_preferences = payload.travel_preferences
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
     return user
 
@@ -217,14 +257,18 @@ def change_password(
 
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.id)
 
     return {"message": "Contraseña actualizada con éxito"}
 
 
 @router.post("/forgot-password/get-questions", response_model=schemas.QuestionsOut)
 def get_security_questions(
-    payload: schemas.RequestQuestions, db: Session = Depends(get_db)
+    payload: schemas.RequestQuestions,
+    request: Request,
+    db: Session = Depends(get_db),
 ):
+    rate_limit.check_auth_attempt("forgot-questions", request, payload.identifier)
     user = (
         db.query(models.User)
         .filter(
@@ -251,8 +295,11 @@ def get_security_questions(
 
 @router.post("/forgot-password/verify-answers", response_model=schemas.Token)
 def verify_security_answers(
-    payload: schemas.VerifyAnswers, db: Session = Depends(get_db)
+    payload: schemas.VerifyAnswers,
+    request: Request,
+    db: Session = Depends(get_db),
 ):
+    rate_limit.check_auth_attempt("forgot-answers", request, payload.identifier)
     user = (
         db.query(models.User)
         .filter(
@@ -267,11 +314,9 @@ def verify_security_answers(
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado.")
 
-    is_answer_1_correct = security.verify_password(
-        payload.security_answer_1, user.hashed_answer_1
-    )
-    is_answer_2_correct = security.verify_password(
-        payload.security_answer_2, user.hashed_answer_2
+    is_answer_1_correct, is_answer_2_correct = security.verify_passwords(
+        (payload.security_answer_1, user.hashed_answer_1),
+        (payload.security_answer_2, user.hashed_answer_2),
     )
     if not is_answer_1_correct or not is_answer_2_correct:
         raise HTTPException(
@@ -316,11 +361,20 @@ def set_new_password_with_token(
     user.hashed_password = security.hash_password(payload.new_password)
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.id)
 
     return {"message": "Contraseña actualizada con éxito."}
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
     return current_user
+
+
+@router.get("/rate-limits", response_model=dict)
+def rate_limit_stats(_: Principal = Depends(require_admin)):
+    """Contadores de intentos permitidos/bloqueados por endpoint (solo admin)."""
+    return rate_limit.auth_limiter.stats()
@@ -1,26 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import func, select
 from typing import List
-from ..db import get_db
+from ..db import get_db, get_read_db, insert_ignore
 from .. import models
-from .auth import get_current_user
+from .auth import get_current_principal
+from ..utils import catalog_cache
+from ..utils.principal_cache import Principal
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
 
 @router.get("", response_model=List[str])
-def list_categories(db: Session = Depends(get_db)):
+def list_categories(request: Request, db: Session = Depends(get_read_db)):
     """
     Devuelve todos los slugs de categorías existentes (orden alfabético).
+    Cacheado por versión del catálogo, con ETag.
     """
-    rows = db.execute(
-        text("SELECT slug FROM categories ORDER BY slug COLLATE NOCASE ASC")
-    ).fetchall()
-    return [r[0] for r in rows]
 
+    def _build():
+        return list(
+            db.execute(
+                select(models.Category.slug).order_by(func.lower(models.Category.slug))
+            ).scalars()
+        )
+
+    entry = catalog_cache.get_or_build(db, "categories", (), _build)
+    return catalog_cache.json_response(request, entry.etag, body=entry.body)
 
-def require_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+
+def require_admin(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if not (current_user.role == "admin" or current_user.username == "admin"):
         raise HTTPException(status_code=403, detail="Solo administradores")
     return current_user
@@ -30,21 +41,20 @@ def require_admin(current_user: models.User = Depends(get_current_user)) -> mode
 def seed_categories(
     payload: dict,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """
     Crea categorías por slugs (ignora duplicados).
     Body: {"slugs": ["aventura","cultura","gastronomia"]}
     """
     slugs = payload.get("slugs", []) or []
-    inserted = 0
+    rows = []
     for s in slugs:
         s = (s or "").strip().lower()
-        if not s:
-            continue
-        db.execute(
-            text("INSERT OR IGNORE INTO categories (slug) VALUES (:slug)"), {"slug": s}
-        )
-        inserted += 1
+        if s:
+            rows.append({"slug": s, "name": s.capitalize()})
+    if rows:
+        db.execute(insert_ignore(db, models.Category.__table__, ["slug"]), rows)
+    inserted = len(rows)
     db.commit()
     return {"ok": True, "inserted": inserted, "count_submitted": len(slugs)}
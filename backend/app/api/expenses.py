@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from ..db import get_db
+from ..db import get_db, get_read_db
 from .auth import get_current_user
 from .. import models, schemas
 
@@ -28,7 +28,7 @@ def create_expense(
 
 
 @router.get("", response_model=list[schemas.ExpenseOut])
-def get_my_expenses(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def get_my_expenses(db: Session = Depends(get_read_db), user=Depends(get_current_user)):
     expenses = db.query(models.Expense).filter_by(user_id=user.id).all()
     return [schemas.ExpenseOut.model_validate(e.__dict__) for e in expenses]
 
@@ -1,4 +1,11 @@
+import time
+
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..db import engine, read_engine
 
 router = APIRouter(prefix="/api", tags=["health"])
 
@@ -6,3 +13,36 @@ router = APIRouter(prefix="/api", tags=["health"])
 @router.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@router.get("/health/ready")
+def readiness():
+    """
+    Readiness: el proceso responde y llega a la base (y a la réplica de
+    lectura, si hay). Devuelve cuánto tardó un ``SELECT 1`` en cada una;
+    503 si alguna falla, para que el balanceador saque al worker.
+    """
+    engines = {"db": engine}
+    if read_engine is not engine:
+        engines["db_read"] = read_engine
+
+    checks = {}
+    ready = True
+    for name, eng in engines.items():
+        started = time.perf_counter()
+        try:
+            with eng.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except SQLAlchemyError as e:
+            ready = False
+            checks[name] = {"status": "error", "error": type(e).__name__}
+            continue
+        checks[name] = {
+            "status": "ok",
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    return ORJSONResponse(
+        {"status": "ok" if ready else "error", "checks": checks},
+        status_code=200 if ready else 503,
+    )
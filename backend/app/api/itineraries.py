@@ -2,14 +2,15 @@ from __future__ import annotations
 import os
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from ..db import get_db
+from ..db import get_db, get_read_db
 from .. import models, schemas
 from .auth import get_current_user
 from ..models import Itinerary, SavedItinerary
 from datetime import datetime, timedelta
-import google.generativeai as genai
 import re
+import logging
 from ..utils.mailer import send_email_html
+from ..utils.metrics import Counter, Histogram
 from pydantic import BaseModel, EmailStr
 import html
 from datetime import datetime, date
@@ -19,13 +20,39 @@ from ..utils.itinerary_parser import (
     generate_custom_itinerary_preview,
     validate_custom_structure,
 )
+import time
+from functools import lru_cache
 from typing import Dict, List
 
 router = APIRouter(prefix="/api/itineraries", tags=["itineraries"])
+logger = logging.getLogger(__name__)
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+GEMINI_MODEL = "gemini-2.5-flash"
+
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "Duración de las llamadas al LLM, por modelo y resultado.",
+    ("model", "outcome"),
+)
+ITINERARY_RESULTS = Counter(
+    "itinerary_requests_total",
+    "Itinerarios pedidos a la IA, por estado final.",
+    ("status",),
+)
+
+
+@lru_cache(maxsize=1)
+def _genai():
+    """
+    google.generativeai tarda en importarse más que el resto de la app junta;
+    se carga recién cuando se genera el primer itinerario con IA.
+    """
+    import google.generativeai as genai
+
+    if GEMINI_API_KEY:
+        genai.configure(api_key=GEMINI_API_KEY)
+    return genai
 
 
 def build_itinerary_prompt(
@@ -247,8 +274,8 @@ def parse_ai_response(ai_response: str) -> dict:
         return parsed_data
 
     except (json.JSONDecodeError, ValueError) as e:
-        print(f"[AI ERROR] No se pudo parsear respuesta de IA como JSON: {e}")
-        print(f"[AI ERROR] Respuesta recibida: {ai_response[:500]}...")
+        logger.warning("No se pudo parsear respuesta de IA como JSON: %s", e)
+        logger.debug("Respuesta recibida: %s", ai_response[:500])
         return {
             "itinerary_text": ai_response,
             "used_publications": [],
@@ -279,17 +306,17 @@ def extract_used_publications_fallback(
                 for pub in available_publications:
                     if pub.id == pub_id:
                         used_publication_ids.append(pub_id)
-                        print(
-                            f"[ITINERARY DEBUG] Publicación encontrada por ID: {pub.place_name} (ID: {pub_id})"
+                        logger.debug(
+                            "Publicación encontrada por ID: %s (ID: %s)",
+                            pub.place_name,
+                            pub_id,
                         )
                         break
         except ValueError:
             continue
 
     if not used_publication_ids:
-        print(
-            "[ITINERARY DEBUG] No se encontraron IDs en formato (ID: X), usando búsqueda por texto..."
-        )
+        logger.debug("No se encontraron IDs en formato (ID: X), usando búsqueda por texto")
         used_publication_ids = extract_used_publications_legacy(
             itinerary_text, available_publications
         )
@@ -393,8 +420,10 @@ def extract_used_publications_legacy(
                         or "programa" in context
                     ):
                         publication_mentioned = True
-                        print(
-                            f"[ITINERARY DEBUG] Contexto positivo para {pub.place_name}: '{context.strip()}'"
+                        logger.debug(
+                            "Contexto positivo para %s: '%s'",
+                            pub.place_name,
+                            context.strip(),
                         )
                         break
                     negative_indicators = [
@@ -436,13 +465,17 @@ def extract_used_publications_legacy(
                         or "programa" in context
                     ):
                         publication_mentioned = True
-                        print(
-                            f"[ITINERARY DEBUG] Contexto positivo para {pub.place_name}: '{context.strip()}'"
+                        logger.debug(
+                            "Contexto positivo para %s: '%s'",
+                            pub.place_name,
+                            context.strip(),
                         )
                         break
                     else:
-                        print(
-                            f"[ITINERARY DEBUG] Contexto ignorado para {pub.place_name}: '{context.strip()}'"
+                        logger.debug(
+                            "Contexto ignorado para %s: '%s'",
+                            pub.place_name,
+                            context.strip(),
                         )
 
                 if publication_mentioned:
@@ -450,13 +483,9 @@ def extract_used_publications_legacy(
 
         if publication_mentioned:
             used_publication_ids.append(pub.id)
-            print(
-                f"[ITINERARY DEBUG] Publicación USADA en itinerario: {pub.place_name}"
-            )
+            logger.debug("Publicación USADA en itinerario: %s", pub.place_name)
         else:
-            print(
-                f"[ITINERARY DEBUG] Publicación NO usada en itinerario: {pub.place_name}"
-            )
+            logger.debug("Publicación NO usada en itinerario: %s", pub.place_name)
 
     return used_publication_ids
 
@@ -510,19 +539,11 @@ def request_itinerary(
     db.commit()
     db.refresh(itinerary)
     destination_lower = payload.destination.lower()
-    print(
-        f"[ITINERARY DEBUG] Buscando publicaciones para destino: '{payload.destination}' (normalizado: '{destination_lower}')"
-    )
-    all_approved = (
-        db.query(models.Publication)
-        .filter(models.Publication.status == "approved")
-        .all()
+    logger.debug(
+        "Buscando publicaciones para destino: '%s' (normalizado: '%s')",
+        payload.destination,
+        destination_lower,
     )
-    print(f"[ITINERARY DEBUG] Total publicaciones aprobadas: {len(all_approved)}")
-    for pub in all_approved:
-        print(
-            f"[ITINERARY DEBUG] - {pub.place_name} | País: {pub.country} | Provincia: {pub.province} | Ciudad: {pub.city}"
-        )
 
     from sqlalchemy import or_, and_
 
@@ -540,13 +561,9 @@ def request_itinerary(
         .all()
     )
 
-    print(
-        f"[ITINERARY DEBUG] Búsqueda exacta encontró: {len(exact_match_pubs)} publicaciones"
-    )
+    logger.debug("Búsqueda exacta encontró: %s publicaciones", len(exact_match_pubs))
     if len(exact_match_pubs) == 0:
-        print(
-            f"[ITINERARY DEBUG] No se encontró con búsqueda exacta, probando con palabras clave..."
-        )
+        logger.debug("No se encontró con búsqueda exacta, probando con palabras clave")
         import re
 
         keywords = [
@@ -554,7 +571,7 @@ def request_itinerary(
             for word in re.split(r"[,;\s]+", destination_lower)
             if word.strip() and len(word.strip()) >= 4
         ]
-        print(f"[ITINERARY DEBUG] Palabras clave extraídas (>=4 chars): {keywords}")
+        logger.debug("Palabras clave extraídas (>=4 chars): %s", keywords)
 
         if keywords:
             conditions = []
@@ -582,11 +599,13 @@ def request_itinerary(
     else:
         publications = exact_match_pubs
 
-    print(f"[ITINERARY DEBUG] Publicaciones encontradas: {len(publications)}")
-    for pub in publications:
-        print(f"[ITINERARY DEBUG] Match: {pub.place_name} ({pub.city}, {pub.country})")
+    logger.debug("Publicaciones encontradas: %s", len(publications))
+    if logger.isEnabledFor(logging.DEBUG):
+        for pub in publications:
+            logger.debug("Match: %s (%s, %s)", pub.place_name, pub.city, pub.country)
 
     if len(publications) == 0:
+        ITINERARY_RESULTS.inc(status="no_publications")
         itinerary.status = "failed"
         itinerary.generated_itinerary = f"❌ No se encontraron publicaciones relacionadas con '{payload.destination}' en nuestra base de datos.\n\nPor favor, intenta con otro destino o espera a que se agreguen más lugares de este destino a la plataforma."
         db.commit()
@@ -626,10 +645,18 @@ def request_itinerary(
             comments=payload.comments,
         )
 
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
+        model = _genai().GenerativeModel(GEMINI_MODEL)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = model.generate_content(prompt)
+            outcome = "ok"
+        finally:
+            LLM_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, model=GEMINI_MODEL, outcome=outcome
+            )
         ai_data = parse_ai_response(response.text)
-        print(f"[VALIDATION] Iniciando validación backend del itinerario de IA...")
+        logger.debug("Iniciando validación backend del itinerario de IA")
         validator = ItineraryValidator(db)
 
         validation_result = validator.validate_itinerary(
@@ -640,10 +667,11 @@ def request_itinerary(
             end_date=str(end),
         )
 
-        print(
-            f"[VALIDATION] Resultado: {'✅ VÁLIDO' if validation_result['valid'] else '❌ INVÁLIDO'}"
+        logger.debug(
+            "Validación (válido=%s): %s",
+            validation_result["valid"],
+            validation_result["validation_summary"],
         )
-        print(f"[VALIDATION] {validation_result['validation_summary']}")
         validation_report = ""
         validation_report += f"\n\n📊 VALIDACIÓN DEL ITINERARIO:\n"
         validation_report += f"{'✅ VÁLIDO' if validation_result['valid'] else '❌ INVÁLIDO'} - {validation_result['validation_summary']}\n"
@@ -684,7 +712,7 @@ def request_itinerary(
             itinerary.status = "completed"
         else:
             itinerary.status = "completed_with_warnings"
-            print(f"[VALIDATION] Itinerario generado pero con errores de validación")
+            logger.warning("Itinerario generado pero con errores de validación")
 
         itinerary.validation_metadata = validation_result
         if ai_data["used_publications"]:
@@ -695,8 +723,8 @@ def request_itinerary(
                 if pub_id in available_ids:
                     valid_ids.append(pub_id)
                 else:
-                    print(
-                        f"[ITINERARY WARNING] ID {pub_id} no encontrado en publicaciones disponibles"
+                    logger.warning(
+                        "La IA usó la publicación %s, que no estaba disponible", pub_id
                     )
 
             itinerary.publication_ids = valid_ids
@@ -707,23 +735,18 @@ def request_itinerary(
             itinerary.publication_ids = used_publication_ids
 
         if "total_cost" in ai_data:
-            print(
-                f"[ITINERARY DEBUG] Costo calculado por IA: US${ai_data['total_cost']}"
-            )
+            logger.debug("Costo calculado por IA: US$%s", ai_data["total_cost"])
         if "validation_notes" in ai_data:
-            print(
-                f"[ITINERARY DEBUG] Notas de validación: {ai_data['validation_notes']}"
-            )
+            logger.debug("Notas de validación: %s", ai_data["validation_notes"])
 
-        print(f"[ITINERARY DEBUG] Publicaciones disponibles: {len(publications)}")
-        print(
-            f"[ITINERARY DEBUG] Publicaciones realmente usadas: {len(itinerary.publication_ids)}"
-        )
+        logger.debug("Publicaciones disponibles: %s", len(publications))
+        logger.debug("Publicaciones realmente usadas: %s", len(itinerary.publication_ids))
 
     except Exception as e:
         itinerary.status = "failed"
         itinerary.generated_itinerary = f"Error al generar itinerario: {str(e)}"
 
+    ITINERARY_RESULTS.inc(status=itinerary.status)
     db.commit()
     db.refresh(itinerary)
     favorite_ids = {
@@ -787,7 +810,7 @@ def request_itinerary(
 
 @router.get("/my-itineraries", response_model=list[schemas.ItineraryOut])
 def get_my_itineraries(
-    db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db), current_user: models.User = Depends(get_current_user)
 ):
     """
     Obtiene todos los itinerarios del usuario actual, incluyendo los itinerarios guardados.
@@ -873,8 +896,11 @@ def get_my_itineraries(
             )
         )
 
-        print(
-            f"📊 [DEBUG] Itinerario {it.id} desde BD: budget={it.budget}, cant_persons={it.cant_persons}"
+        logger.debug(
+            "Itinerario %s desde BD: budget=%s, cant_persons=%s",
+            it.id,
+            it.budget,
+            it.cant_persons,
         )
 
     for saved in saved_itineraries:
@@ -942,13 +968,13 @@ def get_my_itineraries(
 
 @router.get("/ai-list")
 def get_my_ai_itineraries(
-    db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db), current_user: models.User = Depends(get_current_user)
 ):
     """
     Endpoint del PASO 4: Obtiene los itinerarios de IA del usuario para el botón "Pegar itinerario de IA"
     """
 
-    print(f"[PASTE] Usuario {current_user.id} solicitando sus itinerarios de IA...")
+    logger.debug("Usuario %s solicitando sus itinerarios de IA", current_user.id)
     ai_itineraries = (
         db.query(models.Itinerary)
         .filter(
@@ -960,7 +986,7 @@ def get_my_ai_itineraries(
         .all()
     )
 
-    print(f"[PASTE] Encontrados {len(ai_itineraries)} itinerarios de IA")
+    logger.debug("Encontrados %s itinerarios de IA", len(ai_itineraries))
 
     itineraries_list = []
     for itinerary in ai_itineraries:
@@ -1018,8 +1044,11 @@ def convert_ai_to_custom_itinerary(
     Endpoint del PASO 4: Convierte un itinerario de IA a formato personalizado (custom)
     """
 
-    print(f"[CONVERT] Usuario {current_user.id} convirtiendo itinerario de IA...")
-    print(f"[CONVERT] Datos recibidos: {conversion_data}")
+    logger.debug(
+        "Usuario %s convirtiendo itinerario de IA %s",
+        current_user.id,
+        conversion_data.get("ai_itinerary_id"),
+    )
 
     try:
         ai_itinerary_id = conversion_data.get("ai_itinerary_id")
@@ -1083,7 +1112,7 @@ def convert_ai_to_custom_itinerary(
 
             current_date += timedelta(days=1)
 
-        print(f"[CONVERT] Generando estructura para {total_days} días")
+        logger.debug("Generando estructura para %s días", total_days)
 
         custom_structure = {
             "destination": destination,
@@ -1093,10 +1122,10 @@ def convert_ai_to_custom_itinerary(
             "itinerary": {},
         }
 
-        print(f"[CONVERT] Parseando texto generado por IA...")
+        logger.debug("Parseando texto generado por IA")
 
         publication_ids = ai_itinerary.publication_ids or []
-        print(f"[CONVERT] Publication IDs guardados: {publication_ids}")
+        logger.debug("Publication IDs guardados: %s", publication_ids)
 
         publications_map = {}
         if publication_ids:
@@ -1106,7 +1135,7 @@ def convert_ai_to_custom_itinerary(
                 .all()
             )
             publications_map = {pub.id: pub for pub in used_publications}
-            print(f"[CONVERT] Publicaciones cargadas: {len(publications_map)}")
+            logger.debug("Publicaciones cargadas: %s", len(publications_map))
 
         for day in days:
             day_key = f"day_{day['day_number']}"
@@ -1117,7 +1146,7 @@ def convert_ai_to_custom_itinerary(
             }
 
         ai_text = ai_itinerary.generated_itinerary or ""
-        print(f"[CONVERT] Parseando {len(ai_text)} caracteres de texto de IA...")
+        logger.debug("Parseando %s caracteres de texto de IA", len(ai_text))
 
         import re
 
@@ -1153,7 +1182,7 @@ def convert_ai_to_custom_itinerary(
             if day_match:
                 day_num = int(day_match.group(1))
                 current_day = f"day_{day_num}"
-                print(f"[CONVERT] Procesando {current_day}")
+                logger.debug("Procesando %s", current_day)
                 continue
 
             if "🌅 MAÑANA" in line or "MAÑANA" in line:
@@ -1242,8 +1271,13 @@ def convert_ai_to_custom_itinerary(
                         start_time
                     ] = activity_entry
                     activities_found += 1
-                    print(
-                        f"[CONVERT] ✓ {current_day}/{period}/{start_time}: {description[:50]}... (duración: {actual_duration}min)"
+                    logger.debug(
+                        "✓ %s/%s/%s: %s... (duración: %smin)",
+                        current_day,
+                        period,
+                        start_time,
+                        description[:50],
+                        actual_duration,
                     )
 
                     if actual_duration > 30:
@@ -1348,9 +1382,7 @@ def convert_ai_to_custom_itinerary(
                                     custom_structure["itinerary"][current_day][period][
                                         continuation_time
                                     ] = continuation_entry
-                                    print(
-                                        f"[CONVERT]   + Continuación en {continuation_time}"
-                                    )
+                                    logger.debug("+ Continuación en %s", continuation_time)
                                 else:
                                     next_period = None
                                     if period == "morning":
@@ -1413,16 +1445,16 @@ def convert_ai_to_custom_itinerary(
                                             custom_structure["itinerary"][current_day][
                                                 next_period
                                             ][continuation_time] = continuation_entry
-                                            print(
-                                                f"[CONVERT]   + Continuación en {next_period}/{continuation_time}"
+                                            logger.debug(
+                                                "+ Continuación en %s/%s",
+                                                next_period,
+                                                continuation_time,
                                             )
 
-        print(f"[CONVERT] Actividades extraídas: {activities_found}")
+        logger.debug("Actividades extraídas: %s", activities_found)
 
         if activities_found == 0 and publications_map:
-            print(
-                f"[CONVERT] No se pudieron parsear actividades, usando distribución simple..."
-            )
+            logger.debug("No se pudieron parsear actividades, usando distribución simple")
 
             publications_list = list(publications_map.values())
             publications_per_day = len(publications_list) // total_days
@@ -1479,25 +1511,22 @@ def convert_ai_to_custom_itinerary(
 
                         pub_index += 1
 
-        print(f"[CONVERT] Conversión exitosa para {destination}")
-        print(f"[CONVERT] Estructura creada con {total_days} días")
-
-        print(f"[CONVERT] ==== ESTRUCTURA FINAL ====")
-        print(f"[CONVERT] Días en estructura: {len(custom_structure['itinerary'])}")
-        for day_key, day_data in custom_structure["itinerary"].items():
-            total_activities = sum(len(period) for period in day_data.values())
-            print(f"[CONVERT] {day_key}: {total_activities} actividades")
-            for period, activities in day_data.items():
-                if activities:
-                    print(f"[CONVERT]   {period}: {len(activities)} slots ocupados")
-                    for time, activity in activities.items():
+        logger.info(
+            "Itinerario de IA convertido: %s, %s días",
+            destination,
+            total_days,
+            extra={"user_id": current_user.id, "ai_itinerary_id": ai_itinerary.id},
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            for day_key, day_data in custom_structure["itinerary"].items():
+                for period, activities in day_data.items():
+                    for slot, activity in activities.items():
                         title = (
                             activity.get("place_name", "Sin título")
                             if isinstance(activity, dict)
                             else str(activity)
                         )
-                        print(f"[CONVERT]     {time}: {title}")
-        print(f"[CONVERT] ========================")
+                        logger.debug("%s/%s/%s: %s", day_key, period, slot, title)
 
         return {
             "success": True,
@@ -1518,7 +1547,7 @@ def convert_ai_to_custom_itinerary(
 
 
     except Exception as e:
-        print(f"[CONVERT] Error en conversión: {str(e)}")
+        logger.exception("Error al convertir el itinerario de IA")
         raise HTTPException(
             status_code=500, detail=f"Error al convertir itinerario: {str(e)}"
         )
@@ -1527,7 +1556,7 @@ def convert_ai_to_custom_itinerary(
 @router.get("/{itinerary_id}", response_model=schemas.ItineraryOut)
 def get_itinerary(
     itinerary_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
@@ -1792,7 +1821,7 @@ def share_itinerary_by_email(
 @router.get("/by-user/{user_id}", response_model=list[schemas.ItineraryOut])
 def get_itineraries_by_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
@@ -1810,7 +1839,7 @@ def get_itineraries_by_user(
 @router.get("/by-user/{user_id}")
 def get_itineraries_by_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
@@ -1988,7 +2017,7 @@ def save_itinerary(
 
 @router.get("/saved")
 def get_saved_itineraries(
-    db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db), current_user: models.User = Depends(get_current_user)
 ):
     """
     Obtener todos los itinerarios guardados por el usuario actual
@@ -2093,7 +2122,7 @@ def _time_to_minutes(time_str: str) -> int:
 
 
 @router.post("/custom", response_model=schemas.ItineraryOut)
-async def create_custom_itinerary(
+def create_custom_itinerary(
     request: CustomItineraryRequest,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -2103,13 +2132,14 @@ async def create_custom_itinerary(
     manualmente las actividades para cada horario
     """
     try:
-        print(f"🔍 [DEBUG] Datos recibidos:")
-        print(f"  - Destino: {request.destination}")
-        print(
-            f"  - Personas: {request.cant_persons} (tipo: {type(request.cant_persons)})"
+        logger.debug(
+            "Itinerario personalizado: destino=%s personas=%r presupuesto=%r fechas=%s a %s",
+            request.destination,
+            request.cant_persons,
+            request.budget,
+            request.start_date,
+            request.end_date,
         )
-        print(f"  - Presupuesto: {request.budget} (tipo: {type(request.budget)})")
-        print(f"  - Fechas: {request.start_date} a {request.end_date}")
 
         validation_errors = []
         publication_ids = _extract_publication_ids(request.itinerary_data)
@@ -2245,11 +2275,11 @@ async def create_custom_itinerary(
         db.commit()
         db.refresh(itinerary)
 
-        print(f"✅ [DEBUG] Itinerario guardado en BD:")
-        print(f"  - ID: {itinerary.id}")
-        print(f"  - Personas en BD: {itinerary.cant_persons}")
-        print(f"  - Presupuesto en BD: {itinerary.budget}")
-        print(f"  - Destino en BD: {itinerary.destination}")
+        logger.info(
+            "Itinerario personalizado %s guardado",
+            itinerary.id,
+            extra={"user_id": current_user.id, "destination": itinerary.destination},
+        )
 
         publications = []
 
@@ -2288,6 +2318,7 @@ async def create_custom_itinerary(
                     created_by_user_id=pub.created_by_user_id,
                     created_at=pub.created_at.isoformat() if pub.created_at else None,
                     photos=[ph.url for ph in pub.photos] if pub.photos else [],
+                    photo_variants=[ph.variants or {} for ph in pub.photos] if pub.photos else [],
                     categories=(
                         [cat.slug for cat in pub.categories] if pub.categories else []
                     ),
@@ -2305,11 +2336,6 @@ async def create_custom_itinerary(
             ],
         )
 
-        print(f"📤 [DEBUG] Respuesta enviada:")
-        print(f"  - ID: {response_obj.id}")
-        print(f"  - Personas en respuesta: {response_obj.cant_persons}")
-        print(f"  - Presupuesto en respuesta: {response_obj.budget}")
-
         return response_obj
 
     except Exception as e:
@@ -2532,7 +2558,7 @@ def convert_ai_itinerary_to_custom(
     Permite al usuario modificar manualmente un itinerario generado por IA
     """
 
-    print(f"[CONVERT] Convirtiendo itinerario {itinerary_id} de IA a personalizado...")
+    logger.debug("Convirtiendo itinerario %s de IA a personalizado", itinerary_id)
 
     itinerary = (
         db.query(models.Itinerary)
@@ -2564,7 +2590,7 @@ def convert_ai_itinerary_to_custom(
         validation = validate_custom_structure(custom_structure)
 
         if not validation["valid"]:
-            print(f"[CONVERT] Errores de parsing: {validation['errors']}")
+            logger.warning("Errores de parsing: %s", validation["errors"])
             raise HTTPException(
                 status_code=422,
                 detail=f"Error al parsear itinerario: {'; '.join(validation['errors'])}",
@@ -2599,10 +2625,13 @@ def convert_ai_itinerary_to_custom(
                     }
                 )
 
-        print(f"[CONVERT] Conversión exitosa:")
-        print(f"[CONVERT]   Días: {validation['total_days']}")
-        print(f"[CONVERT]   Actividades: {validation['total_activities']}")
-        print(f"[CONVERT]   Publicaciones: {len(publication_ids)}")
+        logger.info(
+            "Itinerario %s convertido: %s días, %s actividades, %s publicaciones",
+            itinerary_id,
+            validation["total_days"],
+            validation["total_activities"],
+            len(publication_ids),
+        )
 
         return {
             "success": True,
@@ -2629,7 +2658,7 @@ def convert_ai_itinerary_to_custom(
         }
 
     except Exception as e:
-        print(f"[CONVERT] Error durante conversión: {str(e)}")
+        logger.exception("Error al convertir el itinerario %s", itinerary_id)
         raise HTTPException(
             status_code=500, detail=f"Error interno al convertir itinerario: {str(e)}"
         )
@@ -0,0 +1,26 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response
+
+from ..utils import metrics
+
+router = APIRouter(tags=["metrics"])
+
+# /metrics exige "Authorization: Bearer <METRICS_TOKEN>"; sin token responde
+# 404, salvo METRICS_PUBLIC=true (solo si el puerto no está expuesto afuera)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() == "true"
+
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    if not METRICS_TOKEN:
+        if not METRICS_PUBLIC:
+            raise HTTPException(status_code=404, detail="Not Found")
+    elif not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    return Response(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
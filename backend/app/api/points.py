@@ -1,51 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
-from ..db import get_db
+from typing import List, Optional
+from ..db import get_db, get_read_db
+from .. import points_ledger
 from ..schemas import UserPointsOut, PointsTransactionOut, AddPointsRequest
 from ..models import User, UserPoints, PointsTransaction
-from .auth import get_current_user
+from .auth import get_current_user, get_current_principal
+from ..utils.principal_cache import Principal
 
 router = APIRouter()
 
+MAX_MOVEMENTS_PAGE_SIZE = 100
+
 
 def get_or_create_user_points(db: Session, user_id: int) -> UserPoints:
-    """Obtiene o crea el registro de puntos para un usuario"""
-    user_points = db.query(UserPoints).filter(UserPoints.user_id == user_id).first()
-    if not user_points:
-        user_points = UserPoints(user_id=user_id, total_points=0)
-        db.add(user_points)
-        db.commit()
-        db.refresh(user_points)
-    return user_points
+    """Obtiene o crea el registro de puntos para un usuario (sin commit)"""
+    points_ledger.ensure_balance_row(db, user_id)
+    return db.query(UserPoints).filter(UserPoints.user_id == user_id).one()
 
 
 @router.get("/points", response_model=dict)
-async def get_user_points(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+def get_user_points(
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db),
 ):
     """Obtiene los puntos actuales del usuario"""
-    user_points = get_or_create_user_points(db, current_user.id)
+    user_points = (
+        db.query(UserPoints).filter(UserPoints.user_id == current_user.id).first()
+    )
     return {
         "user_id": current_user.id,
-        "points": user_points.total_points,
-        "updated_at": user_points.updated_at.isoformat(),
+        "points": user_points.total_points if user_points else 0,
+        "updated_at": (
+            user_points.updated_at.isoformat()
+            if user_points and user_points.updated_at
+            else None
+        ),
     }
 
 
 @router.get("/points/movements", response_model=List[PointsTransactionOut])
-async def get_points_movements(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+def get_points_movements(
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_MOVEMENTS_PAGE_SIZE),
+    cursor: Optional[int] = Query(
+        None, description="Valor de X-Next-Cursor de la página anterior"
+    ),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db),
 ):
-    """Obtiene el historial de movimientos de puntos del usuario"""
-    transactions = (
-        db.query(PointsTransaction)
-        .filter(PointsTransaction.user_id == current_user.id)
-        .order_by(desc(PointsTransaction.created_at))
-        .limit(100)
-        .all()
-    )
+    """
+    Obtiene el historial de movimientos de puntos del usuario, del más nuevo
+    al más viejo. Paginado por cursor: si hay más resultados, el header
+    X-Next-Cursor trae el valor a enviar como ``cursor`` en el siguiente pedido.
+    """
+    transactions = points_ledger.list_movements(db, current_user.id, limit, cursor)
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        response.headers["X-Next-Cursor"] = str(transactions[-1].id)
 
     return [
         {
@@ -62,14 +74,16 @@ async def get_points_movements(
 
 
 @router.post("/points/add")
-async def add_points(
+def add_points(
     request: AddPointsRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(default=None),
 ):
     """
     Agrega puntos a un usuario (solo para uso interno del sistema)
     En producción, esto debería estar protegido y solo ser llamado por otros endpoints
+    Si se envía el header Idempotency-Key, los reintentos no suman dos veces.
     """
     target_user = db.query(User).filter(User.id == request.user_id).first()
     if not target_user:
@@ -77,29 +91,27 @@ async def add_points(
             status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
         )
 
-    user_points = get_or_create_user_points(db, request.user_id)
-
-    transaction = PointsTransaction(
+    idempotency_key = (
+        f"add:{request.user_id}:{idempotency_key}" if idempotency_key else None
+    )
+    transaction = points_ledger.record_movement(
+        db,
         user_id=request.user_id,
         points=request.points,
         transaction_type=request.transaction_type,
         description=request.description,
         reference_id=request.reference_id,
+        idempotency_key=idempotency_key,
+        floor_at_zero=True,
     )
-    db.add(transaction)
-
-    user_points.total_points += request.points
-
-    if user_points.total_points < 0:
-        user_points.total_points = 0
-
+    if transaction is None:
+        transaction = points_ledger.find_transaction(db, idempotency_key)
     db.commit()
-    db.refresh(transaction)
 
     return {
         "message": "Puntos agregados exitosamente",
         "transaction_id": transaction.id,
-        "new_balance": user_points.total_points,
+        "new_balance": points_ledger.get_balance(db, request.user_id),
     }
 
 
@@ -115,19 +127,6 @@ def award_points_for_review(
     if not user or user.role != "premium":
         return False
 
-    existing = (
-        db.query(PointsTransaction)
-        .filter(
-            PointsTransaction.user_id == user_id,
-            PointsTransaction.transaction_type == "review_earned",
-            PointsTransaction.reference_id == review_id,
-        )
-        .first()
-    )
-
-    if existing:
-        return False
-
     from ..models import Review, Publication
 
     review = db.query(Review).filter(Review.id == review_id).first()
@@ -140,17 +139,17 @@ def award_points_for_review(
             or f"Publicación #{review.publication.id}"
         )
 
-    transaction = PointsTransaction(
+    transaction = points_ledger.record_movement(
+        db,
         user_id=user_id,
         points=points,
         transaction_type="review_earned",
         description=f"Puntos ganados por escribir reseña de '{publication_name}'",
         reference_id=review_id,
+        idempotency_key=f"review_earned:{review_id}",
     )
-    db.add(transaction)
-
-    user_points = get_or_create_user_points(db, user_id)
-    user_points.total_points += points
+    if transaction is None:
+        return False
 
     db.commit()
     return True
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from ..db import get_db
+from ..db import get_db, get_read_db
 from .auth import get_current_user
 from .. import models, schemas
 
@@ -8,7 +8,7 @@ router = APIRouter(prefix="/api/preferences", tags=["preferences"])
 
 
 @router.get("", response_model=schemas.UserPreferenceOut)
-def get_my_preferences(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def get_my_preferences(db: Session = Depends(get_read_db), user=Depends(get_current_user)):
     pref = db.query(models.UserPreference).filter_by(user_id=user.id).first()
     if not pref:
         return schemas.UserPreferenceOut(publication_type="all")
@@ -0,0 +1,313 @@
+"""
+Importación masiva de publicaciones desde CSV o JSONL (solo admin).
+
+El archivo se lee fila por fila (nunca entero en memoria). Las filas válidas
+se acumulan en lotes de ``batch_size``; por cada lote se resuelven todas sus
+categorías con una sola consulta y se insertan publicaciones y vínculos con
+``executemany``. Cada lote hace su propio commit, así un error a mitad del
+archivo no descarta lo ya importado. Si el CSV deja de poderse leer (bytes
+que no son UTF-8, comillas sin cerrar), se importa lo leído hasta ahí, el
+problema queda como error de esa línea y el resumen indica en
+``stopped_at_line`` dónde se cortó; en JSONL cada línea es independiente y
+una ilegible es un error más.
+
+Columnas (CSV) o claves (JSONL): place_name, country, province, city, address
+(obligatorias), description, categories, continent, climate, activities,
+cost_per_day, duration_min, available_days, available_hours. En CSV las
+listas van separadas por comas; en JSONL pueden ser listas o texto.
+"""
+
+import csv
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..db import get_db
+from ..utils.principal_cache import Principal
+from .publications import (
+    _csv_to_list,
+    _norm_climate,
+    _norm_continent,
+    _norm_text_or_none,
+    _normalize_slug,
+    require_admin,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/publications", tags=["publications"])
+
+DEFAULT_IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 200
+REQUIRED_FIELDS = ("place_name", "country", "province", "city", "address")
+
+
+class RowError(ValueError):
+    pass
+
+
+class UnreadableFile(RowError):
+    """Desde esta línea el archivo no se puede seguir leyendo."""
+
+
+def _decoded_lines(stream) -> Iterator[str]:
+    # línea por línea (y no con TextIOWrapper, que decodifica por bloques)
+    # para que un byte inválido se detecte en la línea donde está
+    for raw in stream:
+        yield raw.decode("utf-8-sig") if isinstance(raw, bytes) else raw
+
+
+def iter_csv_rows(stream) -> Iterator[Tuple[int, Dict]]:
+    reader = csv.DictReader(_decoded_lines(stream))
+    line_no = 1
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except UnicodeDecodeError as e:
+            error = UnreadableFile(f"El archivo no es UTF-8 válido: {e.reason}")
+            yield line_no + 1, error
+            return
+        except csv.Error as e:
+            yield line_no + 1, UnreadableFile(f"CSV inválido: {e}")
+            return
+        line_no += 1
+        yield line_no, row
+
+
+def iter_jsonl_rows(stream) -> Iterator[Tuple[int, Dict]]:
+    for line_no, raw in enumerate(stream, start=1):
+        try:
+            line = raw.decode("utf-8-sig") if isinstance(raw, bytes) else raw
+        except UnicodeDecodeError as e:
+            yield line_no, RowError(f"La línea no es UTF-8 válido: {e.reason}")
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            row = RowError(f"JSON inválido: {e.msg}")
+        else:
+            if not isinstance(row, dict):
+                row = RowError("Cada línea debe ser un objeto JSON")
+        yield line_no, row
+
+
+def _as_list(value) -> Optional[list]:
+    if isinstance(value, list):
+        return _csv_to_list(",".join(str(v) for v in value))
+    return _csv_to_list(value if value is None else str(value))
+
+
+def _as_number(value, cast, field: str):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{field} inválido: {value!r}")
+
+
+def normalize_row(row: Dict, created_by_user_id: Optional[int]) -> Tuple[Dict, List[str]]:
+    """
+    Convierte una fila cruda en los valores de INSERT de publications y la
+    lista de slugs de categorías. Lanza RowError si la fila no es válida.
+    """
+    values = {}
+    for field in REQUIRED_FIELDS:
+        v = _norm_text_or_none(None if row.get(field) is None else str(row.get(field)))
+        if not v:
+            raise RowError(f"Falta el campo obligatorio '{field}'")
+        values[field] = v
+
+    address = values["address"]
+    street, number = address, None
+    parts = address.rsplit(" ", 1)
+    if len(parts) == 2 and parts[1].isdigit():
+        street, number = parts[0], parts[1]
+
+    values.update(
+        name=values["place_name"],
+        street=street,
+        number=number,
+        description=_norm_text_or_none(row.get("description")),
+        status="approved",
+        created_by_user_id=created_by_user_id,
+        created_at=datetime.now(timezone.utc),
+        continent=_norm_continent(row.get("continent")),
+        climate=_norm_climate(row.get("climate")),
+        activities=_as_list(row.get("activities")),
+        cost_per_day=_as_number(row.get("cost_per_day"), float, "cost_per_day"),
+        duration_min=_as_number(row.get("duration_min"), int, "duration_min"),
+        available_days=_as_list(row.get("available_days")),
+        available_hours=_as_list(row.get("available_hours")),
+    )
+    slugs = [_normalize_slug(s) for s in (_as_list(row.get("categories")) or [])]
+    return values, list(dict.fromkeys(s for s in slugs if s))
+
+
+def _resolve_categories(db: Session, slugs: Iterable[str]) -> Dict[str, int]:
+    """Devuelve {slug: id}, creando en un solo INSERT las categorías que falten."""
+    slugs = set(slugs)
+    if not slugs:
+        return {}
+    found = dict(
+        db.execute(
+            select(models.Category.slug, models.Category.id).where(
+                models.Category.slug.in_(slugs)
+            )
+        ).all()
+    )
+    missing = slugs - found.keys()
+    if missing:
+        db.execute(
+            insert(models.Category),
+            [{"slug": s, "name": s.capitalize()} for s in sorted(missing)],
+        )
+        found.update(
+            db.execute(
+                select(models.Category.slug, models.Category.id).where(
+                    models.Category.slug.in_(missing)
+                )
+            ).all()
+        )
+    return found
+
+
+def _insert_batch(db: Session, batch: List[Tuple[int, Dict, List[str]]]) -> None:
+    category_ids = _resolve_categories(
+        db, (slug for _, _, slugs in batch for slug in slugs)
+    )
+    pub_ids = db.execute(
+        insert(models.Publication).returning(
+            models.Publication.id, sort_by_parameter_order=True
+        ),
+        [values for _, values, _ in batch],
+    ).scalars().all()
+    links = [
+        {"publication_id": pub_id, "category_id": category_ids[slug]}
+        for pub_id, (_, _, slugs) in zip(pub_ids, batch)
+        for slug in slugs
+    ]
+    if links:
+        db.execute(insert(models.publication_categories), links)
+
+
+def import_publications(
+    db: Session,
+    rows: Iterable[Tuple[int, Dict]],
+    created_by_user_id: Optional[int] = None,
+    batch_size: int = DEFAULT_IMPORT_BATCH_SIZE,
+    progress: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Importa las filas ``(número_de_línea, fila)`` en lotes. Devuelve un
+    resumen con totales y los errores por fila (hasta MAX_REPORTED_ERRORS).
+    ``progress`` se llama con el resumen parcial después de cada lote.
+    """
+    summary = {
+        "processed": 0,
+        "inserted": 0,
+        "failed": 0,
+        "batches": 0,
+        "errors": [],
+        "stopped_at_line": None,
+    }
+
+    def _error(line_no: int, message: str) -> None:
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"line": line_no, "error": message})
+
+    def _flush(batch) -> None:
+        try:
+            _insert_batch(db, batch)
+            db.commit()
+            summary["inserted"] += len(batch)
+        except Exception as e:
+            db.rollback()
+            logger.exception("Falló el lote de importación que empieza en la línea %s", batch[0][0])
+            for line_no, _, _ in batch:
+                _error(line_no, f"Error de base de datos: {e.__class__.__name__}")
+        summary["batches"] += 1
+        if progress:
+            progress(summary)
+
+    batch: List[Tuple[int, Dict, List[str]]] = []
+    for line_no, row in rows:
+        summary["processed"] += 1
+        try:
+            if isinstance(row, Exception):
+                raise row
+            values, slugs = normalize_row(row, created_by_user_id)
+        except UnreadableFile as e:
+            _error(line_no, str(e))
+            summary["stopped_at_line"] = line_no
+            break
+        except RowError as e:
+            _error(line_no, str(e))
+            continue
+        batch.append((line_no, values, slugs))
+        if len(batch) >= batch_size:
+            _flush(batch)
+            batch = []
+    if batch:
+        _flush(batch)
+    return summary
+
+
+def _detect_format(filename: Optional[str], fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    raise HTTPException(
+        status_code=400,
+        detail="No se pudo detectar el formato: usá un archivo .csv/.jsonl o el parámetro format",
+    )
+
+
+@router.post("/import")
+def import_publications_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$"),
+    batch_size: int = Query(DEFAULT_IMPORT_BATCH_SIZE, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_admin),
+):
+    """
+    Importa publicaciones desde un CSV o JSONL. Responde con el total de filas
+    procesadas, insertadas y con error, y el detalle de los errores por línea.
+    Si el archivo se vuelve ilegible a mitad de camino, responde igual con lo
+    importado hasta ahí y ``stopped_at_line``.
+    """
+    fmt = _detect_format(file.filename, format)
+    rows = iter_csv_rows(file.file) if fmt == "csv" else iter_jsonl_rows(file.file)
+
+    def _log_progress(s: Dict) -> None:
+        logger.info(
+            "Importación %s: %s filas procesadas, %s insertadas, %s con error",
+            file.filename,
+            s["processed"],
+            s["inserted"],
+            s["failed"],
+        )
+
+    return import_publications(
+        db,
+        rows,
+        created_by_user_id=current_user.id,
+        batch_size=batch_size,
+        progress=_log_progress,
+    )
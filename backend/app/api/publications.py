@@ -8,20 +8,24 @@ from fastapi import (
     status,
     Query,
     Header,
+    BackgroundTasks,
+    Request,
 )
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import func, select
-from typing import List, Optional
+from sqlalchemy import func, select, update
+from typing import Iterable, List, Optional
 from datetime import datetime, timezone
 from pydantic import BaseModel
 import os, re, unicodedata
 from .. import models, schemas
-from ..db import get_db
-from .auth import get_current_user
+from ..db import get_db, get_read_db
 from pydantic import BaseModel
-from .auth import get_current_user, get_optional_user
+from .auth import get_current_principal, get_optional_user
+from ..utils.principal_cache import Principal
+from ..utils import catalog_cache, image_variants, uploads
 from .points import award_points_for_review
 from fastapi import Query
+from fastapi.responses import ORJSONResponse
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,15 +36,17 @@ class RejectRequest(BaseModel):
     reason: Optional[str] = None
 
 
-def require_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+def require_admin(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if current_user.role != "admin" and current_user.username != "admin":
         raise HTTPException(status_code=403, detail="Solo administradores")
     return current_user
 
 
 def require_premium(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if current_user.role != "premium":
         raise HTTPException(
             status_code=403, detail="Solo usuarios premium pueden publicar reseñas"
@@ -49,8 +55,8 @@ def require_premium(
 
 
 def require_premium_or_admin(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if current_user.role not in ("premium", "admin"):
         raise HTTPException(
             status_code=403, detail="Solo usuarios premium pueden publicar reseñas"
@@ -150,80 +156,88 @@ def _get_or_create_category(
     return cat
 
 
+def publication_data(p: models.Publication, **overrides) -> dict:
+    """
+    Dict con los campos de PublicationOut armado directamente desde el ORM.
+    No pasa por la validación de pydantic: los datos salen de la base y los
+    listados los devuelven tal cual con ``publication_list_response``.
+    ``overrides`` pisa campos puntuales (is_favorite, has_pending_deletion...).
+    """
+    photos = p.photos
+    data = {
+        "id": p.id,
+        "place_name": p.place_name,
+        "country": p.country,
+        "province": p.province,
+        "city": p.city,
+        "address": p.address,
+        "description": p.description,
+        "status": p.status,
+        "rejection_reason": p.rejection_reason,
+        "created_by_user_id": p.created_by_user_id,
+        "created_at": p.created_at.isoformat() if p.created_at else "",
+        "photos": [ph.url for ph in photos],
+        "photo_variants": [ph.variants or {} for ph in photos],
+        "rating_avg": p.rating_avg or 0.0,
+        "rating_count": p.rating_count or 0,
+        "categories": [c.slug for c in p.categories],
+        "continent": p.continent,
+        "climate": p.climate,
+        "activities": p.activities,
+        "cost_per_day": p.cost_per_day,
+        "duration_min": p.duration_min,
+        "available_days": p.available_days,
+        "available_hours": p.available_hours,
+        "favorite_status": "pending",
+        "is_favorite": False,
+        "has_pending_deletion": False,
+    }
+    data.update(overrides)
+    return data
+
+
+def publication_out(p: models.Publication, **overrides) -> schemas.PublicationOut:
+    return schemas.PublicationOut.model_construct(**publication_data(p, **overrides))
+
+
+def publication_list_response(items: Iterable[dict]) -> ORJSONResponse:
+    """
+    Respuesta de un listado de ``publication_data``: se serializa con orjson
+    sin volver a validar contra el response_model (que queda para la doc).
+    """
+    return ORJSONResponse(list(items))
+
+
+def _with_photos_and_categories(q):
+    return q.options(
+        selectinload(models.Publication.photos),
+        selectinload(models.Publication.categories),
+    )
+
+
 @router.get("/all", response_model=List[schemas.PublicationOut])
 def list_all_publications(
-    db: Session = Depends(get_db), _: models.User = Depends(require_admin)
+    db: Session = Depends(get_read_db), _: Principal = Depends(require_admin)
 ):
     pubs = (
-        db.query(models.Publication)
+        _with_photos_and_categories(db.query(models.Publication))
         .order_by(models.Publication.created_at.desc())
         .all()
     )
-    out: List[schemas.PublicationOut] = []
-    for p in pubs:
-        out.append(
-            schemas.PublicationOut(
-                id=p.id,
-                place_name=p.place_name,
-                country=p.country,
-                province=p.province,
-                city=p.city,
-                address=p.address,
-                description=getattr(p, "description", None),
-                status=p.status,
-                rejection_reason=getattr(p, "rejection_reason", None),
-                created_by_user_id=p.created_by_user_id,
-                created_at=p.created_at.isoformat() if p.created_at else "",
-                photos=[ph.url for ph in p.photos],
-                rating_avg=getattr(p, "rating_avg", 0.0) or 0.0,
-                rating_count=getattr(p, "rating_count", 0) or 0,
-                categories=[c.slug for c in getattr(p, "categories", [])],
-                continent=getattr(p, "continent", None),
-                climate=getattr(p, "climate", None),
-                activities=getattr(p, "activities", None),
-                cost_per_day=getattr(p, "cost_per_day", None),
-                duration_min=getattr(p, "duration_min", None),
-            )
-        )
-    return out
+    return publication_list_response(publication_data(p) for p in pubs)
 
 
 @router.get("", response_model=List[schemas.PublicationOut])
 def list_publications(
-    db: Session = Depends(get_db), _: models.User = Depends(require_admin)
+    db: Session = Depends(get_read_db), _: Principal = Depends(require_admin)
 ):
     pubs = (
-        db.query(models.Publication)
+        _with_photos_and_categories(db.query(models.Publication))
         .filter(models.Publication.status == "approved")
         .order_by(models.Publication.created_at.desc())
         .all()
     )
-    out: List[schemas.PublicationOut] = []
-    for p in pubs:
-        out.append(
-            schemas.PublicationOut(
-                id=p.id,
-                place_name=p.place_name,
-                country=p.country,
-                province=p.province,
-                city=p.city,
-                address=p.address,
-                description=getattr(p, "description", None),
-                status=p.status,
-                created_by_user_id=p.created_by_user_id,
-                created_at=p.created_at.isoformat() if p.created_at else "",
-                photos=[ph.url for ph in p.photos],
-                rating_avg=getattr(p, "rating_avg", 0.0) or 0.0,
-                rating_count=getattr(p, "rating_count", 0) or 0,
-                categories=[c.slug for c in getattr(p, "categories", [])],
-                continent=getattr(p, "continent", None),
-                climate=getattr(p, "climate", None),
-                activities=getattr(p, "activities", None),
-                cost_per_day=getattr(p, "cost_per_day", None),
-                duration_min=getattr(p, "duration_min", None),
-            )
-        )
-    return out
+    return publication_list_response(publication_data(p) for p in pubs)
 
 
 _STREET_NUM_RE = re.compile(r"\s*(.+?)\s+(\d+[A-Za-z\-]*)\s*$")
@@ -233,6 +247,7 @@ _STREET_NUM_RE = re.compile(r"\s*(.+?)\s+(\d+[A-Za-z\-]*)\s*$")
     "", response_model=schemas.PublicationOut, status_code=status.HTTP_201_CREATED
 )
 def create_publication(
+    background_tasks: BackgroundTasks,
     place_name: str = Form(...),
     country: str = Form(...),
     province: str = Form(...),
@@ -241,6 +256,9 @@ def create_publication(
     description: str = Form(...),
     categories: Optional[str] = Form(None),
     photos: Optional[List[UploadFile]] = File(None),
+    photo_urls: Optional[str] = Form(
+        None, description="URLs subidas con /photos/presign, separadas por coma"
+    ),
     continent: Optional[str] = Form(None),
     climate: Optional[str] = Form(None),
     activities: Optional[str] = Form(None),
@@ -249,10 +267,11 @@ def create_publication(
     available_days: Optional[str] = Form(None),
     available_hours: Optional[str] = Form(None),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_admin),
+    current_user: Principal = Depends(require_admin),
 ):
     files = photos or []
-    if len(files) > 4:
+    direct_urls = [u.strip() for u in (photo_urls or "").split(",") if u.strip()]
+    if len(files) + len(direct_urls) > 4:
         raise HTTPException(status_code=400, detail="Máximo 4 fotos por publicación")
     for f in files:
         if f.content_type not in ("image/jpeg", "image/png", "image/webp"):
@@ -315,21 +334,27 @@ def create_publication(
     db.flush()
 
     saved_urls: List[str] = []
-    for idx, f in enumerate(files):
-        ext = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}.get(
-            f.content_type, ".bin"
-        )
-        filename = f"pub_{pub.id}_{idx}{ext}"
-        abs_path = os.path.join(UPLOAD_DIR, filename)
-        with open(abs_path, "wb") as out:
-            out.write(f.file.read())
-        url = f"/static/uploads/publications/{filename}"
-        photo = models.PublicationPhoto(publication_id=pub.id, url=url, index_order=idx)
-        db.add(photo)
-        saved_urls.append(url)
+    saved_photos: List[models.PublicationPhoto] = []
+    with uploads.discard_on_error(db):
+        urls = [uploads.store_upload(db, f, "publications") for f in files]
+        urls += [
+            uploads.register_direct_upload(db, u, "publications") for u in direct_urls
+        ]
+        for idx, url in enumerate(urls):
+            photo = models.PublicationPhoto(
+                publication_id=pub.id, url=url, index_order=idx
+            )
+            db.add(photo)
+            saved_urls.append(url)
+            saved_photos.append(photo)
 
-    db.commit()
+        db.commit()
     db.refresh(pub)
+    background_tasks.add_task(
+        image_variants.process_publication_photos,
+        db.get_bind(),
+        [ph.id for ph in saved_photos],
+    )
 
     return schemas.PublicationOut(
         id=pub.id,
@@ -354,7 +379,7 @@ def delete_publication(
     pub_id: int,
     payload: RejectRequest,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     pub = db.query(models.Publication).filter(models.Publication.id == pub_id).first()
     if not pub:
@@ -366,12 +391,53 @@ def delete_publication(
     return {"message": "Publicación marcada como eliminada"}
 
 
+@router.post("/photos/presign")
+def presign_publication_photo(
+    payload: schemas.PhotoPresignRequest,
+    _: Principal = Depends(get_current_principal),
+):
+    """
+    Devuelve una URL prefirmada para subir una foto directo al storage.
+    Después se envía ``file_url`` en ``photo_urls`` al crear la publicación.
+    """
+    return uploads.presign_upload(
+        "publications", payload.content_type, payload.sha256, payload.size
+    )
+
+
+@router.delete("/{pub_id}/purge", status_code=status.HTTP_200_OK)
+def purge_publication(
+    pub_id: int,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+):
+    """
+    Borra definitivamente una publicación ya marcada como eliminada, junto con
+    sus fotos. Los archivos solo se borran si ninguna otra fila los usa.
+    """
+    pub = db.query(models.Publication).filter(models.Publication.id == pub_id).first()
+    if not pub:
+        raise HTTPException(status_code=404, detail="Publicación no encontrada")
+    if pub.status != "deleted":
+        raise HTTPException(
+            status_code=400,
+            detail="Solo se pueden purgar publicaciones marcadas como eliminadas",
+        )
+
+    orphaned = uploads.release(db, [ph.url for ph in pub.photos])
+    db.delete(pub)
+    db.commit()
+    uploads.delete_orphans(db, orphaned)
+    return {"message": "Publicación borrada definitivamente"}
+
+
 @router.post(
     "/submit",
     response_model=schemas.PublicationOut,
     status_code=status.HTTP_201_CREATED,
 )
 def submit_publication(
+    background_tasks: BackgroundTasks,
     place_name: str = Form(...),
     country: str = Form(...),
     province: str = Form(...),
@@ -387,11 +453,15 @@ def submit_publication(
     available_days: Optional[str] = Form(None),
     available_hours: Optional[str] = Form(None),
     photos: Optional[List[UploadFile]] = File(None),
+    photo_urls: Optional[str] = Form(
+        None, description="URLs subidas con /photos/presign, separadas por coma"
+    ),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     files = photos or []
-    if len(files) > 4:
+    direct_urls = [u.strip() for u in (photo_urls or "").split(",") if u.strip()]
+    if len(files) + len(direct_urls) > 4:
         raise HTTPException(status_code=400, detail="Máximo 4 fotos por publicación")
     for f in files:
         if f.content_type not in ("image/jpeg", "image/png", "image/webp"):
@@ -462,21 +532,27 @@ def submit_publication(
     db.flush()
 
     saved_urls: List[str] = []
-    for idx, f in enumerate(files):
-        ext = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}.get(
-            f.content_type, ".bin"
-        )
-        filename = f"pub_{pub.id}_{idx}{ext}"
-        abs_path = os.path.join(UPLOAD_DIR, filename)
-        with open(abs_path, "wb") as out:
-            out.write(f.file.read())
-        url = f"/static/uploads/publications/{filename}"
-        photo = models.PublicationPhoto(publication_id=pub.id, url=url, index_order=idx)
-        db.add(photo)
-        saved_urls.append(url)
+    saved_photos: List[models.PublicationPhoto] = []
+    with uploads.discard_on_error(db):
+        urls = [uploads.store_upload(db, f, "publications") for f in files]
+        urls += [
+            uploads.register_direct_upload(db, u, "publications") for u in direct_urls
+        ]
+        for idx, url in enumerate(urls):
+            photo = models.PublicationPhoto(
+                publication_id=pub.id, url=url, index_order=idx
+            )
+            db.add(photo)
+            saved_urls.append(url)
+            saved_photos.append(photo)
 
-    db.commit()
+        db.commit()
     db.refresh(pub)
+    background_tasks.add_task(
+        image_variants.process_publication_photos,
+        db.get_bind(),
+        [ph.id for ph in saved_photos],
+    )
 
     return schemas.PublicationOut(
         id=pub.id,
@@ -501,10 +577,11 @@ def submit_publication(
 
 @router.get("/my-submissions", response_model=List[schemas.PublicationOut])
 def list_my_submissions(
-    db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     pubs = (
-        db.query(models.Publication)
+        _with_photos_and_categories(db.query(models.Publication))
         .filter(models.Publication.created_by_user_id == current_user.id)
         .order_by(models.Publication.created_at.desc())
         .all()
@@ -516,29 +593,15 @@ def list_my_submissions(
         .all()
     }
 
-    out: List[schemas.PublicationOut] = []
-    for p in pubs:
-        out.append(
-            schemas.PublicationOut(
-                id=p.id,
-                place_name=p.place_name,
-                country=p.country,
-                province=p.province,
-                city=p.city,
-                address=p.address,
-                status=p.status,
-                rejection_reason=getattr(p, "rejection_reason", None),
-                created_by_user_id=p.created_by_user_id,
-                created_at=p.created_at.isoformat() if p.created_at else "",
-                photos=[ph.url for ph in p.photos],
-                has_pending_deletion=p.id in pending_deletion_ids,
-                rating_avg=getattr(p, "rating_avg", 0.0) or 0.0,
-                rating_count=getattr(p, "rating_count", 0) or 0,
-                cost_per_day=getattr(p, "cost_per_day", 0.0) or 0.0,
-                categories=[c.name or c.slug for c in (p.categories or [])],
-            )
+    return publication_list_response(
+        publication_data(
+            p,
+            has_pending_deletion=p.id in pending_deletion_ids,
+            cost_per_day=p.cost_per_day or 0.0,
+            categories=[c.name or c.slug for c in p.categories],
         )
-    return out
+        for p in pubs
+    )
 
 
 @router.get("/search", response_model=List[schemas.PublicationOut])
@@ -548,8 +611,8 @@ def search_publications(
     date: str = None,
     time: str = None,
     persons: int = 1,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Busca publicaciones aprobadas por múltiples campos sin importar tildes:
@@ -562,11 +625,9 @@ def search_publications(
     Si destination está presente, filtra solo por ubicación (país, provincia, ciudad)
     """
 
-    pubs = (
-        db.query(models.Publication)
-        .filter(models.Publication.status == "approved")
-        .all()
-    )
+    pubs = _with_photos_and_categories(
+        db.query(models.Publication).filter(models.Publication.status == "approved")
+    ).all()
 
     if destination and len(destination.strip()) >= 2:
         normalized_dest = _normalize_search_text(destination)
@@ -668,7 +729,7 @@ def search_publications(
             pubs = available_pubs
 
         except (ValueError, AttributeError) as e:
-            print(f"Error parsing availability filters: {e}")
+            logger.warning("Filtros de disponibilidad inválidos: %s", e)
 
     favorite_ids = {
         fav.publication_id
@@ -677,136 +738,87 @@ def search_publications(
         .all()
     }
 
-    out: List[schemas.PublicationOut] = []
-    for p in pubs:
-        out.append(
-            schemas.PublicationOut(
-                id=p.id,
-                place_name=p.place_name,
-                country=p.country,
-                province=p.province,
-                city=p.city,
-                address=p.address,
-                description=p.description,
-                status=p.status,
-                created_by_user_id=p.created_by_user_id,
-                created_at=p.created_at.isoformat() if p.created_at else "",
-                photos=[ph.url for ph in p.photos],
-                rating_avg=getattr(p, "rating_avg", 0.0) or 0.0,
-                rating_count=getattr(p, "rating_count", 0) or 0,
-                categories=[c.slug for c in getattr(p, "categories", [])],
-                continent=p.continent,
-                climate=p.climate,
-                activities=p.activities,
-                cost_per_day=p.cost_per_day,
-                duration_min=p.duration_min,
-                available_days=p.available_days,
-                available_hours=p.available_hours,
-                is_favorite=p.id in favorite_ids,
-            )
+    return publication_list_response(
+        publication_data(p, is_favorite=p.id in favorite_ids) for p in pubs
+    )
+
+
+def _public_publications(db: Session, slugs: List[str]) -> List[dict]:
+    q = db.query(models.Publication).filter(models.Publication.status == "approved")
+    if slugs:
+        q = (
+            q.join(models.Publication.categories)
+            .filter(models.Category.slug.in_(slugs))
+            .distinct()
         )
-    return out
+    pubs = (
+        _with_photos_and_categories(q)
+        .order_by(models.Publication.created_at.desc())
+        .all()
+    )
+    return [publication_data(p) for p in pubs]
 
 
 @router.get("/public", response_model=List[schemas.PublicationOut])
 def list_publications_public(
+    request: Request,
     category: Optional[str] = Query(
         None, description="Slugs separados por coma, ej: aventura,cultura"
     ),
-    db: Session = Depends(get_db),
-    current_user: Optional[models.User] = Depends(get_optional_user),
+    db: Session = Depends(get_read_db),
+    current_user: Optional[Principal] = Depends(get_optional_user),
 ):
     """
     Lista publicaciones aprobadas. Permite filtrar por una o varias categorías usando slugs.
     No requiere autenticación, pero si el usuario está autenticado, incluye is_favorite.
+
+    El listado se cachea por versión del catálogo (ver utils/catalog_cache.py)
+    y responde 304 si el If-None-Match coincide; is_favorite se aplica aparte.
     """
-    q = db.query(models.Publication).filter(models.Publication.status == "approved")
     slugs: List[str] = []
     if category:
-        slugs = [_normalize_slug(s) for s in category.split(",") if _normalize_slug(s)]
-        if slugs:
-            q = (
-                q.join(models.Publication.categories)
-                .filter(models.Category.slug.in_(slugs))
-                .distinct()
-            )
-
-    pubs = q.order_by(models.Publication.created_at.desc()).all()
+        slugs = sorted({_normalize_slug(s) for s in category.split(",") if _normalize_slug(s)})
 
-    favorite_ids = set()
-    if current_user:
-        favorite_ids = {
-            fav.publication_id
-            for fav in db.query(models.Favorite)
-            .filter(models.Favorite.user_id == current_user.id)
-            .all()
-        }
+    entry = catalog_cache.get_or_build(
+        db, "publications_public", tuple(slugs), lambda: _public_publications(db, slugs)
+    )
+    if not current_user:
+        return catalog_cache.json_response(request, entry.etag, body=entry.body)
 
-    out: List[schemas.PublicationOut] = []
-    for p in pubs:
-        out.append(
-            schemas.PublicationOut(
-                id=p.id,
-                place_name=p.place_name,
-                country=p.country,
-                province=p.province,
-                city=p.city,
-                address=p.address,
-                status=p.status,
-                created_by_user_id=p.created_by_user_id,
-                created_at=p.created_at.isoformat() if p.created_at else "",
-                photos=[ph.url for ph in p.photos],
-                rating_avg=getattr(p, "rating_avg", 0.0) or 0.0,
-                rating_count=getattr(p, "rating_count", 0) or 0,
-                categories=[c.slug for c in getattr(p, "categories", [])],
-                is_favorite=p.id in favorite_ids,
-                description=getattr(p, "description", None),
-                continent=getattr(p, "continent", None),
-                climate=getattr(p, "climate", None),
-                activities=getattr(p, "activities", []),
-                cost_per_day=getattr(p, "cost_per_day", None),
-                duration_min=getattr(p, "duration_min", None),
-            )
+    listed_ids = {item["id"] for item in entry.data}
+    favorite_ids = {
+        pub_id
+        for (pub_id,) in db.query(models.Favorite.publication_id).filter(
+            models.Favorite.user_id == current_user.id
         )
-    return out
+        if pub_id in listed_ids
+    }
+    if not favorite_ids:
+        return catalog_cache.json_response(
+            request, entry.etag, body=entry.body, private=True
+        )
+    return catalog_cache.json_response(
+        request,
+        catalog_cache.personal_etag(entry.etag, favorite_ids),
+        data=[
+            {**item, "is_favorite": True} if item["id"] in favorite_ids else item
+            for item in entry.data
+        ],
+        private=True,
+    )
 
 
 @router.get("/pending", response_model=List[schemas.PublicationOut])
 def list_pending_publications(
-    db: Session = Depends(get_db), _: models.User = Depends(require_admin)
+    db: Session = Depends(get_read_db), _: Principal = Depends(require_admin)
 ):
     pubs = (
-        db.query(models.Publication)
+        _with_photos_and_categories(db.query(models.Publication))
         .filter(models.Publication.status == "pending")
         .order_by(models.Publication.created_at.desc())
         .all()
     )
-    out: List[schemas.PublicationOut] = []
-    for p in pubs:
-        out.append(
-            schemas.PublicationOut(
-                id=p.id,
-                place_name=p.place_name,
-                country=p.country,
-                province=p.province,
-                city=p.city,
-                address=p.address,
-                description=getattr(p, "description", None),
-                status=p.status,
-                created_by_user_id=p.created_by_user_id,
-                created_at=p.created_at.isoformat() if p.created_at else "",
-                photos=[ph.url for ph in p.photos],
-                rating_avg=getattr(p, "rating_avg", 0.0) or 0.0,
-                rating_count=getattr(p, "rating_count", 0) or 0,
-                categories=[c.slug for c in getattr(p, "categories", [])],
-                continent=getattr(p, "continent", None),
-                climate=getattr(p, "climate", None),
-                activities=getattr(p, "activities", None),
-                cost_per_day=getattr(p, "cost_per_day", None),
-                duration_min=getattr(p, "duration_min", None),
-            )
-        )
-    return out
+    return publication_list_response(publication_data(p) for p in pubs)
 
 
 def _update_publication_rating(db: Session, pub_id: int) -> None:
@@ -824,6 +836,41 @@ def _update_publication_rating(db: Session, pub_id: int) -> None:
     db.add(pub)
 
 
+def update_publication_ratings(db: Session, pub_ids) -> None:
+    """
+    Recalcula rating_avg/rating_count de varias publicaciones con un único
+    UPDATE (subconsultas correlacionadas), sin cargarlas en la sesión.
+    """
+    pub_ids = list(set(pub_ids))
+    if not pub_ids:
+        return
+    visible = models.Review.status.in_(["approved", "under_review"])
+    avg_ = (
+        select(func.avg(models.Review.rating))
+        .where(models.Review.publication_id == models.Publication.id, visible)
+        .scalar_subquery()
+    )
+    count_ = (
+        select(func.count(models.Review.id))
+        .where(models.Review.publication_id == models.Publication.id, visible)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(models.Publication)
+        .where(models.Publication.id.in_(pub_ids))
+        .values(rating_avg=func.round(func.coalesce(avg_, 0), 1), rating_count=count_)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def batch_result(requested_ids, updated_ids) -> schemas.BatchModerationResult:
+    updated = set(updated_ids)
+    return schemas.BatchModerationResult(
+        updated=[i for i in requested_ids if i in updated],
+        skipped=[i for i in requested_ids if i not in updated],
+    )
+
+
 @router.post(
     "/{pub_id}/reviews",
     response_model=schemas.ReviewOut,
@@ -833,7 +880,7 @@ def create_review(
     pub_id: int,
     payload: schemas.ReviewCreate,
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_premium),
+    user: Principal = Depends(require_premium),
 ):
     pub = db.query(models.Publication).filter(models.Publication.id == pub_id).first()
     if not pub:
@@ -860,7 +907,7 @@ def create_review(
     try:
         award_points_for_review(db, user.id, review.id)
     except Exception as e:
-        print(f"Error al otorgar puntos por reseña: {e}")
+        logger.exception("Error al otorgar puntos por la reseña %s", review.id)
 
     return schemas.ReviewOut(
         id=review.id,
@@ -878,8 +925,8 @@ def create_review(
 @router.get("/{pub_id}/reviews", response_model=List[schemas.ReviewOut])
 def list_reviews(
     pub_id: int,
-    db: Session = Depends(get_db),
-    current_user: Optional[models.User] = Depends(get_optional_user),
+    db: Session = Depends(get_read_db),
+    current_user: Optional[Principal] = Depends(get_optional_user),
 ):
     user_id = current_user.id if current_user else None
 
@@ -959,7 +1006,7 @@ def list_reviews(
 def toggle_review_like(
     review_id: int,
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_premium_or_admin),
+    user: Principal = Depends(require_premium_or_admin),
 ):
     """
     Da o quita "me gusta" a una reseña.
@@ -1006,7 +1053,7 @@ def create_review_comment(
     review_id: int,
     payload: schemas.ReviewCommentCreate,
     db: Session = Depends(get_db),
-    user: models.User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     """
     Permite a cualquier usuario logueado (normal, premium, admin)
@@ -1039,9 +1086,58 @@ def create_review_comment(
     )
 
 
+def _set_pending_publications_status(
+    db: Session, ids: List[int], new_status: str, reason: Optional[str] = None
+) -> List[int]:
+    values = {"status": new_status}
+    if new_status == "rejected":
+        values["rejection_reason"] = reason
+    return list(
+        db.execute(
+            update(models.Publication)
+            .where(
+                models.Publication.id.in_(ids),
+                models.Publication.status == "pending",
+            )
+            .values(**values)
+            .returning(models.Publication.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+
+
+@router.post("/batch/approve", response_model=schemas.BatchModerationResult)
+def approve_publications_batch(
+    payload: schemas.BatchModerationRequest,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+):
+    """
+    Aprueba varias publicaciones pendientes en una sola transacción.
+    Las que no existen o ya no están pendientes vuelven en ``skipped``.
+    """
+    ids = list(dict.fromkeys(payload.ids))
+    updated = _set_pending_publications_status(db, ids, "approved")
+    db.commit()
+    return batch_result(ids, updated)
+
+
+@router.post("/batch/reject", response_model=schemas.BatchModerationResult)
+def reject_publications_batch(
+    payload: schemas.BatchModerationRequest,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+):
+    """Rechaza varias publicaciones pendientes con el mismo motivo."""
+    ids = list(dict.fromkeys(payload.ids))
+    updated = _set_pending_publications_status(db, ids, "rejected", payload.reason)
+    db.commit()
+    return batch_result(ids, updated)
+
+
 @router.put("/{pub_id}/approve", response_model=schemas.PublicationOut)
 def approve_publication(
-    pub_id: int, db: Session = Depends(get_db), _: models.User = Depends(require_admin)
+    pub_id: int, db: Session = Depends(get_db), _: Principal = Depends(require_admin)
 ):
     pub = db.query(models.Publication).filter(models.Publication.id == pub_id).first()
     if not pub:
@@ -1051,27 +1147,7 @@ def approve_publication(
     db.commit()
     db.refresh(pub)
 
-    return schemas.PublicationOut(
-        id=pub.id,
-        place_name=pub.place_name,
-        country=pub.country,
-        province=pub.province,
-        city=pub.city,
-        address=pub.address,
-        description=getattr(pub, "description", None),
-        status=pub.status,
-        created_by_user_id=pub.created_by_user_id,
-        created_at=pub.created_at.isoformat() if pub.created_at else "",
-        photos=[ph.url for ph in pub.photos],
-        rating_avg=getattr(pub, "rating_avg", 0.0) or 0.0,
-        rating_count=getattr(pub, "rating_count", 0) or 0,
-        categories=[c.slug for c in getattr(pub, "categories", [])],
-        continent=getattr(pub, "continent", None),
-        climate=getattr(pub, "climate", None),
-        activities=getattr(pub, "activities", None),
-        cost_per_day=getattr(pub, "cost_per_day", None),
-        duration_min=getattr(pub, "duration_min", None),
-    )
+    return publication_out(pub)
 
 
 class RejectRequest(BaseModel):
@@ -1083,7 +1159,7 @@ def reject_publication(
     pub_id: int,
     payload: RejectRequest,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     pub = db.query(models.Publication).filter(models.Publication.id == pub_id).first()
     if not pub:
@@ -1094,35 +1170,14 @@ def reject_publication(
     db.commit()
     db.refresh(pub)
 
-    return schemas.PublicationOut(
-        id=pub.id,
-        place_name=pub.place_name,
-        country=pub.country,
-        province=pub.province,
-        city=pub.city,
-        address=pub.address,
-        description=getattr(pub, "description", None),
-        status=pub.status,
-        rejection_reason=pub.rejection_reason,
-        created_by_user_id=pub.created_by_user_id,
-        created_at=pub.created_at.isoformat() if pub.created_at else "",
-        photos=[ph.url for ph in pub.photos],
-        rating_avg=getattr(pub, "rating_avg", 0.0) or 0.0,
-        rating_count=getattr(pub, "rating_count", 0) or 0,
-        categories=[c.slug for c in getattr(pub, "categories", [])],
-        continent=getattr(pub, "continent", None),
-        climate=getattr(pub, "climate", None),
-        activities=getattr(pub, "activities", None),
-        cost_per_day=getattr(pub, "cost_per_day", None),
-        duration_min=getattr(pub, "duration_min", None),
-    )
+    return publication_out(pub)
 
 
 @router.post("/{pub_id}/favorite", status_code=status.HTTP_200_OK)
 def toggle_favorite(
     pub_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Agrega o quita una publicación de favoritos
@@ -1153,8 +1208,8 @@ def toggle_favorite(
 
 @router.get("/favorites", response_model=List[schemas.PublicationOut])
 def list_favorites(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
     user_id: int | None = Query(default=None),
 ):
     """
@@ -1168,35 +1223,29 @@ def list_favorites(
     favorites = (
         db.query(models.Favorite)
         .filter(models.Favorite.user_id == target_user_id)
+        .options(
+            selectinload(models.Favorite.publication).selectinload(
+                models.Publication.photos
+            ),
+            selectinload(models.Favorite.publication).selectinload(
+                models.Publication.categories
+            ),
+        )
         .order_by(models.Favorite.created_at.desc())
         .all()
     )
 
-    out: List[schemas.PublicationOut] = []
-    for fav in favorites:
-        p = fav.publication
-        if p and p.status == "approved":
-            out.append(
-                schemas.PublicationOut(
-                    id=p.id,
-                    place_name=p.place_name,
-                    country=p.country,
-                    province=p.province,
-                    city=p.city,
-                    address=p.address,
-                    status=p.status,
-                    created_by_user_id=p.created_by_user_id,
-                    created_at=p.created_at.isoformat() if p.created_at else "",
-                    photos=[ph.url for ph in p.photos],
-                    is_favorite=True,
-                    favorite_status=fav.status,
-                    rating_avg=getattr(p, "rating_avg", 0.0) or 0.0,
-                    rating_count=getattr(p, "rating_count", 0) or 0,
-                    cost_per_day=getattr(p, "cost_per_day", 0.0) or 0.0,
-                    categories=[c.name or c.slug for c in (p.categories or [])],
-                )
-            )
-    return out
+    return publication_list_response(
+        publication_data(
+            fav.publication,
+            is_favorite=True,
+            favorite_status=fav.status,
+            cost_per_day=fav.publication.cost_per_day or 0.0,
+            categories=[c.name or c.slug for c in fav.publication.categories],
+        )
+        for fav in favorites
+        if fav.publication and fav.publication.status == "approved"
+    )
 
 
 @router.post("/{pub_id}/request-deletion", status_code=status.HTTP_200_OK)
@@ -1204,13 +1253,13 @@ def request_deletion(
     pub_id: int,
     req: schemas.DeletionRequestCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Un usuario solicita eliminar una publicación (debe ser aprobada por admin)
     """
-    print(
-        f"[DEBUG] request_deletion called: pub_id={pub_id}, reason={req.reason}, user_id={current_user.id}"
+    logger.debug(
+        "Solicitud de eliminación: pub_id=%s user_id=%s", pub_id, current_user.id
     )
     pub = db.query(models.Publication).filter(models.Publication.id == pub_id).first()
     if not pub:
@@ -1246,13 +1295,18 @@ def request_deletion(
     "/deletion-requests/pending", response_model=List[schemas.DeletionRequestOut]
 )
 def list_pending_deletion_requests(
-    db: Session = Depends(get_db), _: models.User = Depends(require_admin)
+    db: Session = Depends(get_read_db), _: Principal = Depends(require_admin)
 ):
     """
     Lista todas las solicitudes de eliminación pendientes
     """
     requests = (
         db.query(models.DeletionRequest)
+        .options(
+            selectinload(models.DeletionRequest.publication).selectinload(
+                models.Publication.photos
+            )
+        )
         .filter(models.DeletionRequest.status == "pending")
         .order_by(models.DeletionRequest.created_at.desc())
         .all()
@@ -1273,6 +1327,7 @@ def list_pending_deletion_requests(
                 created_by_user_id=p.created_by_user_id,
                 created_at=p.created_at.isoformat() if p.created_at else "",
                 photos=[ph.url for ph in p.photos],
+                photo_variants=[ph.variants or {} for ph in p.photos],
                 is_favorite=False,
                 has_pending_deletion=True,
             )
@@ -1292,11 +1347,84 @@ def list_pending_deletion_requests(
     return out
 
 
+@router.post(
+    "/deletion-requests/batch/approve", response_model=schemas.BatchModerationResult
+)
+def approve_deletion_requests_batch(
+    payload: schemas.BatchModerationRequest,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+):
+    """
+    Aprueba varias solicitudes de eliminación pendientes y marca sus
+    publicaciones como eliminadas, en una sola transacción.
+    """
+    ids = list(dict.fromkeys(payload.ids))
+    DR = models.DeletionRequest
+    updated = list(
+        db.execute(
+            update(DR)
+            .where(DR.id.in_(ids), DR.status == "pending")
+            .values(status="approved", resolved_at=datetime.now(timezone.utc))
+            .returning(DR.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+    if updated:
+        reason = (
+            select(DR.reason)
+            .where(DR.publication_id == models.Publication.id, DR.id.in_(updated))
+            .order_by(DR.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        db.execute(
+            update(models.Publication)
+            .where(
+                models.Publication.id.in_(
+                    select(DR.publication_id).where(DR.id.in_(updated))
+                )
+            )
+            .values(status="deleted", rejection_reason=reason)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return batch_result(ids, updated)
+
+
+@router.post(
+    "/deletion-requests/batch/reject", response_model=schemas.BatchModerationResult
+)
+def reject_deletion_requests_batch(
+    payload: schemas.BatchModerationRequest,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+):
+    """Rechaza varias solicitudes de eliminación pendientes."""
+    ids = list(dict.fromkeys(payload.ids))
+    DR = models.DeletionRequest
+    updated = list(
+        db.execute(
+            update(DR)
+            .where(DR.id.in_(ids), DR.status == "pending")
+            .values(
+                status="rejected",
+                rejection_reason=payload.reason,
+                resolved_at=datetime.now(timezone.utc),
+            )
+            .returning(DR.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+    db.commit()
+    return batch_result(ids, updated)
+
+
 @router.put("/deletion-requests/{request_id}/approve", status_code=status.HTTP_200_OK)
 def approve_deletion_request(
     request_id: int,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """
     Aprueba la solicitud de eliminación y elimina la publicación
@@ -1331,7 +1459,7 @@ def reject_deletion_request(
     request_id: int,
     payload: RejectRequest,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """
     Rechaza la solicitud de eliminación
@@ -1364,7 +1492,7 @@ def update_favorite_status(
     pub_id: int,
     payload: FavoriteStatusUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Actualiza el estado de un favorito (pending/done)
@@ -1399,7 +1527,7 @@ def report_review(
     review_id: int,
     payload: schemas.ReviewReportCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Reporta una reseña por contenido inapropiado
@@ -1462,8 +1590,8 @@ def report_review(
 
 @router.get("/visited", response_model=list[schemas.PublicationOut])
 def list_visited(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_principal),
     user_id: int | None = Query(default=None),
 ):
     """
@@ -1474,8 +1602,10 @@ def list_visited(
     """
     target_user_id = user_id if user_id is not None else current_user.id
     logger.debug(
-        f"[visited] current_user={current_user.id}, user_id_param={user_id}, "
-        f"target_user_id={target_user_id}"
+        "visitadas: current_user=%s user_id_param=%s target_user_id=%s",
+        current_user.id,
+        user_id,
+        target_user_id,
     )
 
     visited = (
@@ -1488,7 +1618,7 @@ def list_visited(
         .all()
     )
 
-    logger.debug(f"[visited] target_user_id={target_user_id}, count={len(visited)}")
+    logger.debug("visitadas: target_user_id=%s count=%s", target_user_id, len(visited))
 
     return visited
 
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, selectinload
-from typing import List, Dict, Any
-from ..db import get_db
-from ..models import Review, ReviewReport, User, PublicationPhoto
-from .. import models
-from .auth import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timezone
+from ..db import get_db, get_read_db
+from ..models import Review, ReviewReport, User, Publication
+from .. import models, schemas
+from .auth import get_current_principal
+from ..utils.principal_cache import Principal
+from .publications import batch_result, update_publication_ratings
 
 
-def require_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+def require_admin(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     if current_user.role != "admin" and current_user.username != "admin":
         raise HTTPException(status_code=403, detail="Solo administradores")
     return current_user
@@ -16,136 +22,211 @@ def require_admin(current_user: models.User = Depends(get_current_user)) -> mode
 router = APIRouter(prefix="/api/reviews", tags=["reviews"])
 
 
+def _parse_report_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    if not cursor:
+        return None
+    try:
+        report_count, review_id, report_id = (int(v) for v in cursor.split(":"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return report_count, review_id, report_id
+
+
+def _fmt(dt) -> Optional[str]:
+    return dt.strftime("%Y-%m-%d %H:%M:%S") if dt else None
+
+
 @router.get("/reports/pending")
-async def get_pending_review_reports(
-    db: Session = Depends(get_db), _: models.User = Depends(require_admin)
+def get_pending_review_reports(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(
+        None, description="Valor de X-Next-Cursor de la página anterior"
+    ),
+    db: Session = Depends(get_read_db),
+    _: Principal = Depends(require_admin),
 ):
-    """Obtener reportes de reseñas pendientes (solo admin)"""
-    reports = db.query(ReviewReport).filter(ReviewReport.status == "pending").all()
+    """
+    Obtener reportes de reseñas pendientes (solo admin).
+    Las reseñas más reportadas aparecen primero. Paginado por cursor: si hay
+    más resultados, el header X-Next-Cursor trae el valor para ``cursor``.
+    """
+    report_counts = (
+        select(
+            ReviewReport.review_id.label("review_id"),
+            func.count(ReviewReport.id).label("report_count"),
+        )
+        .where(ReviewReport.status == "pending")
+        .group_by(ReviewReport.review_id)
+        .subquery()
+    )
+
+    q = (
+        db.query(ReviewReport, report_counts.c.report_count)
+        .join(report_counts, report_counts.c.review_id == ReviewReport.review_id)
+        .filter(ReviewReport.status == "pending")
+        .options(
+            joinedload(ReviewReport.reporter),
+            joinedload(ReviewReport.review).joinedload(Review.author),
+            joinedload(ReviewReport.review)
+            .joinedload(Review.publication)
+            .selectinload(Publication.photos),
+            joinedload(ReviewReport.review)
+            .joinedload(Review.publication)
+            .selectinload(Publication.categories),
+        )
+    )
+
+    after = _parse_report_cursor(cursor)
+    if after:
+        q = q.filter(
+            tuple_(report_counts.c.report_count, ReviewReport.review_id, ReviewReport.id)
+            < tuple_(*after)
+        )
+
+    rows = (
+        q.order_by(
+            report_counts.c.report_count.desc(),
+            ReviewReport.review_id.desc(),
+            ReviewReport.id.desc(),
+        )
+        .limit(limit + 1)
+        .all()
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_report, last_count = rows[-1]
+        response.headers["X-Next-Cursor"] = (
+            f"{last_count}:{last_report.review_id}:{last_report.id}"
+        )
 
     result = []
-    for report in reports:
-        review = db.query(Review).filter(Review.id == report.review_id).first()
-        reporter = db.query(User).filter(User.id == report.reporter_id).first()
-        photos_data = []
-        if review and review.publication:
-            photos = (
-                db.query(PublicationPhoto)
-                .filter(PublicationPhoto.publication_id == review.publication.id)
-                .order_by(PublicationPhoto.index_order)
-                .all()
-            )
-            photos_data = [photo.url for photo in photos]
-
-        report_data = {
-            "id": report.id,
-            "review_id": report.review_id,
-            "reporter_username": reporter.username if reporter else "Unknown",
-            "reason": report.reason,
-            "comments": report.comments,
-            "status": report.status,
-            "created_at": (
-                report.created_at.strftime("%Y-%m-%d %H:%M:%S")
-                if report.created_at
-                else None
-            ),
-            "resolved_at": (
-                report.resolved_at.strftime("%Y-%m-%d %H:%M:%S")
-                if report.resolved_at
-                else None
-            ),
-            "review": (
-                {
-                    "id": review.id if review else None,
-                    "rating": review.rating if review else 0,
-                    "comment": review.comment if review else "",
-                    "author_username": (
-                        review.author.username
-                        if review and review.author
-                        else "Unknown"
-                    ),
-                    "status": review.status if review else "unknown",
-                    "created_at": (
-                        review.created_at.strftime("%Y-%m-%d %H:%M:%S")
-                        if review and review.created_at
-                        else None
-                    ),
-                }
-                if review
-                else None
-            ),
-            "publication": (
-                {
-                    "id": (
-                        review.publication.id if review and review.publication else None
-                    ),
-                    "place_name": (
-                        review.publication.place_name
-                        if review and review.publication
-                        else "Unknown"
-                    ),
-                    "title": (
-                        review.publication.place_name
-                        if review and review.publication
-                        else "Unknown"
-                    ),
-                    "address": (
-                        review.publication.address
-                        if review and review.publication
-                        else ""
-                    ),
-                    "city": (
-                        review.publication.city if review and review.publication else ""
-                    ),
-                    "province": (
-                        review.publication.province
-                        if review and review.publication
-                        else ""
-                    ),
-                    "country": (
-                        review.publication.country
-                        if review and review.publication
-                        else ""
-                    ),
-                    "rating_avg": (
-                        review.publication.rating_avg
-                        if review and review.publication
-                        else 0.0
-                    ),
-                    "rating_count": (
-                        review.publication.rating_count
-                        if review and review.publication
-                        else 0
-                    ),
-                    "cost_per_day": (
-                        review.publication.cost_per_day
-                        if review and review.publication
-                        else 0.0
-                    ),
-                    "categories": (
-                        [cat.name for cat in review.publication.categories]
-                        if review
-                        and review.publication
-                        and review.publication.categories
-                        else []
-                    ),
-                    "photos": photos_data,
-                }
-                if review and review.publication
-                else None
-            ),
-        }
-
-        result.append(report_data)
+    for report, report_count in rows:
+        review = report.review
+        reporter = report.reporter
+        pub = review.publication if review else None
+
+        result.append(
+            {
+                "id": report.id,
+                "review_id": report.review_id,
+                "report_count": report_count,
+                "reporter_username": reporter.username if reporter else "Unknown",
+                "reason": report.reason,
+                "comments": report.comments,
+                "status": report.status,
+                "created_at": _fmt(report.created_at),
+                "resolved_at": _fmt(report.resolved_at),
+                "review": (
+                    {
+                        "id": review.id,
+                        "rating": review.rating,
+                        "comment": review.comment,
+                        "author_username": (
+                            review.author.username if review.author else "Unknown"
+                        ),
+                        "status": review.status,
+                        "created_at": _fmt(review.created_at),
+                    }
+                    if review
+                    else None
+                ),
+                "publication": (
+                    {
+                        "id": pub.id,
+                        "place_name": pub.place_name,
+                        "title": pub.place_name,
+                        "address": pub.address,
+                        "city": pub.city,
+                        "province": pub.province,
+                        "country": pub.country,
+                        "rating_avg": pub.rating_avg,
+                        "rating_count": pub.rating_count,
+                        "cost_per_day": pub.cost_per_day,
+                        "categories": [cat.name for cat in pub.categories],
+                        "photos": [
+                            photo.url
+                            for photo in sorted(
+                                pub.photos, key=lambda ph: ph.index_order
+                            )
+                        ],
+                    }
+                    if pub
+                    else None
+                ),
+            }
+        )
 
     return result
 
 
+def _resolve_pending_reports(
+    db: Session, ids: List[int], report_status: str, review_status: str, reason=None
+) -> List[int]:
+    """
+    Resuelve en bloque los reportes pendientes indicados, cambia el estado de
+    sus reseñas y recalcula una sola vez el rating de cada publicación afectada.
+    """
+    values = {"status": report_status, "resolved_at": datetime.now(timezone.utc)}
+    if report_status == "rejected":
+        values["rejection_reason"] = reason or ""
+    rows = db.execute(
+        update(ReviewReport)
+        .where(ReviewReport.id.in_(ids), ReviewReport.status == "pending")
+        .values(**values)
+        .returning(ReviewReport.id, ReviewReport.review_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not rows:
+        return []
+
+    review_ids = {review_id for _, review_id in rows}
+    db.execute(
+        update(Review)
+        .where(Review.id.in_(review_ids))
+        .values(status=review_status)
+        .execution_options(synchronize_session=False)
+    )
+    update_publication_ratings(
+        db,
+        db.execute(
+            select(Review.publication_id).where(Review.id.in_(review_ids)).distinct()
+        ).scalars(),
+    )
+    return [report_id for report_id, _ in rows]
+
+
+@router.post("/reports/batch/approve", response_model=schemas.BatchModerationResult)
+def approve_review_reports_batch(
+    payload: schemas.BatchModerationRequest,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+):
+    """Aprobar varios reportes (ocultar sus reseñas) en una sola transacción"""
+    ids = list(dict.fromkeys(payload.ids))
+    updated = _resolve_pending_reports(db, ids, "approved", "hidden")
+    db.commit()
+    return batch_result(ids, updated)
+
+
+@router.post("/reports/batch/reject", response_model=schemas.BatchModerationResult)
+def reject_review_reports_batch(
+    payload: schemas.BatchModerationRequest,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+):
+    """Rechazar varios reportes (mantener visibles sus reseñas)"""
+    ids = list(dict.fromkeys(payload.ids))
+    updated = _resolve_pending_reports(db, ids, "rejected", "approved", payload.reason)
+    db.commit()
+    return batch_result(ids, updated)
+
+
 @router.put("/reports/{report_id}/approve")
-async def approve_review_report(
+def approve_review_report(
     report_id: int,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Aprobar un reporte (ocultar la reseña)"""
     report = db.query(ReviewReport).filter(ReviewReport.id == report_id).first()
@@ -169,11 +250,11 @@ async def approve_review_report(
 
 
 @router.put("/reports/{report_id}/reject")
-async def reject_review_report(
+def reject_review_report(
     report_id: int,
     reject_data: Dict[str, Any] = None,
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Rechazar un reporte (mantener la reseña visible)"""
     report = db.query(ReviewReport).filter(ReviewReport.id == report_id).first()
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import List
-from ..db import get_db
+from ..db import get_read_db
 from .auth import get_current_user
 from .. import models, schemas
+from .publications import publication_data, publication_list_response
 
 router = APIRouter(prefix="/api/suggestions", tags=["suggestions"])
 
@@ -30,7 +31,7 @@ def score(dest, pref):
 
 @router.get("", response_model=List[schemas.PublicationOut])
 def get_suggestions(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user),
     sort: str = Query("desc", enum=["asc", "desc"]),
 ):
@@ -76,32 +77,11 @@ def get_suggestions(
         .all()
     }
 
-    results: List[schemas.PublicationOut] = []
-    for p in top10:
-        results.append(
-            schemas.PublicationOut(
-                id=p.id,
-                place_name=p.place_name,
-                country=p.country,
-                province=p.province,
-                city=p.city,
-                address=p.address,
-                status=p.status,
-                rejection_reason=getattr(p, "rejection_reason", None),
-                created_by_user_id=p.created_by_user_id,
-                created_at=p.created_at.isoformat() if p.created_at else "",
-                photos=[ph.url for ph in getattr(p, "photos", [])],
-                categories=[c.slug for c in getattr(p, "categories", [])],
-                rating_avg=getattr(p, "rating_avg", 0.0) or 0.0,
-                rating_count=getattr(p, "rating_count", 0) or 0,
-                continent=getattr(p, "continent", None),
-                climate=getattr(p, "climate", None),
-                activities=getattr(p, "activities", []),
-                cost_per_day=getattr(p, "cost_per_day", None),
-                duration_min=getattr(p, "duration_min", None),
-                is_favorite=p.id in favorite_ids,
-                has_pending_deletion=p.id in pending_deletion_ids,
-            )
+    return publication_list_response(
+        publication_data(
+            p,
+            is_favorite=p.id in favorite_ids,
+            has_pending_deletion=p.id in pending_deletion_ids,
         )
-
-    return results
+        for p in top10
+    )
@@ -1,13 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from ..db import get_db
+from ..db import get_db, get_read_db
 from .auth import get_current_user
 from .. import models
 from fastapi.responses import FileResponse
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
 import tempfile
 from datetime import datetime
 
@@ -15,7 +11,7 @@ router = APIRouter(prefix="/api/trips", tags=["trips"])
 
 
 @router.get("")
-def get_my_trips(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def get_my_trips(db: Session = Depends(get_read_db), user=Depends(get_current_user)):
     own_trips = db.query(models.Trip).filter_by(user_id=user.id).all()
     participant_links = (
         db.query(models.TripParticipant).filter_by(user_id=user.id).all()
@@ -164,7 +160,7 @@ def invite_user_to_trip(
 
 
 @router.get("/invitations")
-def get_my_invitations(db: Session = Depends(get_db), user=Depends(get_current_user)):
+def get_my_invitations(db: Session = Depends(get_read_db), user=Depends(get_current_user)):
     invites = (
         db.query(models.TripInvitation)
         .filter_by(invited_user_id=user.id, status="pending")
@@ -303,7 +299,7 @@ def delete_trip(
 
 @router.get("/{trip_id}/expenses")
 def get_trip_expenses(
-    trip_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)
+    trip_id: int, db: Session = Depends(get_read_db), user=Depends(get_current_user)
 ):
     trip = db.query(models.Trip).filter_by(id=trip_id).first()
     if not trip:
@@ -526,7 +522,7 @@ def update_expense(
 
 @router.get("/{trip_id}/expenses/export", response_class=FileResponse)
 def export_trip_expenses(
-    trip_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)
+    trip_id: int, db: Session = Depends(get_read_db), user=Depends(get_current_user)
 ):
 
     trip = db.query(models.Trip).filter_by(id=trip_id).first()
@@ -548,6 +544,18 @@ def export_trip_expenses(
     if not expenses:
         raise HTTPException(status_code=404, detail="No hay gastos registrados")
 
+    # reportlab se importa acá: solo lo usa este endpoint y demora el arranque
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import (
+        Paragraph,
+        SimpleDocTemplate,
+        Spacer,
+        Table,
+        TableStyle,
+    )
+
     tmpfile = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
     doc = SimpleDocTemplate(tmpfile.name, pagesize=A4)
     elements = []
@@ -618,7 +626,7 @@ def join_trip(
 
 @router.get("/{trip_id}/balances")
 def calculate_balances(
-    trip_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)
+    trip_id: int, db: Session = Depends(get_read_db), user=Depends(get_current_user)
 ):
     """
     Calcula saldos individuales tipo Splitwise:
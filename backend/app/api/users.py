@@ -7,26 +7,26 @@ from fastapi import (
     status,
     Query,
     Request,
+    Header,
+    BackgroundTasks,
 )
 from sqlalchemy.orm import Session, selectinload
-import shutil
-import uuid
 import os
 import json
 from json import JSONDecodeError
 from ..utils.match import compute_match_percentage
 from collections.abc import Sequence
-from ..db import get_db
-from .. import models, schemas
+from ..db import get_db, get_read_db
+from .. import models, points_ledger, schemas
 from .auth import get_current_user
+from ..utils import catalog_cache, image_variants, principal_cache, uploads
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
-UPLOAD_DIR = "backend/app/static/uploads"
-
 
 @router.put("/me/photo", response_model=schemas.UserOut)
 def upload_profile_photo(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -37,23 +37,26 @@ def upload_profile_photo(
             detail="Tipo de archivo inválido. Solo se permiten JPG y PNG.",
         )
 
-    file_extension = file.filename.split(".")[-1]
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    finally:
-        file.file.close()
-
-    relative_path = f"/static/uploads/{unique_filename}"
-    user.profile_picture_url = relative_path
-    db.add(user)
-    db.commit()
+    with uploads.discard_on_error(db):
+        try:
+            relative_path = uploads.store_upload(db, file)
+        finally:
+            file.file.close()
+
+        previous_url = user.profile_picture_url
+        # Si vuelve a subir la misma foto, esto compensa la referencia recién sumada.
+        orphaned = uploads.release(db, [previous_url])
+        user.profile_picture_url = relative_path
+        if previous_url != relative_path:
+            user.profile_picture_variants = None
+        db.add(user)
+        db.commit()
+    uploads.delete_orphans(db, orphaned)
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
+    background_tasks.add_task(
+        image_variants.process_profile_photo, db.get_bind(), user.id, relative_path
+    )
 
     return user
 
@@ -72,6 +75,7 @@ def subscribe_to_premium(
     user.role = "premium"
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
     return user
 
@@ -92,6 +96,7 @@ def cancel_subscription(
     user.role = "user"
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
     return user
 
@@ -99,7 +104,7 @@ def cancel_subscription(
 @router.get("/travelers", response_model=list[schemas.TravelerCardOut])
 def list_travelers(
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
@@ -191,45 +196,7 @@ def list_travelers(
     return travelers
 
 
-@router.get("/points")
-def get_user_points(
-    current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)
-):
-    """Obtiene los puntos actuales del usuario."""
-    user_points = (
-        db.query(models.UserPoints)
-        .filter(models.UserPoints.user_id == current_user.id)
-        .first()
-    )
-
-    return {"points": user_points.total_points if user_points else 0}
-
-
-@router.get("/points/movements")
-def get_points_movements(
-    current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)
-):
-    """Obtiene el historial de movimientos de puntos del usuario."""
-    movements = (
-        db.query(models.PointsTransaction)
-        .filter(models.PointsTransaction.user_id == current_user.id)
-        .order_by(models.PointsTransaction.created_at.desc())
-        .all()
-    )
-
-    return movements
-
-
-@router.get("/benefits")
-def get_premium_benefits(
-    current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)
-):
-    """Obtiene los beneficios premium disponibles."""
-    if current_user.role != "premium":
-        raise HTTPException(
-            status_code=403, detail="Función disponible solo para usuarios premium."
-        )
-
+def _active_benefits(db: Session) -> list:
     benefits = (
         db.query(models.PremiumBenefit)
         .filter(models.PremiumBenefit.is_active == True)
@@ -283,13 +250,34 @@ def get_premium_benefits(
     return result
 
 
+@router.get("/benefits")
+def get_premium_benefits(
+    request: Request,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """Obtiene los beneficios premium disponibles (cacheado por versión del catálogo)."""
+    if current_user.role != "premium":
+        raise HTTPException(
+            status_code=403, detail="Función disponible solo para usuarios premium."
+        )
+
+    entry = catalog_cache.get_or_build(db, "benefits", (), lambda: _active_benefits(db))
+    return catalog_cache.json_response(request, entry.etag, body=entry.body, private=True)
+
+
 @router.post("/benefits/{benefit_id}/redeem")
 def redeem_benefit(
     benefit_id: int,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(default=None),
 ):
-    """Canjear un beneficio premium por puntos."""
+    """
+    Canjear un beneficio premium por puntos.
+    El débito es atómico (no puede dejar el saldo negativo) y, si se envía
+    Idempotency-Key, un reintento devuelve el mismo voucher sin volver a cobrar.
+    """
     if current_user.role != "premium":
         raise HTTPException(
             status_code=403, detail="Función disponible solo para usuarios premium."
@@ -307,6 +295,12 @@ def redeem_benefit(
     if not benefit:
         raise HTTPException(status_code=404, detail="Beneficio no encontrado")
 
+    if idempotency_key:
+        idempotency_key = f"redeem:{current_user.id}:{idempotency_key}"
+        previous = points_ledger.find_transaction(db, idempotency_key)
+        if previous:
+            return _redeem_response(db, previous)
+
     existing = (
         db.query(models.UserBenefit)
         .filter(
@@ -327,18 +321,6 @@ def redeem_benefit(
     else:
         points_cost = 20
 
-    user_points = (
-        db.query(models.UserPoints)
-        .filter(models.UserPoints.user_id == current_user.id)
-        .first()
-    )
-
-    if not user_points or user_points.total_points < points_cost:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Puntos insuficientes. Necesitas {points_cost} puntos, tienes {user_points.total_points if user_points else 0}",
-        )
-
     import uuid
 
     voucher_code = f"PG{str(uuid.uuid4()).replace('-', '')[:10].upper()}"
@@ -351,32 +333,50 @@ def redeem_benefit(
         is_used=False,
     )
     db.add(user_benefit)
+    db.flush()
 
-    user_points.total_points -= points_cost
+    try:
+        transaction = points_ledger.record_movement(
+            db,
+            user_id=current_user.id,
+            points=-points_cost,
+            transaction_type="redeemed",
+            description=f"Beneficio: {benefit.title}",
+            reference_id=user_benefit.id,
+            idempotency_key=idempotency_key,
+            require_balance=True,
+        )
+    except points_ledger.InsufficientPointsError:
+        db.rollback()
+        balance = points_ledger.get_balance(db, current_user.id)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Puntos insuficientes. Necesitas {points_cost} puntos, tienes {balance}",
+        )
 
-    transaction = models.PointsTransaction(
-        user_id=current_user.id,
-        points=-points_cost,
-        transaction_type="redeemed",
-        description=f"Beneficio: {benefit.title}",
-    )
-    db.add(transaction)
+    if transaction is None:
+        # Otro request con la misma Idempotency-Key ganó la carrera.
+        db.rollback()
+        return _redeem_response(db, points_ledger.find_transaction(db, idempotency_key))
 
     db.commit()
-    db.refresh(user_benefit)
+    return _redeem_response(db, transaction)
+
 
+def _redeem_response(db: Session, transaction: models.PointsTransaction) -> dict:
+    user_benefit = db.get(models.UserBenefit, transaction.reference_id)
     return {
         "success": True,
         "message": "Beneficio obtenido exitosamente",
-        "voucher_code": voucher_code,
-        "points_used": points_cost,
-        "remaining_points": user_points.total_points,
+        "voucher_code": user_benefit.voucher_code,
+        "points_used": user_benefit.points_cost,
+        "remaining_points": points_ledger.get_balance(db, transaction.user_id),
     }
 
 
 @router.get("/my-benefits")
 def get_user_benefits(
-    current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: models.User = Depends(get_current_user), db: Session = Depends(get_read_db)
 ):
     """Obtiene los beneficios que el usuario ha canjeado."""
     if current_user.role != "premium":
@@ -436,7 +436,7 @@ def get_user_benefits(
 @router.get("/{user_id}", response_model=schemas.UserOut)
 def get_user_by_id(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
@@ -0,0 +1,37 @@
+"""
+Archiva movimientos de puntos viejos para mantener acotada la tabla
+points_transactions.
+
+Uso:
+    python -m backend.app.archive_points --older-than-days 365
+"""
+
+import argparse
+import os
+
+from .db import SessionLocal
+from .points_ledger import archive_transactions
+
+DEFAULT_ARCHIVE_DAYS = int(os.getenv("POINTS_ARCHIVE_AFTER_DAYS", "365"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--older-than-days", type=int, default=DEFAULT_ARCHIVE_DAYS)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        moved = archive_transactions(db, args.older_than_days, args.batch_size)
+        print(f"✅ {moved} movimientos archivados (> {args.older_than_days} días)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error archivando movimientos: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark de SQLite: configuración por defecto vs. perfil de producción
+(WAL + pragmas de db.SQLITE_PRAGMAS).
+
+Simula varios workers de uvicorn con procesos que escriben (transacciones
+cortas de un INSERT) y leen (búsqueda por id y un listado) sobre el mismo
+archivo a la vez, y reporta operaciones por segundo y errores de
+"database is locked". Usa una base temporal, no toca DATABASE_URL.
+
+Uso:
+    python -m backend.app.bench_sqlite
+    python -m backend.app.bench_sqlite --writers 4 --readers 8 --seconds 10
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from .db import apply_sqlite_pragmas
+
+SEED_ROWS = 20_000
+
+
+def _connect(path: str, tuned: bool) -> sqlite3.Connection:
+    # timeout=5 es el valor por defecto de sqlite3, igual que antes del perfil
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    if tuned:
+        apply_sqlite_pragmas(conn)
+    return conn
+
+
+def _setup(path: str, tuned: bool) -> None:
+    conn = _connect(path, tuned)
+    conn.execute(
+        "CREATE TABLE items (id INTEGER PRIMARY KEY, city TEXT, description TEXT, created_at REAL)"
+    )
+    conn.execute("CREATE INDEX ix_items_city ON items (city)")
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO items (city, description, created_at) VALUES (?, ?, ?)",
+        (
+            (f"ciudad-{i % 200}", "Lugar para visitar " * 10, time.time())
+            for i in range(SEED_ROWS)
+        ),
+    )
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def _writer(path, tuned, deadline, results):
+    conn = _connect(path, tuned)
+    done = errors = 0
+    while time.time() < deadline:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO items (city, description, created_at) VALUES (?, ?, ?)",
+                (f"ciudad-{random.randrange(200)}", "Nuevo lugar " * 10, time.time()),
+            )
+            conn.execute("COMMIT")
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+    conn.close()
+    results.put(("write", done, errors))
+
+
+def _reader(path, tuned, deadline, results):
+    conn = _connect(path, tuned)
+    done = errors = 0
+    while time.time() < deadline:
+        try:
+            conn.execute(
+                "SELECT * FROM items WHERE id = ?", (random.randrange(1, SEED_ROWS),)
+            ).fetchone()
+            conn.execute(
+                "SELECT id, city FROM items WHERE city = ? ORDER BY created_at DESC LIMIT 50",
+                (f"ciudad-{random.randrange(200)}",),
+            ).fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    conn.close()
+    results.put(("read", done, errors))
+
+
+def run(tuned: bool, writers: int, readers: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        _setup(path, tuned)
+        results = mp.Queue()
+        deadline = time.time() + seconds
+        procs = [
+            mp.Process(target=_writer, args=(path, tuned, deadline, results))
+            for _ in range(writers)
+        ] + [
+            mp.Process(target=_reader, args=(path, tuned, deadline, results))
+            for _ in range(readers)
+        ]
+        for p in procs:
+            p.start()
+        totals = {"write": [0, 0], "read": [0, 0]}
+        for _ in procs:
+            kind, done, errors = results.get()
+            totals[kind][0] += done
+            totals[kind][1] += errors
+        for p in procs:
+            p.join()
+    return {
+        "writes_per_s": totals["write"][0] / seconds,
+        "reads_per_s": totals["read"][0] / seconds,
+        "lock_errors": totals["write"][1] + totals["read"][1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{args.writers} escritores, {args.readers} lectores, {args.seconds:g} s por perfil\n"
+    )
+    print(f"{'perfil':<12}{'escrituras/s':>14}{'lecturas/s':>14}{'errores lock':>14}")
+    for name, tuned in (("por defecto", False), ("producción", True)):
+        r = run(tuned, args.writers, args.readers, args.seconds)
+        print(
+            f"{name:<12}{r['writes_per_s']:>14.0f}{r['reads_per_s']:>14.0f}{r['lock_errors']:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
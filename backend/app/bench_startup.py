@@ -0,0 +1,74 @@
+"""
+Benchmark del arranque en frío de un worker.
+
+Mide, en procesos nuevos de Python (sin caché de módulos), cuánto tarda
+``import backend.app.main`` y cuánto hasta responder el primer pedido a
+/api/health. Con --eager importa además google.generativeai y reportlab
+antes de la app, como pasaba cuando se cargaban al importar los routers,
+para comparar. Usa una base SQLite temporal, no toca DATABASE_URL.
+
+Uso:
+    python -m backend.app.bench_startup
+    python -m backend.app.bench_startup --runs 10 --eager
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+_CHILD = """
+import json, time
+t0 = time.perf_counter()
+if {eager}:
+    import google.generativeai, reportlab.platypus
+import backend.app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(backend.app.main.app) as client:
+    client.get("/api/health").raise_for_status()
+t2 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "first_request": t2 - t0}}))
+"""
+
+
+def _run_once(eager: bool, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(eager=eager)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(eager: bool, runs: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/bench.db")
+        samples = [_run_once(eager, env) for _ in range(runs)]
+    return {
+        key: statistics.median(s[key] for s in samples)
+        for key in ("import", "first_request")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true")
+    args = parser.parse_args()
+
+    profiles = [("diferido", False)] + ([("eager", True)] if args.eager else [])
+    print(f"mediana de {args.runs} procesos\n")
+    print(f"{'perfil':<12}{'import (s)':>14}{'1er pedido (s)':>16}")
+    for name, eager in profiles:
+        r = run(eager, args.runs)
+        print(f"{name:<12}{r['import']:>14.2f}{r['first_request']:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,24 @@
-from sqlalchemy import text
+"""
+Migraciones del esquema.
+
+``run_migrations`` aplica, en orden y una sola vez, las migraciones de
+MIGRATIONS que todavía no figuran en la tabla ``schema_migrations``. Cada
+una corre en su propia transacción junto con el INSERT de su versión, así
+que queda aplicada y registrada entera o nada. Si dos procesos la corren a
+la vez (p.ej. dos contenedores), el que llega segundo choca con la clave
+primaria de la versión y la saltea.
+
+Se corre una vez por despliegue, antes de levantar los workers (ver el CMD
+del Dockerfile), no en el arranque de cada proceso:
+    python -m backend.app.db_migrations
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select
+from sqlalchemy.exc import IntegrityError
+
+from . import models
 
 PUBLICATIONS_COLUMNS = [
     ("place_name", "TEXT"),
@@ -11,7 +31,7 @@ PUBLICATIONS_COLUMNS = [
     ("rating_count", "INTEGER"),
     ("continent", "TEXT"),
     ("climate", "TEXT"),
-    ("activities", "TEXT"),
+    ("activities", "JSON"),
     ("cost_per_day", "REAL"),
     ("duration_min", "INTEGER"),
     ("status", "TEXT"),
@@ -20,151 +40,226 @@ PUBLICATIONS_COLUMNS = [
 ]
 
 
-def ensure_min_schema(engine):
+def _columns(conn, table: str) -> set:
+    """Columnas existentes de ``table`` (vacío si la tabla no existe)."""
+    insp = inspect(conn)
+    if not insp.has_table(table):
+        return set()
+    return {col["name"] for col in insp.get_columns(table)}
+
+
+def _add_column(conn, table: str, column: str, coltype: str, default: str = "") -> None:
+    if coltype == "JSON" and conn.dialect.name == "postgresql":
+        coltype = "JSONB"
+    conn.exec_driver_sql(
+        f"ALTER TABLE {table} ADD COLUMN {column} {coltype}"
+        + (f" DEFAULT {default}" if default else "")
+    )
+
+
+def _min_schema(conn):
     """
     Asegura que la tabla publications tenga las columnas mínimas.
-    No borra datos. Para SQLite: agrega columnas faltantes con ALTER TABLE.
-    También crea las tablas auxiliares si no existen (favorites, deletion_requests).
+    No borra datos: agrega columnas faltantes con ALTER TABLE y crea las
+    tablas auxiliares si no existen (favorites, deletion_requests, puntos).
+    Funciona en SQLite y PostgreSQL (inspecciona el esquema con inspect()).
+    Es la migración 1: en bases anteriores a schema_migrations ya estaba
+    aplicada en parte, por eso todo es idempotente.
     """
-    with engine.begin() as conn:
-        pragma = conn.exec_driver_sql("PRAGMA table_info(publications)").fetchall()
-        existing = {row[1] for row in pragma}
-
-        for col, coltype in PUBLICATIONS_COLUMNS:
-            if col not in existing:
-                if col == "created_at":
-                    conn.exec_driver_sql(
-                        f'ALTER TABLE publications ADD COLUMN {col} {coltype} DEFAULT (datetime("now"))'
-                    )
-                elif col == "status":
-                    conn.exec_driver_sql(
-                        f'ALTER TABLE publications ADD COLUMN {col} {coltype} DEFAULT "approved"'
-                    )
-                else:
-                    conn.exec_driver_sql(
-                        f"ALTER TABLE publications ADD COLUMN {col} {coltype}"
-                    )
+    existing = _columns(conn, "publications")
 
-        conn.exec_driver_sql(
-            """
-            CREATE TABLE IF NOT EXISTS favorites (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                publication_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT (datetime('now')),
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (publication_id) REFERENCES publications(id) ON DELETE CASCADE,
-                UNIQUE(user_id, publication_id)
-            )
-        """
-        )
-        conn.exec_driver_sql(
-            "CREATE INDEX IF NOT EXISTS idx_favorites_user_id ON favorites(user_id)"
-        )
-        conn.exec_driver_sql(
-            "CREATE INDEX IF NOT EXISTS idx_favorites_publication_id ON favorites(publication_id)"
-        )
+    for col, coltype in PUBLICATIONS_COLUMNS:
+        if col not in existing:
+            if col == "created_at":
+                # SQLite no admite defaults no constantes en ADD COLUMN
+                _add_column(conn, "publications", col, coltype)
+                conn.exec_driver_sql(
+                    "UPDATE publications SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL"
+                )
+            elif col == "status":
+                _add_column(conn, "publications", col, coltype, "'approved'")
+            else:
+                _add_column(conn, "publications", col, coltype)
 
+    models.Favorite.__table__.create(conn, checkfirst=True)
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_favorites_user_id ON favorites(user_id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_favorites_publication_id ON favorites(publication_id)"
+    )
+
+    models.DeletionRequest.__table__.create(conn, checkfirst=True)
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_deletion_requests_publication_id ON deletion_requests(publication_id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_deletion_requests_status ON deletion_requests(status)"
+    )
+
+    existing_itinerary = _columns(conn, "itineraries")
+    if existing_itinerary:
+        if "publication_ids" not in existing_itinerary:
+            _add_column(conn, "itineraries", "publication_ids", "JSON")
+
+        if "cant_persons" not in existing_itinerary:
+            _add_column(conn, "itineraries", "cant_persons", "INTEGER", "1")
+
+        if "comments" not in existing_itinerary:
+            _add_column(conn, "itineraries", "comments", "TEXT")
+
+    existing_deletion = _columns(conn, "deletion_requests")
+
+    if "rejection_reason" not in existing_deletion:
+        _add_column(conn, "deletion_requests", "rejection_reason", "TEXT")
+
+    if "reason" not in existing_deletion:
+        _add_column(conn, "deletion_requests", "reason", "TEXT")
+
+    models.UserPoints.__table__.create(conn, checkfirst=True)
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_user_points_user_id ON user_points(user_id)"
+    )
+
+    models.PointsTransaction.__table__.create(conn, checkfirst=True)
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_points_transactions_user_id ON points_transactions(user_id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_points_transactions_created_at ON points_transactions(created_at)"
+    )
+
+    existing_points = _columns(conn, "points_transactions")
+
+    if "idempotency_key" not in existing_points:
+        _add_column(conn, "points_transactions", "idempotency_key", "TEXT")
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_points_transactions_idempotency_key ON points_transactions(idempotency_key)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_points_transactions_user_created ON points_transactions(user_id, created_at, id)"
+    )
+
+    if _columns(conn, "review_reports"):
         conn.exec_driver_sql(
-            """
-            CREATE TABLE IF NOT EXISTS deletion_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                publication_id INTEGER NOT NULL,
-                requested_by_user_id INTEGER NOT NULL,
-                status TEXT NOT NULL DEFAULT 'pending',
-                reason TEXT,
-                rejection_reason TEXT,
-                created_at TIMESTAMP DEFAULT (datetime('now')),
-                resolved_at TIMESTAMP,
-                FOREIGN KEY (publication_id) REFERENCES publications(id) ON DELETE CASCADE,
-                FOREIGN KEY (requested_by_user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        """
-        )
-        conn.exec_driver_sql(
-            "CREATE INDEX IF NOT EXISTS idx_deletion_requests_publication_id ON deletion_requests(publication_id)"
-        )
-        conn.exec_driver_sql(
-            "CREATE INDEX IF NOT EXISTS idx_deletion_requests_status ON deletion_requests(status)"
+            "CREATE INDEX IF NOT EXISTS ix_review_reports_status_review ON review_reports(status, review_id)"
         )
 
-        itinerary_check = conn.exec_driver_sql(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='itineraries'"
-        ).fetchone()
+    for table, column in (
+        ("publication_photos", "variants"),
+        ("users", "profile_picture_variants"),
+    ):
+        cols = _columns(conn, table)
+        if cols and column not in cols:
+            _add_column(conn, table, column, "JSON")
 
-        if itinerary_check:
-            pragma_itinerary = conn.exec_driver_sql(
-                "PRAGMA table_info(itineraries)"
-            ).fetchall()
-            existing_itinerary = {row[1] for row in pragma_itinerary}
 
-            if "publication_ids" not in existing_itinerary:
-                conn.exec_driver_sql(
-                    "ALTER TABLE itineraries ADD COLUMN publication_ids TEXT"
-                )
+def _has_index(conn, table: str, columns: tuple) -> bool:
+    """¿Hay un índice (o UNIQUE) cuyas primeras columnas son ``columns``?"""
+    insp = inspect(conn)
+    candidates = insp.get_indexes(table) + insp.get_unique_constraints(table)
+    return any(
+        tuple(c["column_names"][: len(columns)]) == columns for c in candidates
+    )
 
-            if "cant_persons" not in existing_itinerary:
-                conn.exec_driver_sql(
-                    "ALTER TABLE itineraries ADD COLUMN cant_persons INTEGER DEFAULT 1"
-                )
 
-            if "comments" not in existing_itinerary:
-                conn.exec_driver_sql("ALTER TABLE itineraries ADD COLUMN comments TEXT")
+def _model_index(table: str, name: str):
+    return next(i for i in models.Base.metadata.tables[table].indexes if i.name == name)
 
-        pragma_deletion = conn.exec_driver_sql(
-            "PRAGMA table_info(deletion_requests)"
-        ).fetchall()
-        existing_deletion = {row[1] for row in pragma_deletion}
 
-        if "rejection_reason" not in existing_deletion:
+def _hot_path_indexes(conn):
+    """
+    Índices de las consultas más frecuentes (ver __table_args__ de los
+    modelos). create_all solo los crea en tablas nuevas; acá se agregan a
+    las bases existentes.
+    """
+    for table, name in (
+        ("publications", "ix_publications_status_created"),
+        ("expenses", "ix_expenses_trip_user"),
+        ("trip_participants", "ix_trip_participants_trip_user"),
+        ("itineraries", "ix_itineraries_user_status_created"),
+        ("deletion_requests", "ix_deletion_requests_pending"),
+    ):
+        if _columns(conn, table):
+            _model_index(table, name).create(conn, checkfirst=True)
+
+    # el índice parcial de pendientes reemplaza a los de deletion_requests.status
+    conn.exec_driver_sql("DROP INDEX IF EXISTS idx_deletion_requests_status")
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_deletion_requests_status")
+
+    # favorites y review_likes ya tienen un UNIQUE sobre el par en los
+    # modelos; solo las tablas creadas antes de esa restricción lo necesitan
+    for table, columns, name in (
+        ("favorites", ("user_id", "publication_id"), "ix_favorites_user_publication"),
+        ("review_likes", ("review_id", "user_id"), "ix_review_likes_review_user"),
+    ):
+        if _columns(conn, table) and not _has_index(conn, table, columns):
             conn.exec_driver_sql(
-                "ALTER TABLE deletion_requests ADD COLUMN rejection_reason TEXT"
+                f"CREATE INDEX {name} ON {table}({', '.join(columns)})"
             )
 
-        if "reason" not in existing_deletion:
-            conn.exec_driver_sql("ALTER TABLE deletion_requests ADD COLUMN reason TEXT")
 
-        user_points_check = conn.exec_driver_sql(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='user_points'"
-        ).fetchone()
+# (versión, descripción, función que recibe la conexión). Solo se agregan
+# al final; una migración ya publicada no se modifica.
+MIGRATIONS = [
+    (1, "esquema mínimo (columnas y tablas auxiliares)", _min_schema),
+    (2, "índices de consultas frecuentes", _hot_path_indexes),
+]
 
-        if not user_points_check:
-            conn.exec_driver_sql(
-                """
-                CREATE TABLE user_points (
-                    user_id INTEGER PRIMARY KEY,
-                    total_points INTEGER NOT NULL DEFAULT 0,
-                    updated_at TIMESTAMP DEFAULT (datetime('now')),
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-            """
-            )
-            conn.exec_driver_sql(
-                "CREATE INDEX IF NOT EXISTS idx_user_points_user_id ON user_points(user_id)"
-            )
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
 
-        points_transactions_check = conn.exec_driver_sql(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='points_transactions'"
-        ).fetchone()
 
-        if not points_transactions_check:
-            conn.exec_driver_sql(
-                """
-                CREATE TABLE points_transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    points INTEGER NOT NULL,
-                    transaction_type TEXT NOT NULL,
-                    description TEXT,
-                    reference_id INTEGER,
-                    created_at TIMESTAMP DEFAULT (datetime('now')),
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+def applied_versions(engine) -> set:
+    with engine.connect() as conn:
+        if not inspect(conn).has_table("schema_migrations"):
+            return set()
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine) -> list:
+    """Aplica las migraciones pendientes y devuelve las versiones aplicadas."""
+    _metadata.create_all(engine)
+    done = applied_versions(engine)
+    applied = []
+    for version, name, upgrade in MIGRATIONS:
+        if version in done:
+            continue
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    schema_migrations.insert().values(
+                        version=version,
+                        name=name,
+                        applied_at=datetime.now(timezone.utc),
+                    )
                 )
-            """
-            )
-            conn.exec_driver_sql(
-                "CREATE INDEX IF NOT EXISTS idx_points_transactions_user_id ON points_transactions(user_id)"
-            )
-            conn.exec_driver_sql(
-                "CREATE INDEX IF NOT EXISTS idx_points_transactions_created_at ON points_transactions(created_at)"
-            )
+                upgrade(conn)
+        except IntegrityError:
+            if version in applied_versions(engine):
+                continue  # otro proceso la aplicó mientras tanto
+            raise
+        applied.append(version)
+    return applied
+
+
+def main():
+    from .db import Base, engine, log_db_info
+
+    log_db_info()
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+    if applied:
+        print(f"[DB] Migraciones aplicadas: {applied}")
+    else:
+        print("[DB] El esquema está al día")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Importa publicaciones desde un CSV o JSONL sin pasar por la API.
+
+Uso:
+    python -m backend.app.import_publications lugares.csv
+    python -m backend.app.import_publications lugares.jsonl --batch-size 1000
+"""
+
+import argparse
+
+from .api.publication_import import (
+    DEFAULT_IMPORT_BATCH_SIZE,
+    import_publications,
+    iter_csv_rows,
+    iter_jsonl_rows,
+)
+from .db import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+
+    def _progress(s):
+        print(
+            f"… {s['processed']} filas procesadas, {s['inserted']} insertadas, {s['failed']} con error"
+        )
+
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as f:
+            rows = iter_csv_rows(f) if fmt == "csv" else iter_jsonl_rows(f)
+            summary = import_publications(
+                db, rows, batch_size=args.batch_size, progress=_progress
+            )
+    finally:
+        db.close()
+
+    for err in summary["errors"]:
+        print(f"❌ línea {err['line']}: {err['error']}")
+    if summary["stopped_at_line"]:
+        print(f"⚠️ lectura cortada en la línea {summary['stopped_at_line']}")
+    print(f"✅ {summary['inserted']} publicaciones importadas, {summary['failed']} con error")
+
+
+if __name__ == "__main__":
+    main()
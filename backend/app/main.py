@@ -1,13 +1,16 @@
+import logging
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 from pathlib import Path
 from backend.app.api import suggestions
-from .db import Base, engine, log_db_info
+from .db import engine, read_engine
 from .api import (
+    admin_debug,
     auth,
     health,
+    metrics,
     users,
     publications,
     debug,
@@ -18,25 +21,54 @@ from .api import (
     trips,
     reviews,
     points,
+    publication_import,
 )
-from .db_migrations import ensure_min_schema
 from .api import invitations
+from .utils.compression import CompressionMiddleware
+from .utils.log_config import configure_logging
+from .utils.metrics import MetricsMiddleware
+from .utils.profiling import ProfilingMiddleware, instrument_routes
+from .utils.query_stats import QueryStatsMiddleware
+from .utils.read_your_writes import ReadYourWritesMiddleware
+from .utils.static_files import CachedStaticFiles
+from .utils.uploads import UploadSizeLimitMiddleware
 
-app = FastAPI(title="Plan&Go API")
+configure_logging()
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Plan&Go API", default_response_class=ORJSONResponse)
+
+# perfilado de pedidos por admins con el header X-Profile (utils/profiling.py);
+# apagado por defecto: sin él no se envuelve ningún endpoint ni se miran headers
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
 
 os.makedirs("backend/app/static/uploads", exist_ok=True)
-app.mount("/static", StaticFiles(directory="backend/app/static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="backend/app/static"), name="static")
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, authorize=admin_debug.authorize_profiling)
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(CompressionMiddleware)
+if read_engine is not engine:
+    app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # cursor de los listados paginados (movimientos de puntos, reportes)
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(auth.router)
+# points antes que users: /api/users/{user_id} capturaría /api/users/points
+app.include_router(points.router, prefix="/api/users")
 app.include_router(users.router)
 app.include_router(publications.router)
+app.include_router(publication_import.router)
 app.include_router(reviews.router)
 app.include_router(categories.router)
 app.include_router(preferences.router)
@@ -45,7 +77,7 @@ app.include_router(itineraries.router)
 app.include_router(invitations.router)
 app.include_router(expenses.router)
 app.include_router(trips.router)
-app.include_router(points.router, prefix="/api/users")
+app.include_router(admin_debug.router)
 
 if os.getenv("ENV", "dev") == "dev":
     try:
@@ -53,19 +85,16 @@ if os.getenv("ENV", "dev") == "dev":
 
         app.include_router(debug_router.router)
     except Exception as e:
-        print(f"[DEBUG] router no cargado: {e}")
+        logger.warning("Router de debug no cargado: %s", e)
+
+if PROFILING_ENABLED:
+    instrument_routes(app)
 
 frontend_build = Path(__file__).resolve().parents[2] / "frontend" / "dist"
 if frontend_build.exists():
-    app.mount("/", StaticFiles(directory=frontend_build, html=True), name="frontend")
+    app.mount("/", CachedStaticFiles(directory=frontend_build, html=True), name="frontend")
 
 
-@app.on_event("startup")
-def on_startup():
-    log_db_info()
-    Base.metadata.create_all(bind=engine)
-    try:
-        ensure_min_schema(engine)
-        print("[DB] ensure_min_schema OK")
-    except Exception as e:
-        print(f"[DB] ensure_min_schema skipped/error: {e}")
+# Las tablas y migraciones no se tocan al arrancar (cada worker lo haría de
+# nuevo en cada reinicio): se aplican antes con
+#   python -m backend.app.db_migrations
@@ -11,11 +11,17 @@ from sqlalchemy import (
     Float,
     UniqueConstraint,
     Boolean,
+    Index,
+    text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.types import JSON
 from .db import Base
 
+# JSON en SQLite, JSONB en PostgreSQL (binario e indexable)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -33,6 +39,7 @@ class User(Base):
     security_question_2 = Column(String, nullable=True)
     hashed_answer_2 = Column(String, nullable=True)
     profile_picture_url = Column(String, nullable=True)
+    profile_picture_variants = Column(JSONType, nullable=True)
     role = Column(
         String(20), nullable=False, server_default="user", default="user", index=True
     )
@@ -98,11 +105,11 @@ class Publication(Base):
 
     continent = Column(String, nullable=True)
     climate = Column(String, nullable=True)
-    activities = Column(JSON, nullable=True)
+    activities = Column(JSONType, nullable=True)
     cost_per_day = Column(Float, nullable=True)
     duration_min = Column(Integer, nullable=True)
-    available_days = Column(JSON, nullable=True)
-    available_hours = Column(JSON, nullable=True)
+    available_days = Column(JSONType, nullable=True)
+    available_hours = Column(JSONType, nullable=True)
 
     rating_avg = Column(Float, nullable=False, server_default="0")
     rating_count = Column(Integer, nullable=False, server_default="0")
@@ -118,6 +125,10 @@ class Publication(Base):
         "Category", secondary=publication_categories, backref="publications"
     )
 
+    __table_args__ = (
+        Index("ix_publications_status_created", "status", "created_at"),
+    )
+
 
 class PublicationPhoto(Base):
     __tablename__ = "publication_photos"
@@ -127,6 +138,7 @@ class PublicationPhoto(Base):
     )
     url = Column(String(400), nullable=False)
     index_order = Column(Integer, nullable=False, server_default="0", default=0)
+    variants = Column(JSONType, nullable=True)
     publication = relationship("Publication", back_populates="photos")
 
 
@@ -198,7 +210,13 @@ class Review(Base):
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
-    publication = relationship("Publication", backref="reviews")
+    # passive_deletes: al borrar la publicación la base borra las reseñas (y
+    # sus likes, comentarios y reportes) por ondelete=CASCADE; sin esto el ORM
+    # intentaría dejar publication_id en NULL
+    publication = relationship(
+        "Publication",
+        backref=backref("reviews", cascade="all, delete-orphan", passive_deletes=True),
+    )
     author = relationship("User")
 
     likes = relationship(
@@ -246,6 +264,7 @@ class ReviewReport(Base):
 
     __table_args__ = (
         UniqueConstraint("review_id", "reporter_id", name="uq_review_report"),
+        Index("ix_review_reports_status_review", "status", "review_id"),
     )
 
 
@@ -258,9 +277,9 @@ class UserPreference(Base):
 
     budget_min = Column(Float, nullable=True)
     budget_max = Column(Float, nullable=True)
-    climates = Column(JSON, nullable=True)
-    activities = Column(JSON, nullable=True)
-    continents = Column(JSON, nullable=True)
+    climates = Column(JSONType, nullable=True)
+    activities = Column(JSONType, nullable=True)
+    continents = Column(JSONType, nullable=True)
     duration_min_days = Column(Integer, nullable=True)
     duration_max_days = Column(Integer, nullable=True)
 
@@ -310,11 +329,7 @@ class DeletionRequest(Base):
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
     status = Column(
-        String(20),
-        nullable=False,
-        server_default="pending",
-        default="pending",
-        index=True,
+        String(20), nullable=False, server_default="pending", default="pending"
     )
     reason = Column(Text, nullable=True)
     rejection_reason = Column(Text, nullable=True)
@@ -324,6 +339,17 @@ class DeletionRequest(Base):
     publication = relationship("Publication")
     requested_by = relationship("User")
 
+    # índice parcial en vez de uno sobre status: solo se consultan las
+    # pendientes (ordenadas por fecha) y son pocas comparadas con el total
+    __table_args__ = (
+        Index(
+            "ix_deletion_requests_pending",
+            "created_at",
+            sqlite_where=text("status = 'pending'"),
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
 
 class Itinerary(Base):
     __tablename__ = "itineraries"
@@ -342,8 +368,8 @@ class Itinerary(Base):
     departure_time = Column(String, nullable=True)
     comments = Column(Text, nullable=True)
     generated_itinerary = Column(Text, nullable=True)
-    publication_ids = Column(JSON, nullable=True)
-    validation_metadata = Column(JSON, nullable=True)
+    publication_ids = Column(JSONType, nullable=True)
+    validation_metadata = Column(JSONType, nullable=True)
     status = Column(
         String(20),
         nullable=False,
@@ -355,6 +381,10 @@ class Itinerary(Base):
 
     user = relationship("User", backref="itineraries")
 
+    __table_args__ = (
+        Index("ix_itineraries_user_status_created", "user_id", "status", "created_at"),
+    )
+
 
 class SavedItinerary(Base):
     __tablename__ = "saved_itineraries"
@@ -379,7 +409,7 @@ class SavedItinerary(Base):
     departure_time = Column(String, nullable=True)
     comments = Column(Text, nullable=True)
     generated_itinerary = Column(Text, nullable=True)
-    publication_ids = Column(JSON, nullable=True)
+    publication_ids = Column(JSONType, nullable=True)
     original_author_id = Column(
         Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True
     )
@@ -430,7 +460,12 @@ class PremiumBenefit(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    publication = relationship("Publication", backref="premium_benefits")
+    publication = relationship(
+        "Publication",
+        backref=backref(
+            "premium_benefits", cascade="all, delete-orphan", passive_deletes=True
+        ),
+    )
 
 
 class UserBenefit(Base):
@@ -473,6 +508,8 @@ class Expense(Base):
     user = relationship("User", backref="expenses")
     trip = relationship("Trip", back_populates="expenses")
 
+    __table_args__ = (Index("ix_expenses_trip_user", "trip_id", "user_id"),)
+
 
 class Trip(Base):
     __tablename__ = "trips"
@@ -506,6 +543,8 @@ class TripParticipant(Base):
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
 
+    __table_args__ = (Index("ix_trip_participants_trip_user", "trip_id", "user_id"),)
+
 
 class TripInvitation(Base):
     __tablename__ = "trip_invitations"
@@ -562,6 +601,77 @@ class PointsTransaction(Base):
     transaction_type = Column(String, nullable=False)
     description = Column(String, nullable=True)
     reference_id = Column(Integer, nullable=True)
+    idempotency_key = Column(String(120), nullable=True, unique=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", backref="points_transactions")
+
+    __table_args__ = (
+        Index(
+            "ix_points_transactions_user_created", "user_id", "created_at", "id"
+        ),
+    )
+
+
+class PointsTransactionArchive(Base):
+    """Movimientos de puntos viejos movidos fuera de la tabla caliente"""
+
+    __tablename__ = "points_transactions_archive"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    points = Column(Integer, nullable=False)
+    transaction_type = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    reference_id = Column(Integer, nullable=True)
+    idempotency_key = Column(String(120), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class PointsArchiveSummary(Base):
+    """
+    Suma de los movimientos archivados por usuario, para poder conciliar
+    user_points.total_points sin leer la tabla de archivo
+    """
+
+    __tablename__ = "points_archive_summary"
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    archived_points = Column(Integer, nullable=False, default=0)
+    archived_count = Column(Integer, nullable=False, default=0)
+    archived_until = Column(DateTime(timezone=True), nullable=True)
+
+
+class UploadBlob(Base):
+    """
+    Archivo subido, guardado una sola vez por contenido (nombre = SHA-256).
+    ref_count cuenta las filas que lo usan (fotos de publicaciones, fotos de
+    perfil); cuando llega a 0 el archivo se puede borrar.
+    """
+
+    __tablename__ = "upload_blobs"
+
+    url = Column(String(400), primary_key=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, server_default="0", default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CatalogVersion(Base):
+    """
+    Contador global del catálogo (publicaciones, fotos, categorías y
+    beneficios). Se incrementa en cada commit que modifica alguna de esas
+    tablas; las respuestas cacheadas y los ETags del catálogo dependen de él.
+    Una sola fila con id=1.
+    """
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, server_default="0", default=0)
@@ -0,0 +1,266 @@
+"""
+Movimientos de puntos atómicos.
+
+El saldo en user_points se modifica siempre con un UPDATE relativo
+(total_points = total_points + :n) en la DB, nunca leyendo y escribiendo el
+valor desde Python, así no se pierden actualizaciones entre workers.
+Cada movimiento queda registrado en points_transactions dentro de la misma
+transacción; si trae idempotency_key, un reintento con la misma clave no
+vuelve a aplicarse.
+
+Ninguna función de este módulo hace commit: eso queda a cargo del endpoint.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from .models import (
+    PointsArchiveSummary,
+    PointsTransaction,
+    PointsTransactionArchive,
+    UserPoints,
+)
+
+
+class InsufficientPointsError(Exception):
+    """El saldo no alcanza para un débito con saldo garantizado."""
+
+
+def ensure_balance_row(db: Session, user_id: int) -> None:
+    """Crea la fila de user_points si no existe (sin commit)."""
+    exists = db.query(UserPoints.user_id).filter(UserPoints.user_id == user_id).first()
+    if exists:
+        return
+    try:
+        with db.begin_nested():
+            db.add(UserPoints(user_id=user_id, total_points=0))
+    except IntegrityError:
+        # Otro worker la creó en paralelo.
+        pass
+
+
+def get_balance(db: Session, user_id: int) -> int:
+    total = (
+        db.query(UserPoints.total_points)
+        .filter(UserPoints.user_id == user_id)
+        .scalar()
+    )
+    return total or 0
+
+
+def find_transaction(db: Session, idempotency_key: str) -> Optional[PointsTransaction]:
+    return (
+        db.query(PointsTransaction)
+        .filter(PointsTransaction.idempotency_key == idempotency_key)
+        .first()
+    )
+
+
+def _floored(db: Session, user_id: int, points: int) -> int:
+    """
+    Parte de ``points`` que se puede aplicar sin dejar el saldo negativo. El
+    UPDATE sin cambios bloquea la fila del saldo hasta el commit, así otro
+    movimiento no la modifica entre esta lectura y el UPDATE relativo.
+    """
+    if points >= 0:
+        return points
+    current = db.execute(
+        update(UserPoints)
+        .where(UserPoints.user_id == user_id)
+        .values(total_points=UserPoints.total_points)
+        .returning(UserPoints.total_points)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    return max(points, -(current or 0))
+
+
+def record_movement(
+    db: Session,
+    user_id: int,
+    points: int,
+    transaction_type: str,
+    description: Optional[str] = None,
+    reference_id: Optional[int] = None,
+    idempotency_key: Optional[str] = None,
+    require_balance: bool = False,
+    floor_at_zero: bool = False,
+) -> Optional[PointsTransaction]:
+    """
+    Aplica un movimiento de ``points`` (positivo o negativo) al saldo del usuario
+    y lo registra en points_transactions.
+
+    - ``require_balance``: el débito solo se aplica si el saldo alcanza
+      (``WHERE total_points >= :costo``); si no, lanza InsufficientPointsError.
+    - ``floor_at_zero``: el saldo resultante nunca baja de 0; el movimiento
+      registra lo que efectivamente se descontó, así el historial sigue
+      sumando el saldo (ver ``ledger_total``).
+
+    Devuelve la transacción creada, o None si ``idempotency_key`` ya se aplicó.
+    """
+    if idempotency_key and find_transaction(db, idempotency_key):
+        return None
+
+    if not require_balance:
+        ensure_balance_row(db, user_id)
+
+    if floor_at_zero:
+        points = _floored(db, user_id, points)
+
+    stmt = (
+        update(UserPoints)
+        .where(UserPoints.user_id == user_id)
+        .values(total_points=UserPoints.total_points + points)
+        .execution_options(synchronize_session="fetch")
+    )
+    if require_balance:
+        stmt = stmt.where(UserPoints.total_points >= -points)
+
+    transaction = PointsTransaction(
+        user_id=user_id,
+        points=points,
+        transaction_type=transaction_type,
+        description=description,
+        reference_id=reference_id,
+        idempotency_key=idempotency_key,
+    )
+    try:
+        with db.begin_nested():
+            db.add(transaction)
+            db.flush()
+            if db.execute(stmt).rowcount == 0:
+                raise InsufficientPointsError()
+    except IntegrityError:
+        if idempotency_key and find_transaction(db, idempotency_key):
+            return None
+        raise
+    return transaction
+
+
+def list_movements(
+    db: Session, user_id: int, limit: int, cursor: Optional[int] = None
+) -> List[PointsTransaction]:
+    """
+    Página de movimientos de un usuario ordenada por (created_at, id) desc,
+    usando el índice (user_id, created_at, id). ``cursor`` es el id del último
+    movimiento de la página anterior. Devuelve hasta ``limit + 1`` filas para
+    que el llamador sepa si hay una página siguiente.
+    """
+    q = db.query(PointsTransaction).filter(PointsTransaction.user_id == user_id)
+    if cursor is not None:
+        # Se compara contra el valor guardado en la DB (subquery) para no
+        # depender de cómo se serializa el datetime en el parámetro.
+        anchor = aliased(PointsTransaction)
+        anchor_created_at = (
+            select(anchor.created_at)
+            .where(anchor.id == cursor, anchor.user_id == user_id)
+            .scalar_subquery()
+        )
+        q = q.filter(
+            or_(
+                PointsTransaction.created_at < anchor_created_at,
+                and_(
+                    PointsTransaction.created_at == anchor_created_at,
+                    PointsTransaction.id < cursor,
+                ),
+            )
+        )
+    return (
+        q.order_by(PointsTransaction.created_at.desc(), PointsTransaction.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+
+def archive_transactions(
+    db: Session, older_than_days: int, batch_size: int = 1000
+) -> int:
+    """
+    Mueve a points_transactions_archive los movimientos con más de
+    ``older_than_days`` días y acumula su suma en points_archive_summary, de
+    modo que siempre se cumpla:
+
+        total_points == SUM(points_transactions.points) + archived_points
+
+    Trabaja por lotes (un commit por lote) para no bloquear la tabla.
+    Las idempotency_key archivadas dejan de chequearse: solo sirven para
+    reintentos cercanos en el tiempo. Devuelve la cantidad de filas movidas.
+    """
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+        days=older_than_days
+    )
+    columns = [
+        "id",
+        "user_id",
+        "points",
+        "transaction_type",
+        "description",
+        "reference_id",
+        "idempotency_key",
+        "created_at",
+    ]
+    moved = 0
+    while True:
+        ids = [
+            row[0]
+            for row in db.query(PointsTransaction.id)
+            .filter(PointsTransaction.created_at < cutoff)
+            .order_by(PointsTransaction.id)
+            .limit(batch_size)
+            .all()
+        ]
+        if not ids:
+            break
+
+        totals = (
+            db.query(
+                PointsTransaction.user_id,
+                func.sum(PointsTransaction.points),
+                func.count(PointsTransaction.id),
+                func.max(PointsTransaction.created_at),
+            )
+            .filter(PointsTransaction.id.in_(ids))
+            .group_by(PointsTransaction.user_id)
+            .all()
+        )
+
+        db.execute(
+            insert(PointsTransactionArchive).from_select(
+                columns,
+                select(*[getattr(PointsTransaction, c) for c in columns]).where(
+                    PointsTransaction.id.in_(ids)
+                ),
+            )
+        )
+        for user_id, points_sum, count, last_created_at in totals:
+            summary = db.get(PointsArchiveSummary, user_id)
+            if summary is None:
+                summary = PointsArchiveSummary(
+                    user_id=user_id, archived_points=0, archived_count=0
+                )
+                db.add(summary)
+            summary.archived_points += int(points_sum or 0)
+            summary.archived_count += int(count)
+            summary.archived_until = last_created_at
+        db.execute(
+            delete(PointsTransaction)
+            .where(PointsTransaction.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        moved += len(ids)
+    return moved
+
+
+def ledger_total(db: Session, user_id: int) -> int:
+    """Saldo reconstruido desde el historial (caliente + resumen archivado)."""
+    hot = (
+        db.query(func.coalesce(func.sum(PointsTransaction.points), 0))
+        .filter(PointsTransaction.user_id == user_id)
+        .scalar()
+    )
+    summary = db.get(PointsArchiveSummary, user_id)
+    return int(hot) + (summary.archived_points if summary else 0)
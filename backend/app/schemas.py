@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import date, datetime
 
 try:
@@ -80,6 +80,7 @@ class UserOut(BaseModel):
     birth_date: date | None = None
     travel_preferences: str | None = None
     profile_picture_url: str | None = None
+    profile_picture_variants: Optional[Dict[str, Dict[str, str]]] = None
     role: str
 
     if _V2:
@@ -119,6 +120,8 @@ class PublicationOut(BaseModel):
     created_by_user_id: int | None = None
     created_at: str
     photos: List[str] = []
+    # alineado con photos: {"thumb"|"card"|"full": {"webp"|"jpeg": url}}, {} si aún no se procesó
+    photo_variants: List[Dict[str, Dict[str, str]]] = []
 
     rating_avg: float = 0.0
     rating_count: int = 0
@@ -256,6 +259,25 @@ class DeletionRequestOut(BaseModel):
             orm_mode = True
 
 
+class PhotoPresignRequest(BaseModel):
+    content_type: str = Field(..., pattern="^image/(jpeg|png|webp)$")
+    sha256: str = Field(..., pattern="^[0-9a-f]{64}$")
+    size: int = Field(..., gt=0)
+
+
+MAX_BATCH_MODERATION_IDS = 500
+
+
+class BatchModerationRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_MODERATION_IDS)
+    reason: Optional[str] = Field(None, max_length=500)
+
+
+class BatchModerationResult(BaseModel):
+    updated: List[int]
+    skipped: List[int]
+
+
 class ItineraryRequest(BaseModel):
     destination: str = Field(..., min_length=2, max_length=200)
     start_date: date
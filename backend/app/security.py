@@ -1,29 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 import os
+import random
 
 SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret-change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MIN", "60"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Costo de bcrypt. Si se cambia, los hashes viejos se regeneran en el próximo login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt libera el GIL: un pool acotado de threads limita el CPU que se le
+# dedica al hashing sin bloquear al resto de la API.
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS
+)
+_hash_pool = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
 
 
 def verify_password(plain, hashed):
-    return pwd_context.verify(plain, hashed)
+    return _hash_pool.submit(pwd_context.verify, plain, hashed).result()
+
+
+def verify_passwords(*pairs):
+    """Verifica varios (plain, hashed) en paralelo. Devuelve una lista de bools."""
+    futures = [_hash_pool.submit(pwd_context.verify, p, h) for p, h in pairs]
+    return [f.result() for f in futures]
+
+
+def verify_and_update_password(plain, hashed):
+    """
+    Verifica la contraseña y, si el hash usa un costo distinto a BCRYPT_ROUNDS,
+    devuelve además el hash nuevo: (ok, nuevo_hash_o_None).
+    """
+    return _hash_pool.submit(pwd_context.verify_and_update, plain, hashed).result()
 
 
 def hash_password(plain):
-    return pwd_context.hash(plain)
+    return _hash_pool.submit(pwd_context.hash, plain).result()
+
+
+def hash_passwords(*plains):
+    """Hashea varios valores en paralelo (p.ej. contraseña y respuestas)."""
+    futures = [_hash_pool.submit(pwd_context.hash, p) for p in plains]
+    return [f.result() for f in futures]
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
-    expire = datetime.utcnow() + (
-        expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire, "iat": now})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
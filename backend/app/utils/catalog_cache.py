@@ -0,0 +1,205 @@
+"""
+Caché de respuestas del catálogo (publicaciones públicas, categorías y
+beneficios) con ETags.
+
+La tabla catalog_version guarda un contador que se incrementa, dentro de la
+misma transacción, en cada commit que escribe publicaciones, fotos,
+categorías o beneficios. Lo hacen los hooks de Session de este módulo, así
+que cualquier escritura por ORM (objetos, ``update()``/``insert()`` masivos o
+tareas en segundo plano) invalida el catálogo sin tocar los endpoints. El SQL
+crudo no se detecta: quien lo use debe llamar a ``mark_changed``.
+
+Como el contador vive en la base, todos los procesos ven la misma versión.
+Cada proceso guarda en un LRU los cuerpos JSON ya serializados, con clave
+(ruta, parámetros, versión); el ETag sale de la misma clave, así un cliente
+que ya tiene la versión actual recibe un 304 sin que se arme nada.
+
+Los datos propios de cada usuario (p.ej. ``is_favorite``) no entran en la
+caché: el endpoint los aplica sobre el cuerpo cacheado y agrega al ETag una
+huella de esos datos con ``personal_etag``.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+import orjson
+from fastapi import Request, Response
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..db import insert_ignore
+from .metrics import CACHE_REQUESTS
+
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "256"))
+
+_CATALOG_TABLES = {
+    models.Publication.__tablename__,
+    models.PublicationPhoto.__tablename__,
+    models.Category.__tablename__,
+    models.publication_categories.name,
+    models.PremiumBenefit.__tablename__,
+}
+_CATALOG_MODELS = (
+    models.Publication,
+    models.PublicationPhoto,
+    models.Category,
+    models.PremiumBenefit,
+)
+_CHANGED = "catalog_changed"
+
+
+# --- versión -----------------------------------------------------------------
+
+
+def mark_changed(db: Session) -> None:
+    """Marca la transacción actual como escritura del catálogo."""
+    db.info[_CHANGED] = True
+
+
+def current_version(db: Session) -> int:
+    version = db.execute(
+        select(models.CatalogVersion.version).where(models.CatalogVersion.id == 1)
+    ).scalar()
+    return version or 0
+
+
+def _bump(db: Session) -> None:
+    inc = (
+        update(models.CatalogVersion)
+        .where(models.CatalogVersion.id == 1)
+        .values(version=models.CatalogVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(inc).rowcount:
+        return
+    # primera escritura: crea la fila sin SAVEPOINT (si otro worker la creó en
+    # paralelo, el INSERT no hace nada) y la incrementa en la misma transacción
+    table = models.CatalogVersion.__table__
+    db.execute(insert_ignore(db, table, ["id"]).values(id=1, version=0))
+    db.execute(inc)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _CATALOG_MODELS):
+            mark_changed(session)
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if getattr(table, "name", None) in _CATALOG_TABLES:
+            mark_changed(state.session)
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    session.flush()
+    if session.info.pop(_CHANGED, False):
+        _bump(session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_CHANGED, None)
+
+
+# --- caché de cuerpos --------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    etag: str
+    body: bytes
+    data: Any
+
+
+_lock = threading.Lock()
+_entries: "OrderedDict[Hashable, CatalogEntry]" = OrderedDict()
+
+
+def render_json(data: Any) -> bytes:
+    return orjson.dumps(data)
+
+
+def _etag(route: str, params: Hashable, version: int) -> str:
+    digest = hashlib.sha1(repr((route, params)).encode()).hexdigest()[:12]
+    return f'"{digest}-v{version}"'
+
+
+def get_or_build(
+    db: Session, route: str, params: Hashable, build: Callable[[], Any]
+) -> CatalogEntry:
+    """
+    Devuelve la respuesta cacheada para ``(route, params)`` en la versión
+    actual del catálogo, o la arma con ``build()`` (datos ya serializables a
+    JSON) y la guarda.
+    """
+    version = current_version(db)
+    key = (route, params, version)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+    if entry is not None:
+        CACHE_REQUESTS.inc(cache="catalog", result="hit")
+        return entry
+    CACHE_REQUESTS.inc(cache="catalog", result="miss")
+    data = build()
+    entry = CatalogEntry(etag=_etag(route, params, version), body=render_json(data), data=data)
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > CATALOG_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return entry
+
+
+def personal_etag(etag: str, personal: Iterable) -> str:
+    """ETag de una respuesta cacheada con datos del usuario aplicados encima."""
+    digest = hashlib.sha1(repr(sorted(personal)).encode()).hexdigest()[:8]
+    return f'{etag[:-1]}-u{digest}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def json_response(
+    request: Request,
+    etag: str,
+    body: Optional[bytes] = None,
+    data: Any = None,
+    private: bool = False,
+) -> Response:
+    """
+    Responde 304 si el cliente ya tiene ``etag``; si no, el JSON (``body`` ya
+    serializado o ``data`` para serializar).
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache" if private else "public, no-cache",
+        "Vary": "Authorization",
+    }
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if body is None:
+        body = render_json(data)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
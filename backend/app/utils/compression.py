@@ -0,0 +1,168 @@
+"""
+Compresión de respuestas (Brotli o gzip según Accept-Encoding).
+
+Solo se comprimen los tipos de COMPRESSIBLE_TYPES (JSON, texto, JS, SVG...)
+y cuando el cuerpo llega a COMPRESSION_MIN_SIZE bytes: las imágenes ya
+vienen comprimidas y en respuestas chicas no vale la pena. Tampoco se tocan
+las respuestas que ya traen Content-Encoding (p.ej. los .br/.gz del frontend
+que sirve CachedStaticFiles).
+
+Al comprimir, un ETag fuerte pasa a débil (``W/"..."``): el cuerpo ya no es
+byte a byte el que identifica, pero sí equivalente. If-None-Match compara en
+forma débil (catalog_cache y StaticFiles ignoran el ``W/``), así que el 304
+sigue funcionando con cualquiera de las dos formas; el 304 repite el ETag
+débil si es el que mandó el cliente.
+
+Brotli requiere el paquete ``brotli``; si no está instalado se usa gzip.
+"""
+
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .static_files import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # opcional
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+class _Gzip:
+    def __init__(self):
+        self._z = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._c = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+def choose_encoding(request_headers: Headers) -> Optional[str]:
+    accepted = accepted_encodings(request_headers)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _weak(etag: str) -> str:
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def _echo_weak_etag(message: Message, if_none_match: str) -> None:
+    headers = MutableHeaders(raw=message["headers"])
+    etag = headers.get("etag")
+    if etag and _weak(etag) in {t.strip() for t in if_none_match.split(",")}:
+        headers["ETag"] = _weak(etag)
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressedResponder:
+    """
+    Retiene el inicio de la respuesta hasta juntar ``minimum_size`` bytes (o
+    el final del cuerpo) para decidir si comprimir; después comprime en
+    streaming, bloque por bloque.
+    """
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.buffer = b""
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        self.if_none_match = Headers(scope=scope).get("if-none-match", "")
+        await self.app(scope, receive, self.wrapped_send)
+
+    async def wrapped_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not _compressible(Headers(raw=message["headers"]))
+            if message["status"] == 304 and self.if_none_match:
+                _echo_weak_etag(message, self.if_none_match)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            self.buffer += body
+            if len(self.buffer) < self.minimum_size and more_body:
+                return
+            if len(self.buffer) < self.minimum_size:
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": self.buffer})
+                return
+            self.compressor = _Brotli() if self.encoding == "br" else _Gzip()
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            if "etag" in headers:
+                headers["ETag"] = _weak(headers["etag"])
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            body, self.buffer = self.buffer, b""
+            await self.send(self.start)
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        elif not data:
+            return
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,220 @@
+"""
+Variantes de imágenes subidas (thumbnail, card, full) en WebP y JPEG.
+
+Al subir, ``strip_metadata`` limpia el original (EXIF con GPS, XMP,
+comentarios) antes de guardarlo, porque también se sirve públicamente, y se
+encola el procesamiento como tarea en segundo plano: se decodifica la imagen,
+se corrige la orientación EXIF y se generan las variantes bajo
+``uploads/variants/`` en el storage configurado (ver utils/storage.py).
+Las URLs quedan en ``PublicationPhoto.variants`` y
+``User.profile_picture_variants`` con la forma::
+
+    {"thumb": {"webp": "/static/...", "jpeg": "/static/..."}, "card": {...}, ...}
+
+Si el archivo no es una imagen válida no se generan variantes y el cliente
+sigue usando la URL original.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.orm import Session
+
+from ..models import PublicationPhoto, User
+from . import storage
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_PREFIX = "uploads/variants"
+
+# lado mayor en píxeles; nunca se agranda una imagen más chica
+VARIANT_SIZES = {"thumb": 320, "card": 800, "full": 1600}
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", ".webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", ".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", "40000000"))
+IMAGE_PROCESSING_CONCURRENCY = int(
+    os.getenv("IMAGE_PROCESSING_CONCURRENCY", str(os.cpu_count() or 2))
+)
+
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+# Las tareas corren en el threadpool de Starlette; esto acota cuántas usan CPU a la vez.
+_processing_slots = threading.BoundedSemaphore(IMAGE_PROCESSING_CONCURRENCY)
+
+
+class InvalidImageError(Exception):
+    """El archivo no se pudo decodificar como imagen."""
+
+
+def _load(src_path: str) -> Image.Image:
+    try:
+        with Image.open(src_path) as img:
+            img.load()
+            img = ImageOps.exif_transpose(img)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(str(e)) from e
+    # Copiar solo los píxeles descarta EXIF, ICC y demás metadatos.
+    has_alpha = img.mode in ("RGBA", "LA") or (
+        img.mode == "P" and "transparency" in img.info
+    )
+    clean = Image.new("RGBA" if has_alpha else "RGB", img.size)
+    clean.paste(img.convert(clean.mode))
+    return clean
+
+
+# claves de Image.info con datos del autor o del lugar; el perfil ICC se conserva
+_PRIVATE_INFO_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment")
+_STRIPPABLE_FORMATS = ("JPEG", "PNG", "WEBP")
+
+
+def strip_metadata(path: str) -> bool:
+    """
+    Reescribe en su lugar la imagen de ``path`` sin EXIF (GPS, cámara, fecha),
+    XMP, comentarios ni textos PNG; solo conserva la orientación y el perfil de
+    color. Los JPEG se guardan con sus mismas tablas de cuantización. Si la
+    imagen no trae metadatos el archivo no se toca. Devuelve True si lo
+    reescribió y lanza InvalidImageError si no es una imagen válida.
+    """
+    tmp_path = None
+    try:
+        with Image.open(path) as img:
+            if img.format not in _STRIPPABLE_FORMATS:
+                return False
+            exif = img.getexif()
+            text = getattr(img, "text", None)
+            if not (exif or text or any(k in img.info for k in _PRIVATE_INFO_KEYS)):
+                return False
+            img.load()
+            kept = Image.Exif()
+            orientation = exif.get(ExifTags.Base.Orientation)
+            if orientation and orientation != 1:
+                kept[ExifTags.Base.Orientation] = orientation
+            options = {
+                "exif": kept.tobytes() if kept else b"",
+                "icc_profile": img.info.get("icc_profile"),
+            }
+            if img.format == "JPEG":
+                options.update(quality="keep", comment=b"")
+            elif img.format == "WEBP":
+                options.update(quality=90)
+            fd, tmp_path = tempfile.mkstemp(
+                suffix=".part", dir=os.path.dirname(path) or None
+            )
+            os.close(fd)
+            img.save(tmp_path, img.format, **options)
+        os.replace(tmp_path, path)
+        return True
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(str(e)) from e
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _variant_key(stem: str, size_name: str, ext: str) -> str:
+    return f"{VARIANTS_PREFIX}/{stem}_{size_name}{ext}"
+
+
+def _stem(url: str) -> str:
+    return os.path.splitext(os.path.basename(url))[0]
+
+
+def _stem_keys(stem: str) -> List[str]:
+    return [
+        _variant_key(stem, size_name, ext)
+        for size_name in VARIANT_SIZES
+        for _, ext, _ in OUTPUT_FORMATS.values()
+    ]
+
+
+def variant_keys(url: str) -> List[str]:
+    """Claves de almacenamiento de todas las variantes que corresponden a ``url``."""
+    return _stem_keys(_stem(url))
+
+
+def build_variants(src_key: str, stem: str) -> Dict[str, Dict[str, str]]:
+    """
+    Genera todas las variantes de ``src_key`` y devuelve sus URLs. Como los
+    originales se nombran por hash de contenido, si las variantes de ``stem``
+    ya existen se reutilizan sin volver a procesar la imagen.
+    """
+    store = storage.backend
+    urls: Dict[str, Dict[str, str]] = {
+        size_name: {
+            fmt_name: store.url(_variant_key(stem, size_name, ext))
+            for fmt_name, (_, ext, _) in OUTPUT_FORMATS.items()
+        }
+        for size_name in VARIANT_SIZES
+    }
+    if all(store.exists(key) for key in _stem_keys(stem)):
+        return urls
+
+    with store.local_copy(src_key) as src_path:
+        img = _load(src_path)
+    for size_name, max_side in VARIANT_SIZES.items():
+        resized = img.copy()
+        resized.thumbnail((max_side, max_side), Image.LANCZOS)
+        for fmt_name, (pil_format, ext, options) in OUTPUT_FORMATS.items():
+            out = resized
+            if pil_format == "JPEG" and out.mode == "RGBA":
+                out = Image.new("RGB", resized.size, (255, 255, 255))
+                out.paste(resized, mask=resized.getchannel("A"))
+            fd, tmp_path = tempfile.mkstemp(suffix=ext)
+            os.close(fd)
+            try:
+                out.save(tmp_path, pil_format, **options)
+                store.put_file(
+                    tmp_path,
+                    _variant_key(stem, size_name, ext),
+                    f"image/{fmt_name}",
+                    move=True,
+                )
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    return urls
+
+
+def _variants_for(url: str) -> Optional[Dict[str, Dict[str, str]]]:
+    key = storage.backend.key_from_url(url)
+    if key is None:
+        logger.warning("No se generaron variantes para %s: no está en el storage", url)
+        return None
+    try:
+        with _processing_slots:
+            return build_variants(key, _stem(url))
+    except InvalidImageError as e:
+        logger.warning("No se generaron variantes para %s: %s", url, e)
+        return None
+
+
+def process_publication_photos(bind, photo_ids: Iterable[int]) -> None:
+    """Tarea en segundo plano: genera y guarda las variantes de las fotos."""
+    photo_ids = list(photo_ids)
+    if not photo_ids:
+        return
+    with Session(bind=bind) as db:
+        photos = (
+            db.query(PublicationPhoto).filter(PublicationPhoto.id.in_(photo_ids)).all()
+        )
+        for photo in photos:
+            photo.variants = _variants_for(photo.url)
+        db.commit()
+
+
+def process_profile_photo(bind, user_id: int, url: str) -> None:
+    """Tarea en segundo plano: genera y guarda las variantes de la foto de perfil."""
+    variants = _variants_for(url)
+    with Session(bind=bind) as db:
+        user = db.get(User, user_id)
+        # Si el usuario ya subió otra foto, esta tarea quedó vieja.
+        if user is None or user.profile_picture_url != url:
+            return
+        user.profile_picture_variants = variants
+        db.commit()
@@ -2,10 +2,13 @@
 Parser de itinerarios - Convierte texto de itinerario IA a estructura de itinerario personalizado
 """
 
+import logging
 import re
 from typing import Dict, List, Any
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 
 def parse_ai_itinerary_to_custom_structure(
     itinerary_text: str, start_date: str
@@ -21,7 +24,7 @@ def parse_ai_itinerary_to_custom_structure(
         Dict con la estructura del itinerario personalizado
     """
 
-    print(f"[PARSER] Parseando itinerario de IA desde fecha {start_date}")
+    logger.debug("Parseando itinerario de IA desde %s", start_date)
 
     custom_itinerary = {}
 
@@ -37,7 +40,7 @@ def parse_ai_itinerary_to_custom_structure(
         r"•\s*(\d{1,2}:\d{2})-(\d{1,2}:\d{2})\s*-\s*(.*?)\s*\(ID:\s*(\d+)\)"
     )
 
-    print(f"[PARSER] Analizando {len(lines)} líneas...")
+    logger.debug("Analizando %s líneas", len(lines))
 
     for line_num, line in enumerate(lines):
         line = line.strip()
@@ -59,7 +62,7 @@ def parse_ai_itinerary_to_custom_structure(
                 "evening": {},
             }
 
-            print(f"[PARSER] Procesando {current_day} ({day_date})")
+            logger.debug("Procesando %s (%s)", current_day, day_date)
             continue
 
         period_match = re.search(period_pattern, line)
@@ -77,7 +80,7 @@ def parse_ai_itinerary_to_custom_structure(
             elif period_name == "noche":
                 current_period = "evening"
 
-            print(f"[PARSER]   Período: {current_period}")
+            logger.debug("Período: %s", current_period)
             continue
 
         activity_match = re.search(activity_pattern, line)
@@ -96,8 +99,11 @@ def parse_ai_itinerary_to_custom_structure(
                 "end_time": end_time,
             }
 
-            print(
-                f"[PARSER]     Actividad: {time_slot} - {activity_name} (ID: {publication_id})"
+            logger.debug(
+                "Actividad: %s - %s (ID: %s)",
+                time_slot,
+                activity_name,
+                publication_id,
             )
 
     parsing_metadata = {
@@ -119,9 +125,11 @@ def parse_ai_itinerary_to_custom_structure(
 
     custom_itinerary["_metadata"] = parsing_metadata
 
-    print(f"[PARSER] Parsing completado:")
-    print(f"[PARSER]   Días parseados: {parsing_metadata['parsed_days']}")
-    print(f"[PARSER]   Actividades totales: {parsing_metadata['total_activities']}")
+    logger.debug(
+        "Parsing completado: %s días, %s actividades",
+        parsing_metadata["parsed_days"],
+        parsing_metadata["total_activities"],
+    )
 
     return custom_itinerary
 
@@ -0,0 +1,94 @@
+"""
+Configuración del logging de la API.
+
+Cada módulo usa su propio logger (``logger = logging.getLogger(__name__)``)
+y formatea de forma perezosa: ``logger.debug("pub %s", pub.id)`` y no un
+f-string, así un mensaje de un nivel desactivado no arma el texto. Para
+bucles que solo existen para loguear, ``logger.isEnabledFor(logging.DEBUG)``.
+
+``configure_logging`` deja en el logger raíz un ``QueueHandler``: el pedido
+solo encola el registro y un hilo aparte (``QueueListener``) lo serializa y
+escribe en stdout, así una terminal o un colector lentos no frenan la API.
+La salida es una línea JSON por registro (LOG_FORMAT=text para desarrollo),
+con los campos de ``extra=`` como claves propias.
+"""
+
+import atexit
+import datetime
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+import orjson
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# atributos propios de LogRecord; el resto vino de extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc_info"] = record.exc_text
+        return orjson.dumps(data, default=str).decode()
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    En el hilo del pedido solo se interpola el mensaje y se pasa el traceback
+    a texto (los args podrían cambiar antes de que el listener los lea); el
+    JSON y la escritura quedan para el hilo del listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def build_formatter(fmt: str = LOG_FORMAT) -> logging.Formatter:
+    return logging.Formatter(TEXT_FORMAT) if fmt == "text" else JsonFormatter()
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """Instala el handler con cola en el logger raíz (una sola vez por proceso)."""
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(build_formatter(fmt))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(records, output)
+    _listener.start()
+    atexit.register(_listener.stop)
+    root.addHandler(_DeferredQueueHandler(records))
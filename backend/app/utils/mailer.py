@@ -1,8 +1,18 @@
 from __future__ import annotations
-import os, smtplib, socket
+import logging, os, smtplib, socket, time
 from email.message import EmailMessage
 from fastapi import HTTPException, status
 
+from .metrics import Histogram
+
+SMTP_SEND_SECONDS = Histogram(
+    "smtp_send_duration_seconds",
+    "Duración del envío de un email por SMTP (conexión incluida), por resultado.",
+    ("outcome",),
+)
+
+logger = logging.getLogger(__name__)
+
 
 def _smtp_config():
     host = os.getenv("SMTP_HOST")
@@ -30,10 +40,17 @@ def send_email_html(
     msg.set_content(text_fallback or "Tu cliente de correo no soporta HTML.")
     msg.add_alternative(html_body, subtype="html")
 
-    print(
-        f"[MAIL] Conectando a {host}:{port} (ssl={use_ssl}, starttls={use_starttls}, timeout={timeout}s) ..."
+    logger.debug(
+        "Conectando a %s:%s (ssl=%s, starttls=%s, timeout=%ss)",
+        host,
+        port,
+        use_ssl,
+        use_starttls,
+        timeout,
     )
 
+    started = time.perf_counter()
+    outcome = "error"
     try:
         server = (
             smtplib.SMTP_SSL(host, port, timeout=timeout)
@@ -47,7 +64,9 @@ def send_email_html(
                 server.ehlo()
             server.login(user, password)
             server.send_message(msg)
+        outcome = "ok"
     except (socket.timeout, TimeoutError) as e:
+        outcome = "timeout"
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail=f"Timeout conectando a SMTP ({host}:{port}). Verificá firewall/red: {e}",
@@ -61,3 +80,5 @@ def send_email_html(
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Error SMTP: {e}"
         )
+    finally:
+        SMTP_SEND_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
@@ -0,0 +1,77 @@
+"""
+Caché en memoria del usuario autenticado ("principal").
+
+Evita consultar la tabla users en cada request autenticado: el principal
+(id, username, role) se guarda por (user_id, iat del token) con un TTL corto.
+Los endpoints que cambian el rol, el perfil o la contraseña deben llamar a
+``invalidate_user`` para que el próximo request vuelva a leer de la DB.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .metrics import CACHE_REQUESTS
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_USERS = int(os.getenv("PRINCIPAL_CACHE_MAX_USERS", "10000"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    role: str
+
+
+_lock = threading.Lock()
+_entries: Dict[int, Dict[int, Tuple[float, Principal]]] = {}
+
+
+def get(user_id: int, issued_at: int) -> Optional[Principal]:
+    """Devuelve el principal cacheado si existe y no expiró."""
+    principal = _lookup(user_id, issued_at)
+    CACHE_REQUESTS.inc(cache="principal", result="miss" if principal is None else "hit")
+    return principal
+
+
+def _lookup(user_id: int, issued_at: int) -> Optional[Principal]:
+    with _lock:
+        by_token = _entries.get(user_id)
+        if not by_token:
+            return None
+        entry = by_token.get(issued_at)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del by_token[issued_at]
+            if not by_token:
+                del _entries[user_id]
+            return None
+        return principal
+
+
+def put(user_id: int, issued_at: int, principal: Principal) -> None:
+    if PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return
+    expires_at = time.monotonic() + PRINCIPAL_CACHE_TTL_SECONDS
+    with _lock:
+        if user_id not in _entries and len(_entries) >= PRINCIPAL_CACHE_MAX_USERS:
+            _entries.pop(next(iter(_entries)))
+        _entries.setdefault(user_id, {})[issued_at] = (expires_at, principal)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Descarta todos los principals cacheados de un usuario (todos sus tokens)."""
+    with _lock:
+        _entries.pop(user_id, None)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
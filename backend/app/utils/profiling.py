@@ -0,0 +1,233 @@
+"""
+Perfilado de pedidos puntuales, a pedido de un admin.
+
+Un pedido con el header ``X-Profile: sample`` (o ``?__profile=sample``) se
+atiende bajo un profiler y el resultado queda guardado en PROFILE_DIR; la
+respuesta trae el id en ``X-Profile-Id`` y se descarga desde
+/api/admin/profiles/{id}. Modos:
+
+- ``sample``: un hilo muestrea la pila del hilo que corre el endpoint cada
+  PROFILE_SAMPLE_INTERVAL_MS y guarda las pilas en formato "collapsed"
+  (``a;b;c <n>``), el que leen flamegraph.pl y speedscope.
+- ``cprofile``: cProfile sobre el endpoint, guardado como .prof de pstats
+  (snakeviz, flameprof).
+
+Quién puede perfilar lo decide la función ``authorize`` que recibe
+``ProfilingMiddleware`` (ver api/admin_debug.py). Sin el header el costo es
+buscarlo en el scope y leer una ContextVar en cada endpoint: el profiler
+solo se arranca para el pedido que lo pidió.
+"""
+
+import asyncio
+import cProfile
+import functools
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "plango-profiles")
+)
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "2"))
+PROFILE_MODES = {"sample": ".collapsed", "cprofile": ".prof"}
+
+_active: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+class ProfileSession:
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.path = os.path.join(PROFILE_DIR, self.id + PROFILE_MODES[mode])
+        self._stacks = Counter()
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+
+    @contextmanager
+    def running(self):
+        """Perfila el bloque en el hilo actual (el del endpoint)."""
+        if self._profile is not None:
+            self._profile.enable()
+            try:
+                yield
+            finally:
+                self._profile.disable()
+            return
+        sampler = _Sampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            self._stacks.update(sampler.stacks)
+
+    def save(self) -> None:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if self._profile is not None:
+            self._profile.dump_stats(self.path)
+        else:
+            with open(self.path, "w", encoding="utf-8") as f:
+                for stack, count in self._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        _prune()
+
+
+def _prune() -> None:
+    files = sorted(
+        (os.path.join(PROFILE_DIR, name) for name in os.listdir(PROFILE_DIR)),
+        key=os.path.getmtime,
+    )
+    for path in files[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else []:
+        os.remove(path)
+
+
+def saved_profiles() -> list:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted(os.listdir(PROFILE_DIR), reverse=True)
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Ruta del perfil guardado (``None`` si no existe o el id no es válido)."""
+    if not re.fullmatch(r"[\w-]+", profile_id):
+        return None
+    for suffix in PROFILE_MODES.values():
+        path = os.path.join(PROFILE_DIR, profile_id + suffix)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _wrap(call: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_endpoint(*args, **kwargs):
+            session = _active.get()
+            if session is None:
+                return await call(*args, **kwargs)
+            with session.running():
+                return await call(*args, **kwargs)
+
+        async_endpoint.profiled = True
+        return async_endpoint
+
+    @functools.wraps(call)
+    def endpoint(*args, **kwargs):
+        session = _active.get()
+        if session is None:
+            return call(*args, **kwargs)
+        with session.running():
+            return call(*args, **kwargs)
+
+    endpoint.profiled = True
+    return endpoint
+
+
+def instrument_routes(app) -> None:
+    """
+    Envuelve los endpoints de ``app`` para que el profiler corra en el hilo
+    que ejecuta cada uno (los síncronos van al threadpool, no al hilo del
+    middleware). Llamar después de registrar todos los routers.
+    """
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "profiled", False):
+            route.dependant.call = _wrap(route.dependant.call)
+
+
+def requested_mode(scope: Scope) -> Optional[str]:
+    """
+    Modo pedido con ``X-Profile`` o con el parámetro ``__profile``. Un valor
+    que no es un modo conocido equivale a no pedir perfilado.
+    """
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            mode = value.decode("latin-1").strip().lower()
+            return mode if mode in PROFILE_MODES else None
+    query_string = scope.get("query_string", b"")
+    if b"__profile" in query_string:
+        values = parse_qs(query_string.decode("latin-1"), keep_blank_values=True)
+        mode = values.get("__profile", [""])[0].strip().lower()
+        return mode if mode in PROFILE_MODES else None
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    ``authorize(scope)`` corre antes de perfilar; si levanta HTTPException
+    el pedido se rechaza con ese status.
+    """
+
+    def __init__(self, app: ASGIApp, authorize: Callable[[Scope], Awaitable[None]]):
+        self.app = app
+        self.authorize = authorize
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        mode = requested_mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.authorize(scope)
+        except HTTPException as e:
+            response = ORJSONResponse({"detail": e.detail}, status_code=e.status_code)
+            await response(scope, receive, send)
+            return
+
+        session = ProfileSession(mode)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", session.id)
+            await send(message)
+
+        token = _active.set(session)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _active.reset(token)
+            session.save()
@@ -0,0 +1,172 @@
+"""
+Conteo de consultas SQL por pedido.
+
+Los hooks before/after_cursor_execute de este módulo (registrados sobre
+Engine, así cubren el motor principal, el de lectura y el de los tests)
+anotan cada consulta en el ``QueryStats`` del pedido actual, guardado en una
+ContextVar: los endpoints síncronos corren en el threadpool con una copia
+del contexto, así que escriben en el mismo objeto. Como un mismo
+``QueryStats`` puede recibir consultas de varios hilos a la vez (los de
+``count_queries`` ven las de todos los pedidos en curso), ``record`` toma un
+lock.
+
+``QueryStatsMiddleware`` agrega a la respuesta
+``Server-Timing: db;dur=<ms>;desc="<n> consultas"`` y loguea los números
+(en debug) como campos de ``extra``. Si una misma consulta (normalizada por
+``fingerprint``) se repite QUERY_REPEAT_THRESHOLD veces o más en un pedido,
+se loguea como warning: casi siempre es un N+1 (una relación lazy recorrida
+en un bucle).
+
+En los tests, ``count_queries`` cuenta las consultas de un bloque (ver el
+fixture ``max_queries`` de tests/conftest.py).
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+
+_SPACES = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|\$\d+")
+_PARAM_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)|__\[POSTCOMPILE_\w+\]")
+
+
+def fingerprint(statement: str) -> str:
+    """La consulta sin valores: ``IN (?, ?, ?)`` y ``IN (?)`` dan lo mismo."""
+    statement = _LITERALS.sub("?", _SPACES.sub(" ", statement.strip()))
+    return _PARAM_LISTS.sub("(?)", statement)
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        key = fingerprint(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.statements[key] += 1
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> dict:
+        with self._lock:
+            common = self.statements.most_common()
+        return {sql: n for sql, n in common if n >= threshold}
+
+    def report(self) -> str:
+        with self._lock:
+            lines = [f"{self.count} consultas en {self.duration * 1000:.1f} ms"]
+            lines += [f"  {n} x {sql}" for sql, n in self.statements.most_common()]
+        return "\n".join(lines)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_collectors: list = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    for collector in tuple(_collectors):
+        collector.record(statement, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+@contextmanager
+def count_queries():
+    """
+    Cuenta todas las consultas que se ejecuten dentro del bloque, en
+    cualquier hilo (el TestClient atiende los pedidos en otro hilo).
+    """
+    stats = QueryStats()
+    _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _collectors.remove(stats)
+
+
+def server_timing(stats: QueryStats) -> str:
+    return f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} consultas"'
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        status = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", server_timing(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if stats.count:
+                _log(scope, status, stats)
+
+
+def _log(scope: Scope, status: Optional[int], stats: QueryStats) -> None:
+    fields = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "status": status,
+        "db_queries": stats.count,
+        "db_time_ms": round(stats.duration * 1000, 1),
+    }
+    repeated = stats.repeated()
+    if repeated:
+        logger.warning(
+            "Consultas repetidas en %s %s (posible N+1)",
+            scope["method"],
+            scope["path"],
+            extra={**fields, "db_repeated": repeated},
+        )
+    else:
+        logger.debug("SQL del pedido", extra=fields)
@@ -0,0 +1,299 @@
+"""
+Rate limiting con ventana deslizante para los endpoints de autenticación.
+
+Cada intento se registra bajo una o más claves (identificador y IP del
+cliente). Si alguna supera su límite dentro de la ventana, el intento se
+rechaza con 429 *antes* de tocar la DB o bcrypt, y no se registra en
+ninguna de las claves.
+
+El almacenamiento se elige con RATE_LIMIT_STORAGE_URL:
+- sin definir o ``memory://``: en memoria del proceso (un solo worker).
+- ``sqlite:///ruta/al/archivo.db``: compartido entre workers del mismo host.
+- ``redis://host:6379/0``: compartido entre hosts (requiere el paquete redis).
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# (clave, máximo de intentos en la ventana)
+Limits = Tuple[Tuple[str, int], ...]
+
+
+class MemoryBackend:
+    """
+    Las claves quedan ordenadas por último intento: las del principio cuya
+    ventana ya venció se descartan en cada ``hit``, y si aun así hay más de
+    ``max_keys`` se descartan las menos recientes (un ataque con miles de
+    usuarios o IPs distintas no hace crecer la memoria sin límite).
+    """
+
+    def __init__(self, max_keys: Optional[int] = None):
+        self._hits: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_keys = max_keys or RATE_LIMIT_MAX_KEYS
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> Optional[float]:
+        """Registra un intento. Devuelve None si se permite o los segundos a esperar."""
+        return self.hit_many(((key, limit),), window, now)
+
+    def hit_many(self, limits: Limits, window: float, now: float) -> Optional[float]:
+        """
+        Registra el intento en todas las claves de ``limits`` solo si ninguna
+        alcanzó su máximo; si alguna lo alcanzó no registra nada y devuelve los
+        segundos a esperar.
+        """
+        with self._lock:
+            self._evict(window, now)
+            entries = []
+            retry_after = None
+            for key, limit in limits:
+                hits = self._hits.pop(key, None)
+                if hits is None:
+                    hits = deque()
+                while hits and hits[0] <= now - window:
+                    hits.popleft()
+                if len(hits) >= limit:
+                    retry_after = max(retry_after or 0, hits[0] + window - now)
+                entries.append((key, hits))
+            for key, hits in entries:
+                if retry_after is None:
+                    hits.append(now)
+                if hits:
+                    self._hits[key] = hits
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+            return retry_after
+
+    def _evict(self, window: float, now: float) -> None:
+        while self._hits:
+            hits = next(iter(self._hits.values()))
+            if hits and hits[-1] > now - window:
+                break
+            self._hits.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hits.clear()
+
+
+class SQLiteBackend:
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, timeout=5, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_hits (key TEXT NOT NULL, ts REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_rate_limit_hits_key_ts ON rate_limit_hits(key, ts)"
+            )
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> Optional[float]:
+        return self.hit_many(((key, limit),), window, now)
+
+    def hit_many(self, limits: Limits, window: float, now: float) -> Optional[float]:
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                retry_after = None
+                for key, limit in limits:
+                    cur.execute(
+                        "DELETE FROM rate_limit_hits WHERE key = ? AND ts <= ?",
+                        (key, now - window),
+                    )
+                    count, oldest = cur.execute(
+                        "SELECT COUNT(*), MIN(ts) FROM rate_limit_hits WHERE key = ?",
+                        (key,),
+                    ).fetchone()
+                    if count >= limit:
+                        retry_after = max(retry_after or 0, oldest + window - now)
+                if retry_after is None:
+                    cur.executemany(
+                        "INSERT INTO rate_limit_hits (key, ts) VALUES (?, ?)",
+                        [(key, now) for key, _ in limits],
+                    )
+                cur.execute("COMMIT")
+                return retry_after
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limit_hits WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limit_hits")
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RATE_LIMIT_STORAGE_URL usa redis:// pero el paquete redis no está instalado"
+            ) from e
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = "plango:ratelimit:"
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> Optional[float]:
+        return self.hit_many(((key, limit),), window, now)
+
+    def hit_many(self, limits: Limits, window: float, now: float) -> Optional[float]:
+        pipe = self._redis.pipeline()
+        for key, _ in limits:
+            rkey = self._prefix + key
+            pipe.zremrangebyscore(rkey, 0, now - window)
+            pipe.zrange(rkey, 0, 0, withscores=True)
+            pipe.zcard(rkey)
+        results = pipe.execute()
+        retry_after = None
+        for i, (_, limit) in enumerate(limits):
+            oldest, count = results[3 * i + 1], results[3 * i + 2]
+            if count >= limit:
+                wait = oldest[0][1] + window - now if oldest else window
+                retry_after = max(retry_after or 0, wait)
+        if retry_after is not None:
+            return retry_after
+        member = f"{now}:{os.getpid()}:{threading.get_ident()}"
+        pipe = self._redis.pipeline()
+        for key, _ in limits:
+            pipe.zadd(self._prefix + key, {member: now})
+            pipe.expire(self._prefix + key, int(math.ceil(window)))
+        pipe.execute()
+        return None
+
+    def reset(self, key: str) -> None:
+        self._redis.delete(self._prefix + key)
+
+    def clear(self) -> None:
+        for rkey in self._redis.scan_iter(self._prefix + "*"):
+            self._redis.delete(rkey)
+
+
+def _backend_from_url(url: Optional[str]):
+    if not url or url.startswith("memory://"):
+        return MemoryBackend()
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url.split("///", 1)[1])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    raise RuntimeError(f"RATE_LIMIT_STORAGE_URL no soportada: {url}")
+
+
+class RateLimiter:
+    """
+    Limitador de ventana deslizante con contadores de intentos permitidos y
+    bloqueados por scope (p.ej. "login").
+    """
+
+    def __init__(self, backend, window_seconds: float):
+        self.backend = backend
+        self.window = window_seconds
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"allowed": 0, "blocked": 0}
+        )
+        self._counters_lock = threading.Lock()
+
+    def check(self, scope: str, limits: Tuple[Tuple[str, int], ...]) -> None:
+        """
+        ``limits`` es una tupla de (clave, máximo). Lanza 429 si alguna clave
+        ya alcanzó su máximo dentro de la ventana. El intento se registra en
+        todas las claves o en ninguna: si la IP está bloqueada, no suma en la
+        del identificador (un atacante bloqueado no puede trabar la cuenta).
+        """
+        now = time.time()
+        scoped = tuple((f"{scope}:{key}", limit) for key, limit in limits)
+        retry_after = self.backend.hit_many(scoped, self.window, now)
+        if retry_after is not None:
+            self._count(scope, "blocked")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiados intentos. Probá de nuevo en unos minutos.",
+                headers={"Retry-After": str(max(1, int(math.ceil(retry_after))))},
+            )
+        self._count(scope, "allowed")
+
+    def reset(self, scope: str, key: str) -> None:
+        self.backend.reset(f"{scope}:{key}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._counters_lock:
+            return {scope: dict(c) for scope, c in self._counters.items()}
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._counters_lock:
+            self._counters.clear()
+
+    def _count(self, scope: str, outcome: str) -> None:
+        with self._counters_lock:
+            self._counters[scope][outcome] += 1
+
+
+AUTH_RATE_LIMIT_WINDOW_SECONDS = float(
+    os.getenv("AUTH_RATE_LIMIT_WINDOW_SECONDS", "300")
+)
+AUTH_RATE_LIMIT_PER_IDENTIFIER = int(os.getenv("AUTH_RATE_LIMIT_PER_IDENTIFIER", "10"))
+AUTH_RATE_LIMIT_PER_IP = int(os.getenv("AUTH_RATE_LIMIT_PER_IP", "50"))
+# Solo confiar en X-Forwarded-For si la app corre detrás de un proxy propio.
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+auth_limiter = RateLimiter(
+    _backend_from_url(os.getenv("RATE_LIMIT_STORAGE_URL")),
+    AUTH_RATE_LIMIT_WINDOW_SECONDS,
+)
+
+
+def client_ip(request: Request) -> str:
+    forwarded = request.headers.get("x-forwarded-for")
+    if TRUST_FORWARDED_FOR and forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _normalize(identifier: str) -> str:
+    return (identifier or "").strip().lower()
+
+
+def check_auth_attempt(scope: str, request: Request, identifier: str) -> None:
+    """Aplica los límites por identificador y por IP a un intento de autenticación."""
+    auth_limiter.check(
+        scope,
+        (
+            (f"id:{_normalize(identifier)}", AUTH_RATE_LIMIT_PER_IDENTIFIER),
+            (f"ip:{client_ip(request)}", AUTH_RATE_LIMIT_PER_IP),
+        ),
+    )
+
+
+def reset_auth_identifier(scope: str, identifier: str) -> None:
+    auth_limiter.reset(scope, f"id:{_normalize(identifier)}")
@@ -0,0 +1,50 @@
+"""
+Lecturas consistentes con las escrituras propias ("read your writes").
+
+Los GET leen de la réplica (ver ``db.get_read_db``), que puede ir unos
+segundos atrasada. Para que un usuario vea enseguida lo que acaba de
+escribir, cada pedido que modifica algo (POST/PUT/PATCH/DELETE con
+respuesta exitosa) deja una cookie con la hora de la escritura; mientras
+no pasen READ_YOUR_WRITES_SECONDS, sus lecturas van a la base principal.
+"""
+
+import os
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+LAST_WRITE_COOKIE = "plango_last_write"
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def wrote_recently(request: Request) -> bool:
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - last_write < READ_YOUR_WRITES_SECONDS
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; "
+                    f"Max-Age={int(READ_YOUR_WRITES_SECONDS) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
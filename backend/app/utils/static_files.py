@@ -0,0 +1,115 @@
+"""
+StaticFiles con headers de caché para uploads y el bundle del frontend.
+
+- Archivos con hash de contenido en el nombre (uploads ``<sha256>.jpg``, sus
+  variantes ``<sha256>_thumb.webp`` y los assets de Vite
+  ``assets/index-D0yerDeH.css``) nunca cambian: se sirven con
+  ``Cache-Control: immutable`` por un año.
+- El resto (index.html, favicon, uploads viejos como ``pub_1_0.jpg``) se
+  revalida siempre (``no-cache``) con un ETag fuerte derivado del contenido,
+  así el navegador recibe un 304 si no cambió.
+- Si existe ``<archivo>.br`` o ``<archivo>.gz`` (ver frontend/scripts/precompress.mjs)
+  y el cliente lo acepta, se sirve la versión precomprimida.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+_UPLOAD_BLOB_RE = re.compile(r"^[0-9a-f]{64}(_[a-z]+)?\.\w+$")  # blobs y sus variantes
+# Vite deja nombre-[hash].ext solo en assets/; afuera un "logo-darkmode.svg"
+# tiene la misma forma y sí puede cambiar
+_VITE_ASSET_RE = re.compile(r"-[A-Za-z0-9_-]{8}\.\w+$")
+_PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def is_hashed_name(path: str) -> bool:
+    directory, name = os.path.split(path)
+    if _UPLOAD_BLOB_RE.search(name):
+        return True
+    return os.path.basename(directory) == "assets" and bool(_VITE_ASSET_RE.search(name))
+
+
+@lru_cache(maxsize=4096)
+def _content_etag(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def accepted_encodings(request_headers: Headers) -> set:
+    accepted = set()
+    for part in request_headers.get("accept-encoding", "").split(","):
+        name, _, params = part.partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class CachedStaticFiles(StaticFiles):
+    def _precompressed(
+        self, full_path: str, request_headers: Headers
+    ) -> Tuple[Optional[str], str, Optional[os.stat_result]]:
+        accepted = accepted_encodings(request_headers)
+        for encoding, suffix in _PRECOMPRESSED:
+            if encoding in accepted:
+                try:
+                    return encoding, full_path + suffix, os.stat(full_path + suffix)
+                except OSError:
+                    continue
+        return None, full_path, None
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        encoding, serve_path, serve_stat = self._precompressed(full_path, request_headers)
+
+        response = FileResponse(
+            serve_path,
+            status_code=status_code,
+            stat_result=serve_stat or stat_result,
+            # el tipo es el del original, no el de .br/.gz
+            media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+        )
+        if is_hashed_name(full_path):
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            stat_used = serve_stat or stat_result
+            etag = _content_etag(serve_path, stat_used.st_mtime_ns, stat_used.st_size)
+            if encoding:
+                etag = etag[:-1] + f'-{encoding}"'
+            response.headers["etag"] = etag
+            response.headers["cache-control"] = REVALIDATE_CACHE_CONTROL
+        if encoding:
+            response.headers["content-encoding"] = encoding
+        if os.path.exists(full_path + ".br") or os.path.exists(full_path + ".gz"):
+            response.headers["vary"] = "Accept-Encoding"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
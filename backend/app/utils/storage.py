@@ -0,0 +1,188 @@
+"""
+Almacenamiento de archivos subidos (fotos y sus variantes).
+
+Los archivos se identifican por una clave relativa, p.ej.
+``uploads/publications/<sha256>.jpg``; la URL pública siempre se genera con
+``backend.url(clave)``. El backend se elige con STORAGE_URL:
+
+- sin definir o ``local://``: disco local en backend/app/static, servido por
+  StaticFiles en /static (un solo nodo).
+- ``s3://<bucket>``: S3 o compatible (MinIO, R2...). Opcionales:
+  S3_ENDPOINT_URL, S3_REGION y S3_PUBLIC_BASE_URL (CDN o URL pública del
+  bucket). Las credenciales salen de las variables estándar de AWS.
+  Requiere el paquete boto3. Permite subidas directas con URLs prefirmadas.
+"""
+
+import base64
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+STATIC_DIR = os.path.join("backend", "app", "static")
+PRESIGN_EXPIRES_SECONDS = int(os.getenv("STORAGE_PRESIGN_EXPIRES_SECONDS", "900"))
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class LocalStorage:
+    def __init__(self, root: str = STATIC_DIR, base_url: str = "/static"):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        prefix = self.base_url + "/"
+        return url[len(prefix) :] if url and url.startswith(prefix) else None
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self.path(key))
+        except OSError:
+            return None
+
+    def put_file(
+        self, local_path: str, key: str, content_type: Optional[str] = None, move: bool = False
+    ) -> None:
+        dest = self.path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # copiar/mover a un .part y renombrar: nunca queda un archivo a medias
+        (shutil.move if move else shutil.copyfile)(local_path, dest + ".part")
+        os.replace(dest + ".part", dest)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        yield self.path(key)
+
+    def presign_upload(self, key: str, content_type: str, sha256_hex: str) -> Optional[Dict]:
+        return None
+
+
+class S3Storage:
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        public_base_url: Optional[str] = None,
+        client=None,
+    ):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError(
+                    "STORAGE_URL usa s3:// pero el paquete boto3 no está instalado"
+                ) from e
+            client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self._client = client
+        self.bucket = bucket
+        if not public_base_url:
+            public_base_url = (
+                f"{endpoint_url.rstrip('/')}/{bucket}"
+                if endpoint_url
+                else f"https://{bucket}.s3.amazonaws.com"
+            )
+        self.base_url = public_base_url.rstrip("/")
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        prefix = self.base_url + "/"
+        return url[len(prefix) :] if url and url.startswith(prefix) else None
+
+    def _head(self, key: str) -> Optional[Dict]:
+        try:
+            return self._client.head_object(Bucket=self.bucket, Key=key)
+        except self._client.exceptions.ClientError as e:
+            if str(e.response.get("Error", {}).get("Code")) in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def size(self, key: str) -> Optional[int]:
+        head = self._head(key)
+        return head["ContentLength"] if head else None
+
+    def put_file(
+        self, local_path: str, key: str, content_type: Optional[str] = None, move: bool = False
+    ) -> None:
+        extra = {"CacheControl": CACHE_CONTROL}
+        if content_type:
+            extra["ContentType"] = content_type
+        self._client.upload_file(local_path, self.bucket, key, ExtraArgs=extra)
+        if move:
+            os.remove(local_path)
+
+    def delete(self, key: str) -> None:
+        self._client.delete_object(Bucket=self.bucket, Key=key)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+        os.close(fd)
+        try:
+            self._client.download_file(self.bucket, key, tmp_path)
+            yield tmp_path
+        finally:
+            os.remove(tmp_path)
+
+    def presign_upload(self, key: str, content_type: str, sha256_hex: str) -> Optional[Dict]:
+        """
+        URL prefirmada para un PUT directo al bucket. S3 verifica el checksum,
+        así la clave (que es el hash) siempre corresponde al contenido.
+        """
+        checksum = base64.b64encode(bytes.fromhex(sha256_hex)).decode()
+        url = self._client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ContentType": content_type,
+                "CacheControl": CACHE_CONTROL,
+                "ChecksumSHA256": checksum,
+            },
+            ExpiresIn=PRESIGN_EXPIRES_SECONDS,
+        )
+        return {
+            "method": "PUT",
+            "url": url,
+            "headers": {
+                "Content-Type": content_type,
+                "Cache-Control": CACHE_CONTROL,
+                "x-amz-checksum-sha256": checksum,
+            },
+        }
+
+
+def _storage_from_url(url: Optional[str]):
+    if not url or url.startswith("local://"):
+        return LocalStorage()
+    if url.startswith("s3://"):
+        return S3Storage(
+            bucket=url[len("s3://") :].strip("/"),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            region=os.getenv("S3_REGION") or None,
+            public_base_url=os.getenv("S3_PUBLIC_BASE_URL") or None,
+        )
+    raise RuntimeError(f"STORAGE_URL no soportada: {url}")
+
+
+backend = _storage_from_url(os.getenv("STORAGE_URL"))
@@ -0,0 +1,350 @@
+"""
+Guardado de archivos subidos en streaming y deduplicado por contenido.
+
+El archivo se copia a un temporal en bloques de UPLOAD_CHUNK_SIZE mientras
+se calcula su SHA-256, cortando con 413 apenas supera MAX_UPLOAD_BYTES, y
+después se pasa al storage (utils/storage.py). Las imágenes que traen
+metadatos (EXIF con GPS, XMP) se limpian antes con
+``image_variants.strip_metadata``, ya que el original se sirve públicamente;
+las subidas directas al storage se limpian al registrarlas.
+El nombre final es el hash del archivo guardado (``<sha256><ext>``), así dos
+subidas iguales comparten un único archivo.
+La tabla upload_blobs lleva la cuenta de referencias: ``store_upload`` la
+incrementa y ``release`` la decrementa. Los archivos sin referencias se
+borran con ``delete_orphans`` después del commit, dentro de una transacción
+que bloquea la fila del blob: un ``store_upload`` concurrente del mismo
+contenido espera ese lock en ``_acquire`` y, como recién después se fija si
+el archivo existe, lo vuelve a subir. Por el mismo motivo los archivos
+nuevos de un pedido que termina en error se limpian con ``discard_on_error``.
+
+UploadSizeLimitMiddleware rechaza antes de leer el body los pedidos
+multipart cuyo Content-Length ya excede el máximo permitido.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from starlette.responses import JSONResponse
+
+from ..db import insert_ignore
+from ..models import UploadBlob
+from . import image_variants, storage
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_FILES_PER_REQUEST = 4
+# margen para los campos de texto y los separadores del multipart
+_MULTIPART_OVERHEAD = 1024 * 1024
+
+_SHA256_RE = re.compile(r"[0-9a-f]{64}")
+
+# clave de Session.info con las URLs cuyos archivos subió esta sesión
+_NEW_UPLOADS = "new_uploads"
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+_EXTENSION_CONTENT_TYPES = {ext: ct for ct, ext in CONTENT_TYPE_EXTENSIONS.items()}
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"El archivo supera el máximo de {MAX_UPLOAD_BYTES // (1024 * 1024)} MB",
+    )
+
+
+def _acquire(db: Session, url: str, sha256: str, size: int) -> None:
+    inc = (
+        update(UploadBlob)
+        .where(UploadBlob.url == url)
+        .values(ref_count=UploadBlob.ref_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(inc).rowcount:
+        return
+    # Sin SAVEPOINT: si otro pedido registró el mismo contenido en paralelo,
+    # el INSERT no hace nada y el UPDATE suma sobre su fila.
+    db.execute(
+        insert_ignore(db, UploadBlob.__table__, ["url"]).values(
+            url=url, sha256=sha256, size=size, ref_count=0
+        )
+    )
+    db.execute(inc)
+
+
+def _strip_metadata(path: str) -> bool:
+    try:
+        return image_variants.strip_metadata(path)
+    except image_variants.InvalidImageError as e:
+        # se guarda igual; tampoco tendrá variantes (ver image_variants)
+        logger.warning("No se pudieron limpiar los metadatos de la subida: %s", e)
+        return False
+
+
+def _file_sha256(path: str) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest(), os.path.getsize(path)
+
+
+def _blob_key(subdir: str, sha256: str, ext: str) -> str:
+    return "/".join(p for p in ("uploads", subdir, f"{sha256}{ext}") if p)
+
+
+def store_upload(db: Session, upload: UploadFile, subdir: str = "") -> str:
+    """
+    Guarda ``upload`` bajo la clave ``uploads/<subdir>/<sha256><ext>`` del
+    storage y suma una referencia al blob (sin commit). Devuelve la URL pública.
+    """
+    if upload.size is not None and upload.size > MAX_UPLOAD_BYTES:
+        raise _too_large()
+
+    ext = CONTENT_TYPE_EXTENSIONS.get(upload.content_type, ".bin")
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = upload.file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise _too_large()
+                digest.update(chunk)
+                out.write(chunk)
+        sha256 = digest.hexdigest()
+        if upload.content_type in CONTENT_TYPE_EXTENSIONS and _strip_metadata(tmp_path):
+            sha256, size = _file_sha256(tmp_path)
+        return _store_file(db, tmp_path, subdir, sha256, size, ext, upload.content_type)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _store_file(
+    db: Session,
+    tmp_path: str,
+    subdir: str,
+    sha256: str,
+    size: int,
+    ext: str,
+    content_type: Optional[str],
+) -> str:
+    key = _blob_key(subdir, sha256, ext)
+    url = storage.backend.url(key)
+    # primero la referencia: si delete_orphans está borrando este blob,
+    # _acquire espera su lock y después el archivo ya no existe
+    _acquire(db, url, sha256, size)
+    if not storage.backend.exists(key):
+        storage.backend.put_file(tmp_path, key, content_type, move=True)
+        db.info.setdefault(_NEW_UPLOADS, []).append(url)
+    return url
+
+
+def presign_upload(subdir: str, content_type: str, sha256: str, size: int) -> Dict:
+    """
+    Prepara una subida directa al storage (sin pasar por la API). Lanza 501 si
+    el backend configurado no la soporta.
+    """
+    if size > MAX_UPLOAD_BYTES:
+        raise _too_large()
+    key = _blob_key(subdir, sha256, CONTENT_TYPE_EXTENSIONS[content_type])
+    upload = storage.backend.presign_upload(key, content_type, sha256)
+    if upload is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="El almacenamiento configurado no admite subidas directas",
+        )
+    return {**upload, "file_url": storage.backend.url(key)}
+
+
+def register_direct_upload(db: Session, url: str, subdir: str = "") -> str:
+    """
+    Suma una referencia a un archivo subido directamente con ``presign_upload``
+    (sin commit). Verifica que la URL sea un blob válido y que ya esté subido.
+    Como ese archivo no pasó por la API, si trae metadatos se reemplaza por
+    una copia limpia: la URL devuelta puede no ser ``url``.
+    """
+    key = storage.backend.key_from_url(url)
+    name = key.rsplit("/", 1)[-1] if key else ""
+    sha256, ext = os.path.splitext(name)
+    if (
+        key != _blob_key(subdir, sha256, ext)
+        or not _SHA256_RE.fullmatch(sha256)
+        or ext not in CONTENT_TYPE_EXTENSIONS.values()
+    ):
+        raise HTTPException(status_code=400, detail=f"URL de archivo inválida: {url}")
+    size = storage.backend.size(key)
+    if size is None:
+        raise HTTPException(status_code=400, detail=f"El archivo no fue subido: {url}")
+    if size > MAX_UPLOAD_BYTES:
+        raise _too_large()
+    cleaned = _cleaned_direct_upload(db, key, url, subdir, ext)
+    if cleaned:
+        return cleaned
+    _acquire(db, url, sha256, size)
+    return url
+
+
+def _cleaned_direct_upload(
+    db: Session, key: str, url: str, subdir: str, ext: str
+) -> Optional[str]:
+    """
+    Si la subida directa trae metadatos, guarda la versión limpia como un blob
+    nuevo (con su propio hash) y borra la original, salvo que ya fuera un blob
+    registrado. Devuelve la URL del blob limpio, o None si no hacía falta.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=ext)
+    os.close(fd)
+    try:
+        # copia propia: LocalStorage.local_copy entrega el archivo guardado
+        with storage.backend.local_copy(key) as src_path:
+            shutil.copyfile(src_path, tmp_path)
+        if not _strip_metadata(tmp_path):
+            return None
+        sha256, size = _file_sha256(tmp_path)
+        content_type = _EXTENSION_CONTENT_TYPES[ext]
+        cleaned = _store_file(db, tmp_path, subdir, sha256, size, ext, content_type)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    if db.get(UploadBlob, url) is None:
+        storage.backend.delete(key)
+    return cleaned
+
+
+def release(db: Session, urls: Iterable[Optional[str]]) -> List[str]:
+    """
+    Resta una referencia a cada URL (sin commit). Devuelve las URLs que
+    quedaron sin uso, para pasarlas a ``delete_orphans`` una vez confirmada la
+    transacción. Las URLs que no son blobs se ignoran.
+    """
+    orphaned: List[str] = []
+    for url in urls:
+        if not url:
+            continue
+        db.execute(
+            update(UploadBlob)
+            .where(UploadBlob.url == url)
+            .values(ref_count=UploadBlob.ref_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        ref_count = db.execute(
+            select(UploadBlob.ref_count).where(UploadBlob.url == url)
+        ).scalar()
+        if ref_count is not None and ref_count <= 0:
+            orphaned.append(url)
+    return orphaned
+
+
+def _lock_unreferenced(db: Session, url: str) -> bool:
+    """
+    Bloquea la fila del blob si no tiene referencias (si no existe, inserta
+    una vacía para tener qué bloquear). El lock dura hasta el commit.
+    """
+    lock = (
+        update(UploadBlob)
+        .where(UploadBlob.url == url, UploadBlob.ref_count <= 0)
+        .values(ref_count=0)
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(lock).rowcount:
+        return True
+    name = url.rsplit("/", 1)[-1]
+    db.execute(
+        insert_ignore(db, UploadBlob.__table__, ["url"]).values(
+            url=url, sha256=os.path.splitext(name)[0], size=0, ref_count=0
+        )
+    )
+    # si la fila ya existía, tiene referencias y el UPDATE no la toca
+    return bool(db.execute(lock).rowcount)
+
+
+def delete_orphans(db: Session, urls: Iterable[str]) -> None:
+    """
+    Borra los archivos (y variantes) de ``urls`` que siguen sin referencias.
+    Cada uno en su propia transacción, con la fila del blob bloqueada desde el
+    chequeo hasta después de borrar el archivo.
+    """
+    for url in urls:
+        key = storage.backend.key_from_url(url)
+        if not key:
+            continue
+        try:
+            if not _lock_unreferenced(db, url):
+                db.rollback()
+                continue
+            for k in [key, *image_variants.variant_keys(url)]:
+                storage.backend.delete(k)
+            db.execute(
+                delete(UploadBlob)
+                .where(UploadBlob.url == url)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("No se pudo borrar %s: %s", url, e)
+
+
+@contextmanager
+def discard_on_error(db: Session):
+    """
+    Envuelve el bloque que sube archivos y hace commit: si falla, deshace la
+    transacción y borra los archivos que subió y quedaron sin referencias.
+    """
+    try:
+        yield
+    except BaseException:
+        db.rollback()
+        delete_orphans(db, db.info.pop(_NEW_UPLOADS, []))
+        raise
+    else:
+        db.info.pop(_NEW_UPLOADS, None)
+
+
+class UploadSizeLimitMiddleware:
+    """Corta con 413 los multipart cuyo Content-Length supera el límite."""
+
+    def __init__(self, app, max_body_bytes: Optional[int] = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes or (
+            MAX_UPLOAD_BYTES * MAX_FILES_PER_REQUEST + _MULTIPART_OVERHEAD
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            content_type = headers.get(b"content-type", b"")
+            length = headers.get(b"content-length")
+            if (
+                content_type.startswith(b"multipart/form-data")
+                and length
+                and length.isdigit()
+                and int(length) > self.max_body_bytes
+            ):
+                response = JSONResponse(
+                    {"detail": "El pedido supera el tamaño máximo permitido"},
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
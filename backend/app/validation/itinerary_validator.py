@@ -2,11 +2,14 @@
 Módulo de validación de itinerarios - valida tanto itinerarios de IA como personalizados
 """
 
+import logging
 from datetime import datetime, date
 from typing import List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from backend.app import models
 
+logger = logging.getLogger(__name__)
+
 
 class ItineraryValidationError:
     """Representa un error de validación en un itinerario"""
@@ -91,8 +94,11 @@ class ItineraryValidator:
     ) -> dict:
         """Valida un itinerario generado por IA"""
 
-        print(f"[VALIDATION] Validando itinerario de IA...")
-        print(f"[VALIDATION] Presupuesto: US${budget} | Personas: {cant_persons}")
+        logger.debug(
+            "Validando itinerario de IA: presupuesto US$%s, %s personas",
+            budget,
+            cant_persons,
+        )
 
         used_publications = ai_data.get("used_publications", [])
         ai_total_cost = ai_data.get("total_cost", 0)
@@ -189,7 +195,7 @@ class ItineraryValidator:
     ) -> dict:
         """Valida un itinerario personalizado"""
 
-        print(f"[VALIDATION] Validando itinerario personalizado...")
+        logger.debug("Validando itinerario personalizado")
 
         real_total_cost = 0.0
         validated_publications = []
@@ -406,7 +412,7 @@ class ItineraryValidator:
         """Agrega un error de validación"""
         error = ItineraryValidationError(error_type, message, **kwargs)
         self.errors.append(error)
-        print(f"[VALIDATION ERROR] {error_type}: {message}")
+        logger.debug("Error de validación %s: %s", error_type, message)
 
     def _add_warning(self, warning_type: str, message: str, **kwargs):
         """Agrega una advertencia de validación"""
@@ -414,7 +420,7 @@ class ItineraryValidator:
             warning_type, message, severity="warning", **kwargs
         )
         self.warnings.append(warning)
-        print(f"[VALIDATION WARNING] {warning_type}: {message}")
+        logger.debug("Advertencia de validación %s: %s", warning_type, message)
 
     def _generate_validation_summary(self) -> str:
         """Genera un resumen de la validación"""
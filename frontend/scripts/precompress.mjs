@@ -0,0 +1,32 @@
+// Genera <archivo>.br y <archivo>.gz junto a cada archivo de texto de dist/.
+// El backend (CachedStaticFiles) los sirve cuando el navegador los acepta.
+import { readdir, readFile, stat, writeFile } from "node:fs/promises";
+import { join } from "node:path";
+import { brotliCompressSync, constants, gzipSync } from "node:zlib";
+
+const DIST = new URL("../dist/", import.meta.url).pathname;
+const COMPRESSIBLE = /\.(html|css|js|mjs|json|svg|txt|xml|map|webmanifest)$/;
+const MIN_BYTES = 1024;
+
+async function* walk(dir) {
+  for (const entry of await readdir(dir, { withFileTypes: true })) {
+    const path = join(dir, entry.name);
+    if (entry.isDirectory()) yield* walk(path);
+    else yield path;
+  }
+}
+
+let count = 0;
+for await (const path of walk(DIST)) {
+  if (!COMPRESSIBLE.test(path) || (await stat(path)).size < MIN_BYTES) continue;
+  const data = await readFile(path);
+  const br = brotliCompressSync(data, {
+    params: { [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY },
+  });
+  const gz = gzipSync(data, { level: 9 });
+  // solo vale la pena si la versión comprimida es más chica
+  if (br.length < data.length) await writeFile(`${path}.br`, br);
+  if (gz.length < data.length) await writeFile(`${path}.gz`, gz);
+  count++;
+}
+console.log(`precompress: ${count} archivos comprimidos en ${DIST}`);
@@ -1,6 +1,6 @@
 import React, { useEffect, useMemo, useRef, useState } from "react";
 
-async function request(
+async function send(
   path,
   { method = "GET", token, body, isForm = false } = {},
 ) {
@@ -18,9 +18,22 @@ async function request(
     const err = await res.json().catch(() => ({}));
     throw new Error(err.detail || err.message || `HTTP ${res.status}`);
   }
+  return res;
+}
+
+async function request(path, options) {
+  const res = await send(path, options);
   return res.json().catch(() => ({}));
 }
 
+// Endpoints paginados por cursor: items de la página y header X-Next-Cursor.
+async function requestPage(path, { token, cursor } = {}) {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const res = await send(`${path}${query}`, { token });
+  const items = await res.json().catch(() => []);
+  return { items, nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
 function Stars({ value = 0 }) {
   const pct = Math.max(0, Math.min(100, (Number(value) / 5) * 100));
   return (
@@ -48,6 +61,7 @@ export default function Backoffice({ me, view = "publications" }) {
   const [pendingPubs, setPendingPubs] = useState([]);
   const [deletionRequests, setDeletionRequests] = useState([]);
   const [reviewReports, setReviewReports] = useState([]);
+  const [reviewReportsCursor, setReviewReportsCursor] = useState(null);
   const [error, setError] = useState("");
   const [okMsg, setOkMsg] = useState("");
   const [searchQuery, setSearchQuery] = useState("");
@@ -113,12 +127,16 @@ export default function Backoffice({ me, view = "publications" }) {
     }
   }
 
-  async function fetchReviewReports() {
+  async function fetchReviewReports(cursor = null) {
     setLoading(true);
     setError("");
     try {
-      const data = await request("/api/reviews/reports/pending", { token });
-      setReviewReports(data);
+      const { items, nextCursor } = await requestPage(
+        "/api/reviews/reports/pending",
+        { token, cursor },
+      );
+      setReviewReports((prev) => (cursor ? [...prev, ...items] : items));
+      setReviewReportsCursor(nextCursor);
     } catch (e) {
       setError(e.message);
     } finally {
@@ -597,6 +615,8 @@ export default function Backoffice({ me, view = "publications" }) {
     return renderViewWithStats(
       <ReviewReportsView
         reports={reviewReports}
+        hasMore={Boolean(reviewReportsCursor)}
+        onLoadMore={() => fetchReviewReports(reviewReportsCursor)}
         loading={loading}
         error={error}
         okMsg={okMsg}
@@ -1915,6 +1935,8 @@ function PublicationDetailModal({ open, pub, onClose, onToggleFavorite, me }) {
 
 function ReviewReportsView({
   reports,
+  hasMore,
+  onLoadMore,
   loading,
   error,
   okMsg,
@@ -2094,6 +2116,18 @@ function ReviewReportsView({
         })}
       </div>
 
+      {hasMore && (
+        <div className="text-center mt-3">
+          <button
+            className="btn btn-outline-secondary"
+            onClick={onLoadMore}
+            disabled={loading}
+          >
+            Cargar más reportes
+          </button>
+        </div>
+      )}
+
       {!loading && reports.length === 0 && (
         <div className="alert alert-secondary mt-3">
           No hay reportes de reseñas pendientes.
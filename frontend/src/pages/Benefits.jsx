@@ -1,11 +1,13 @@
 import React, { useState, useEffect } from "react";
-import { request } from "../utils/api";
+import { request, requestPage } from "../utils/api";
 import PublicationDetailModal from "../components/PublicationDetailModal";
 
 export default function Benefits({ token, me }) {
   const [activeView, setActiveView] = useState("benefits");
   const [userPoints, setUserPoints] = useState(0);
   const [pointsMovements, setPointsMovements] = useState([]);
+  const [movementsCursor, setMovementsCursor] = useState(null);
+  const [loadingMoreMovements, setLoadingMoreMovements] = useState(false);
   const [premiumBenefits, setPremiumBenefits] = useState([]);
   const [userBenefits, setUserBenefits] = useState([]);
   const [obtainedBenefits, setObtainedBenefits] = useState(new Set());
@@ -165,8 +167,12 @@ export default function Benefits({ token, me }) {
     setLoading(true);
     setError("");
     try {
-      const data = await request("/api/users/points/movements", { token });
-      setPointsMovements(data || []);
+      const { items, nextCursor } = await requestPage(
+        "/api/users/points/movements",
+        { token },
+      );
+      setPointsMovements(items || []);
+      setMovementsCursor(nextCursor);
     } catch (e) {
       console.error("Error al cargar movimientos:", e);
       setError("Error al cargar el historial de puntos");
@@ -175,6 +181,23 @@ export default function Benefits({ token, me }) {
     }
   }
 
+  async function fetchMorePointsMovements() {
+    setLoadingMoreMovements(true);
+    try {
+      const { items, nextCursor } = await requestPage(
+        "/api/users/points/movements",
+        { token, cursor: movementsCursor },
+      );
+      setPointsMovements((prev) => [...prev, ...(items || [])]);
+      setMovementsCursor(nextCursor);
+    } catch (e) {
+      console.error("Error al cargar movimientos:", e);
+      setError("Error al cargar el historial de puntos");
+    } finally {
+      setLoadingMoreMovements(false);
+    }
+  }
+
   async function fetchPremiumBenefits() {
     setLoading(true);
     setError("");
@@ -784,6 +807,19 @@ export default function Benefits({ token, me }) {
                     ))}
                   </tbody>
                 </table>
+                {movementsCursor && (
+                  <div className="text-center">
+                    <button
+                      className="btn btn-outline-secondary btn-sm"
+                      onClick={fetchMorePointsMovements}
+                      disabled={loadingMoreMovements}
+                    >
+                      {loadingMoreMovements
+                        ? "Cargando..."
+                        : "Ver más movimientos"}
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
@@ -1,6 +1,6 @@
 const API_BASE_URL = "http://localhost:8000";
 
-export async function request(
+async function send(
   path,
   { method = "GET", token, body, isForm = false } = {},
 ) {
@@ -26,9 +26,24 @@ export async function request(
     }
     throw new Error(err.detail || err.message || `HTTP ${res.status}`);
   }
+  return res;
+}
+
+export async function request(path, options) {
+  const res = await send(path, options);
   return res.json().catch(() => ({}));
 }
 
+// Endpoints paginados por cursor: devuelve los items y el valor del header
+// X-Next-Cursor (null en la última página) para pedir la siguiente.
+export async function requestPage(path, { token, cursor } = {}) {
+  const query = cursor ? `cursor=${encodeURIComponent(cursor)}` : "";
+  const sep = path.includes("?") ? "&" : "?";
+  const res = await send(query ? `${path}${sep}${query}` : path, { token });
+  const items = await res.json().catch(() => []);
+  return { items, nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
 export function useToken() {
   return localStorage.getItem("token") || "";
 }
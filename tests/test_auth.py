@@ -1,6 +1,9 @@
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from backend.app import models, security
+from backend.app.utils import principal_cache, rate_limit
 
 
 def test_register_user_success(
@@ -141,3 +144,172 @@ def test_forgot_password_flow(client: TestClient, test_user, test_user_data: dic
         json={"identifier": test_user_data["email"], "password": new_password},
     )
     assert final_login_response.status_code == 200
+
+
+def test_principal_is_cached_between_requests(
+    client: TestClient, auth_headers: dict, db_session: Session, test_user
+):
+    """Mientras dure el TTL, el rol se lee de la caché y no de la DB."""
+    first = client.get("/api/publications/pending", headers=auth_headers)
+    assert first.status_code == 403
+
+    test_user.role = "admin"
+    db_session.commit()
+
+    cached = client.get("/api/publications/pending", headers=auth_headers)
+    assert cached.status_code == 403
+
+    principal_cache.invalidate_user(test_user.id)
+    fresh = client.get("/api/publications/pending", headers=auth_headers)
+    assert fresh.status_code == 200
+
+
+def test_subscribe_invalidates_cached_role(client: TestClient, auth_headers: dict):
+    """Al cambiar el rol, el principal cacheado se descarta."""
+    denied = client.get("/api/users/benefits", headers=auth_headers)
+    assert denied.status_code == 403
+
+    response = client.post("/api/users/me/subscribe", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["role"] == "premium"
+
+    review_like = client.post(
+        "/api/publications/reviews/999/like", headers=auth_headers
+    )
+    assert review_like.status_code == 404
+
+
+def test_principal_cache_invalidate_user():
+    principal = principal_cache.Principal(id=7, username="u7", role="user")
+    principal_cache.put(7, 100, principal)
+    principal_cache.put(7, 200, principal)
+    assert principal_cache.get(7, 100) == principal
+
+    principal_cache.invalidate_user(7)
+
+    assert principal_cache.get(7, 100) is None
+    assert principal_cache.get(7, 200) is None
+
+
+def test_login_rehashes_password_with_new_cost(
+    client: TestClient, db_session: Session, test_user, test_user_data: dict
+):
+    """Si cambia BCRYPT_ROUNDS, el login regenera el hash de forma transparente."""
+    from passlib.context import CryptContext
+
+    old_context = CryptContext(
+        schemes=["bcrypt"], bcrypt__rounds=security.BCRYPT_ROUNDS + 1
+    )
+    test_user.hashed_password = old_context.hash(test_user_data["password"])
+    db_session.commit()
+    assert security.pwd_context.needs_update(test_user.hashed_password)
+
+    response = client.post(
+        "/api/auth/login",
+        json={
+            "identifier": test_user_data["email"],
+            "password": test_user_data["password"],
+        },
+    )
+    assert response.status_code == 200
+
+    db_session.refresh(test_user)
+    assert not security.pwd_context.needs_update(test_user.hashed_password)
+    assert security.verify_password(
+        test_user_data["password"], test_user.hashed_password
+    )
+
+
+def test_hash_passwords_in_parallel():
+    hashes = security.hash_passwords("pw", "answer-1", "answer-2")
+    assert len(hashes) == 3
+    assert security.verify_passwords(
+        ("pw", hashes[0]), ("answer-1", hashes[1]), ("wrong", hashes[2])
+    ) == [True, True, False]
+
+
+def test_login_rate_limited_before_hashing(
+    client: TestClient, test_user, test_user_data: dict, monkeypatch
+):
+    """Superado el límite por identificador se responde 429 sin llamar a bcrypt."""
+    monkeypatch.setattr(rate_limit, "AUTH_RATE_LIMIT_PER_IDENTIFIER", 3)
+    bad_login = {"identifier": test_user_data["email"], "password": "wrong"}
+    for _ in range(3):
+        assert client.post("/api/auth/login", json=bad_login).status_code == 401
+
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("bcrypt no debería ejecutarse")
+
+    monkeypatch.setattr(security, "verify_and_update_password", fail_if_called)
+    response = client.post("/api/auth/login", json=bad_login)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    assert rate_limit.auth_limiter.stats()["login"] == {"allowed": 3, "blocked": 1}
+
+
+def test_forgot_password_rate_limited_per_ip(
+    client: TestClient, test_user, monkeypatch
+):
+    monkeypatch.setattr(rate_limit, "AUTH_RATE_LIMIT_PER_IP", 2)
+    for identifier in ("a@example.com", "b@example.com"):
+        response = client.post(
+            "/api/auth/forgot-password/get-questions", json={"identifier": identifier}
+        )
+        assert response.status_code == 404
+
+    response = client.post(
+        "/api/auth/forgot-password/get-questions",
+        json={"identifier": "c@example.com"},
+    )
+    assert response.status_code == 429
+
+
+def test_rate_limit_sqlite_backend_is_shared(tmp_path):
+    """Dos limitadores sobre el mismo archivo comparten la ventana (multi-worker)."""
+    path = str(tmp_path / "ratelimit.db")
+    worker_a = rate_limit.RateLimiter(rate_limit.SQLiteBackend(path), 60)
+    worker_b = rate_limit.RateLimiter(rate_limit.SQLiteBackend(path), 60)
+
+    worker_a.check("login", (("id:x", 2),))
+    worker_b.check("login", (("id:x", 2),))
+    with pytest.raises(HTTPException) as exc:
+        worker_a.check("login", (("id:x", 2),))
+    assert exc.value.status_code == 429
+
+
+def test_rate_limit_memory_backend_does_not_keep_every_key():
+    """Las claves vencidas se descartan y el total queda acotado por max_keys."""
+    backend = rate_limit.MemoryBackend(max_keys=1000)
+    for i in range(5000):
+        backend.hit(f"login:ip:10.0.{i // 256}.{i % 256}", 5, 60, now=i * 0.001)
+    assert len(backend) == 1000
+
+    backend.hit("login:id:otro", 5, 60, now=120)
+    assert len(backend) == 1
+
+    # una clave bloqueada sigue bloqueada aunque lleguen otras
+    for _ in range(2):
+        backend.hit("login:id:victima", 2, 60, now=130)
+    assert backend.hit("login:id:victima", 2, 60, now=131) is not None
+
+
+@pytest.mark.parametrize("backend_kind", ["memory", "sqlite"])
+def test_blocked_ip_does_not_count_against_identifier(backend_kind, tmp_path):
+    backend = (
+        rate_limit.MemoryBackend()
+        if backend_kind == "memory"
+        else rate_limit.SQLiteBackend(str(tmp_path / "ratelimit.db"))
+    )
+    limiter = rate_limit.RateLimiter(backend, 60)
+    from_attacker = (("id:victima", 3), ("ip:10.0.0.66", 2))
+
+    for _ in range(2):
+        limiter.check("login", from_attacker)
+    for _ in range(10):
+        with pytest.raises(HTTPException):
+            limiter.check("login", from_attacker)
+
+    # la cuenta sigue usable desde otra IP: solo cuentan los 2 intentos permitidos
+    limiter.check("login", (("id:victima", 3), ("ip:10.0.0.7", 50)))
+    assert limiter.stats()["login"] == {"allowed": 3, "blocked": 10}
@@ -0,0 +1,115 @@
+"""
+Tests de la caché del catálogo: versión, ETag/304 e is_favorite por usuario.
+"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.app import models
+from backend.app.utils import catalog_cache
+
+
+def _publication(db: Session, name: str = "Cerro", status: str = "approved") -> models.Publication:
+    pub = models.Publication(
+        place_name=name,
+        name=name,
+        country="Argentina",
+        province="Salta",
+        city="Cafayate",
+        address="Ruta 40 100",
+        street="Ruta 40",
+        number="100",
+        status=status,
+    )
+    db.add(pub)
+    db.commit()
+    return pub
+
+
+def test_version_bumps_only_on_catalog_writes(db_session: Session, test_user):
+    assert catalog_cache.current_version(db_session) == 0
+    pub = _publication(db_session)
+    v1 = catalog_cache.current_version(db_session)
+    assert v1 == 1
+
+    db_session.add(models.Favorite(user_id=test_user.id, publication_id=pub.id))
+    db_session.commit()
+    assert catalog_cache.current_version(db_session) == v1
+
+    db_session.execute(
+        update(models.Publication)
+        .where(models.Publication.id == pub.id)
+        .values(rating_avg=4.5)
+        .execution_options(synchronize_session=False)
+    )
+    db_session.commit()
+    assert catalog_cache.current_version(db_session) == v1 + 1
+
+    db_session.add(models.Category(slug="playa", name="Playa"))
+    db_session.rollback()
+    db_session.commit()
+    assert catalog_cache.current_version(db_session) == v1 + 1
+
+
+def test_public_list_etag_and_304(client: TestClient, db_session: Session):
+    _publication(db_session)
+    r = client.get("/api/publications/public")
+    assert r.status_code == 200
+    assert [p["place_name"] for p in r.json()] == ["Cerro"]
+    etag = r.headers["etag"]
+
+    again = client.get("/api/publications/public", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    _publication(db_session, "Quebrada")
+    changed = client.get("/api/publications/public", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 2
+
+
+def test_is_favorite_is_layered_per_user(
+    client: TestClient, db_session: Session, test_user, auth_headers: dict
+):
+    fav = _publication(db_session, "Favorita")
+    _publication(db_session, "Otra")
+    anon = client.get("/api/publications/public")
+    db_session.add(models.Favorite(user_id=test_user.id, publication_id=fav.id))
+    db_session.commit()
+
+    mine = client.get("/api/publications/public", headers=auth_headers)
+    assert {p["place_name"]: p["is_favorite"] for p in mine.json()} == {
+        "Favorita": True,
+        "Otra": False,
+    }
+    assert mine.headers["etag"] != anon.headers["etag"]
+    assert mine.headers["cache-control"].startswith("private")
+
+    # el cuerpo cacheado sigue siendo el anónimo
+    anon_again = client.get("/api/publications/public")
+    assert not any(p["is_favorite"] for p in anon_again.json())
+    assert anon_again.headers["etag"] == anon.headers["etag"]
+
+
+def test_categories_cached_and_invalidated_by_seed(
+    client: TestClient, db_session: Session, admin_headers: dict
+):
+    first = client.get("/api/categories")
+    assert first.json() == []
+    assert client.get(
+        "/api/categories", headers={"If-None-Match": first.headers["etag"]}
+    ).status_code == 304
+
+    db_session.add(models.Category(slug="cultura", name="Cultura"))
+    db_session.commit()
+    after = client.get("/api/categories", headers={"If-None-Match": first.headers["etag"]})
+    assert after.status_code == 200
+    assert after.json() == ["cultura"]
+
+    client.post(
+        "/api/categories/seed", json={"slugs": ["museos", "cultura"]}, headers=admin_headers
+    )
+    seeded = client.get("/api/categories", headers={"If-None-Match": after.headers["etag"]})
+    assert seeded.status_code == 200
+    assert seeded.json() == ["cultura", "museos"]
@@ -0,0 +1,92 @@
+import gzip
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.app.utils import catalog_cache
+from backend.app.utils.compression import CompressionMiddleware
+
+BIG = {"items": [{"description": "Playa de arena blanca " * 5, "id": i} for i in range(50)]}
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return BIG
+
+    @app.get("/cached")
+    def cached(request: Request):
+        return catalog_cache.json_response(request, '"v1"', data=BIG)
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" + b"\x00" * 4000, media_type="image/png")
+
+    @app.get("/precompressed")
+    def precompressed():
+        body = gzip.compress(b"a" * 4000)
+        return Response(body, media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            (f"linea {i}\n".encode() * 20 for i in range(50)), media_type="text/plain"
+        )
+
+    return TestClient(app)
+
+
+def test_large_json_is_gzipped():
+    c = _client()
+    r = c.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert r.num_bytes_downloaded < len(r.content)
+    assert r.json() == BIG
+
+    plain = c.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_small_and_binary_responses_are_not_compressed():
+    c = _client()
+    assert "content-encoding" not in c.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    image = c.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image.headers
+    assert len(image.content) == 4004
+
+
+def test_existing_encoding_is_left_alone():
+    r = _client().get("/precompressed", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.text == "a" * 4000
+
+
+def test_streaming_response_is_compressed_incrementally():
+    r = _client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.text.count("\n") == 50 * 20
+
+
+def test_compressed_response_has_weak_etag():
+    c = _client()
+    plain = c.get("/cached", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["etag"] == '"v1"'
+    compressed = c.get("/cached", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == 'W/"v1"'
+
+    for sent in ('W/"v1"', '"v1"'):
+        r = c.get("/cached", headers={"Accept-Encoding": "gzip", "If-None-Match": sent})
+        assert r.status_code == 304
+        assert r.headers["etag"] == sent
+    r = c.get("/cached", headers={"Accept-Encoding": "identity", "If-None-Match": 'W/"v1"'})
+    assert r.status_code == 304
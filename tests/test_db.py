@@ -0,0 +1,45 @@
+from sqlalchemy import create_engine, event, text
+
+from backend.app.db import apply_sqlite_pragmas
+
+
+def test_sqlite_profile_pragmas(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'perfil.db'}")
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    with engine.connect() as conn:
+        pragma = lambda name: conn.execute(text(f"PRAGMA {name}")).scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("foreign_keys") == 1
+        assert pragma("busy_timeout") > 0
+        assert pragma("temp_store") == 2  # MEMORY
+
+        conn.execute(text("CREATE TABLE a (id INTEGER PRIMARY KEY)"))
+        conn.execute(
+            text("CREATE TABLE b (id INTEGER PRIMARY KEY, a_id INTEGER REFERENCES a(id) ON DELETE CASCADE)")
+        )
+        conn.execute(text("INSERT INTO a VALUES (1)"))
+        conn.execute(text("INSERT INTO b VALUES (1, 1)"))
+        conn.execute(text("DELETE FROM a"))
+        assert conn.execute(text("SELECT COUNT(*) FROM b")).scalar() == 0
+    engine.dispose()
+
+
+def test_postgres_ddl_and_upsert_compile():
+    from sqlalchemy import create_mock_engine
+    from sqlalchemy.schema import CreateIndex, CreateTable
+
+    from backend.app import models
+    from backend.app.db import insert_ignore
+
+    pg = create_mock_engine("postgresql://", lambda *a, **kw: None)
+    ddl = str(CreateTable(models.PublicationPhoto.__table__).compile(dialect=pg.dialect))
+    assert "variants JSONB" in ddl
+
+    pending = next(
+        i for i in models.DeletionRequest.__table__.indexes if i.name == "ix_deletion_requests_pending"
+    )
+    assert "WHERE status = 'pending'" in str(CreateIndex(pending).compile(dialect=pg.dialect))
+
+    stmt = insert_ignore(pg, models.Category.__table__, ["slug"])
+    assert "ON CONFLICT (slug) DO NOTHING" in str(stmt.compile(dialect=pg.dialect))
@@ -0,0 +1,74 @@
+import ast
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+from pathlib import Path
+
+from backend.app.utils.log_config import JsonFormatter, _DeferredQueueHandler
+
+APP_DIR = Path(__file__).resolve().parents[1] / "backend" / "app"
+
+
+def _logger_to(stream: io.StringIO, level=logging.DEBUG):
+    records = queue.SimpleQueue()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    listener = QueueListener(records, output)
+    logger = logging.getLogger("tests.logging")
+    logger.handlers = [_DeferredQueueHandler(records)]
+    logger.propagate = False
+    logger.setLevel(level)
+    return logger, listener
+
+
+def test_json_lines_with_extra_fields():
+    stream = io.StringIO()
+    logger, listener = _logger_to(stream)
+    listener.start()
+    try:
+        logger.info("Itinerario %s guardado", 7, extra={"user_id": 3})
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("Falló la conversión")
+    finally:
+        listener.stop()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "Itinerario 7 guardado"
+    assert first["level"] == "INFO"
+    assert first["logger"] == "tests.logging"
+    assert first["user_id"] == 3
+    assert second["level"] == "ERROR"
+    assert "ZeroDivisionError" in second["exc_info"]
+
+
+def test_disabled_debug_does_not_format_args():
+    formatted = []
+
+    class Costoso:
+        def __str__(self):
+            formatted.append(1)
+            return "costoso"
+
+    stream = io.StringIO()
+    logger, listener = _logger_to(stream, level=logging.INFO)
+    listener.start()
+    try:
+        logger.debug("detalle: %s", Costoso())
+    finally:
+        listener.stop()
+    assert formatted == []
+    assert stream.getvalue() == ""
+
+
+def test_request_modules_do_not_print():
+    offenders = []
+    for package in ("api", "utils", "validation"):
+        for path in (APP_DIR / package).glob("*.py"):
+            for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+                if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "print":
+                    offenders.append(f"{path.name}:{node.lineno}")
+    assert offenders == []
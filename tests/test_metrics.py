@@ -0,0 +1,101 @@
+import smtplib
+
+from fastapi.testclient import TestClient
+
+from backend.app.api import metrics as metrics_api
+from backend.app.utils import mailer
+from backend.app.utils.metrics import (
+    CACHE_REQUESTS,
+    HTTP_REQUEST_SECONDS,
+    Histogram,
+    _registry,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("prueba_seconds", "Prueba.", ("route",), buckets=(0.1, 1))
+    _registry.remove(histogram)
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(3, route="/a")
+
+    text = histogram.render()
+    assert 'prueba_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'prueba_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'prueba_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'prueba_seconds_count{route="/a"} 3' in text
+
+
+def test_metrics_endpoint_uses_route_templates(client: TestClient, db_session, monkeypatch):
+    monkeypatch.setattr(metrics_api, "METRICS_TOKEN", "secreto")
+    client.get("/api/publications/12345/reviews")
+    client.get("/api/publications/public")
+    client.get("/api/publications/public")
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer secreto"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'route="/api/publications/{pub_id}/reviews"' in body
+    assert "/api/publications/12345" not in body
+    assert "http_requests_in_flight 1" in body
+    assert "db_pool_connections_in_use" in body
+    assert CACHE_REQUESTS.value(cache="catalog", result="hit") >= 1
+
+
+def test_metrics_token(client: TestClient, monkeypatch):
+    monkeypatch.setattr(metrics_api, "METRICS_TOKEN", "secreto")
+    assert client.get("/metrics").status_code == 401
+    ok = client.get("/metrics", headers={"Authorization": "Bearer secreto"})
+    assert ok.status_code == 200
+
+
+def test_metrics_require_token_by_default(client: TestClient, monkeypatch):
+    monkeypatch.setattr(metrics_api, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404
+    monkeypatch.setattr(metrics_api, "METRICS_PUBLIC", True)
+    assert client.get("/metrics").status_code == 200
+
+
+def test_unknown_http_methods_share_one_label(client: TestClient):
+    def others():
+        return sum(
+            entry[2] for key, entry in HTTP_REQUEST_SECONDS._values.items() if key[0] == "other"
+        )
+
+    before = others()
+    for method in ("FOO", "BAR", "PROPFIND"):
+        client.request(method, "/api/publications/public")
+    assert others() == before + 3
+    assert not {key[0] for key in HTTP_REQUEST_SECONDS._values} & {"FOO", "BAR", "PROPFIND"}
+
+
+def test_readiness_probe_times_db(client: TestClient):
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["checks"]["db"]["status"] == "ok"
+    assert data["checks"]["db"]["latency_ms"] >= 0
+
+
+def test_smtp_send_latency_is_recorded(monkeypatch):
+    class FakeSMTP:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        ehlo = starttls = login = send_message = lambda self, *a, **kw: None
+
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    for name, value in {"SMTP_HOST": "smtp.test", "SMTP_USER": "u", "SMTP_PASS": "p"}.items():
+        monkeypatch.setenv(name, value)
+
+    before = mailer.SMTP_SEND_SECONDS.count(outcome="ok")
+    mailer.send_email_html("a@b.c", "Asunto", "<p>hola</p>")
+    assert mailer.SMTP_SEND_SECONDS.count(outcome="ok") == before + 1
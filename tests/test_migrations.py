@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import create_engine, event, inspect
+
+from backend.app.db import Base, apply_sqlite_pragmas
+from backend.app.db_migrations import MIGRATIONS, applied_versions, run_migrations
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migraciones.db'}")
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_run_once_and_are_recorded(file_engine):
+    all_versions = [version for version, _, _ in MIGRATIONS]
+
+    assert run_migrations(file_engine) == all_versions
+    assert applied_versions(file_engine) == set(all_versions)
+    assert run_migrations(file_engine) == []
+
+
+def test_indexes_added_to_existing_database(file_engine):
+    with file_engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_expenses_trip_user")
+        conn.exec_driver_sql("DROP INDEX ix_deletion_requests_pending")
+
+    run_migrations(file_engine)
+
+    insp = inspect(file_engine)
+    assert "ix_expenses_trip_user" in {i["name"] for i in insp.get_indexes("expenses")}
+    assert "ix_deletion_requests_pending" in {
+        i["name"] for i in insp.get_indexes("deletion_requests")
+    }
+
+
+# (consulta de un endpoint, detalle esperado en EXPLAIN QUERY PLAN)
+HOT_QUERIES = [
+    (
+        "SELECT * FROM publications WHERE status = ? ORDER BY created_at DESC",
+        ("approved",),
+        "ix_publications_status_created (status=?)",
+    ),
+    (
+        "SELECT * FROM favorites WHERE user_id = ? AND publication_id = ?",
+        (1, 1),
+        "(user_id=? AND publication_id=?)",
+    ),
+    (
+        "SELECT * FROM expenses WHERE trip_id = ? AND user_id = ?",
+        (1, 1),
+        "ix_expenses_trip_user (trip_id=? AND user_id=?)",
+    ),
+    (
+        "SELECT * FROM trip_participants WHERE trip_id = ? AND user_id = ?",
+        (1, 1),
+        "ix_trip_participants_trip_user (trip_id=? AND user_id=?)",
+    ),
+    (
+        "SELECT * FROM itineraries WHERE user_id = ? AND status = ? ORDER BY created_at DESC",
+        (1, "completed"),
+        "ix_itineraries_user_status_created (user_id=? AND status=?)",
+    ),
+    (
+        "SELECT * FROM review_likes WHERE review_id = ? AND user_id = ?",
+        (1, 1),
+        "(review_id=? AND user_id=?)",
+    ),
+    (
+        "SELECT * FROM deletion_requests WHERE status = ? ORDER BY created_at DESC",
+        ("pending",),
+        "ix_deletion_requests_pending",
+    ),
+]
+
+
+@pytest.mark.parametrize("sql,params,expected", HOT_QUERIES)
+def test_hot_query_uses_index(file_engine, sql, params, expected):
+    run_migrations(file_engine)
+    with file_engine.connect() as conn:
+        plan = " | ".join(
+            row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+        )
+    assert expected in plan
+    assert "USE TEMP B-TREE" not in plan
@@ -0,0 +1,210 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend.app import models, points_ledger
+
+
+def _make_benefit(db_session: Session, discount: int = 10) -> models.PremiumBenefit:
+    pub = models.Publication(
+        place_name="Hotel Test",
+        country="Argentina",
+        province="Buenos Aires",
+        city="CABA",
+        address="Calle 123",
+        status="approved",
+    )
+    db_session.add(pub)
+    db_session.flush()
+    benefit = models.PremiumBenefit(
+        publication_id=pub.id,
+        title="Descuento",
+        discount_percentage=discount,
+        benefit_type="discount",
+    )
+    db_session.add(benefit)
+    db_session.commit()
+    return benefit
+
+
+def test_record_movement_is_idempotent(db_session: Session, test_user):
+    first = points_ledger.record_movement(
+        db_session, test_user.id, 30, "bonus", idempotency_key="bonus:1"
+    )
+    retry = points_ledger.record_movement(
+        db_session, test_user.id, 30, "bonus", idempotency_key="bonus:1"
+    )
+    db_session.commit()
+
+    assert first is not None
+    assert retry is None
+    assert points_ledger.get_balance(db_session, test_user.id) == 30
+    assert (
+        db_session.query(models.PointsTransaction)
+        .filter_by(user_id=test_user.id)
+        .count()
+        == 1
+    )
+
+
+def test_record_movement_is_undone_by_the_callers_rollback(
+    db_session: Session, test_user
+):
+    # la sesión ya leyó antes del SAVEPOINT, como un endpoint que validó algo
+    assert db_session.get(models.User, test_user.id) is not None
+    points_ledger.record_movement(db_session, test_user.id, 40, "bonus")
+    db_session.rollback()
+
+    assert points_ledger.get_balance(db_session, test_user.id) == 0
+    assert db_session.query(models.UserPoints).filter_by(user_id=test_user.id).count() == 0
+    assert (
+        db_session.query(models.PointsTransaction).filter_by(user_id=test_user.id).count()
+        == 0
+    )
+
+
+def test_guarded_debit_never_goes_negative(db_session: Session, test_user):
+    points_ledger.record_movement(db_session, test_user.id, 15, "bonus")
+    db_session.commit()
+
+    with pytest.raises(points_ledger.InsufficientPointsError):
+        points_ledger.record_movement(
+            db_session, test_user.id, -20, "redeemed", require_balance=True
+        )
+    db_session.commit()
+
+    assert points_ledger.get_balance(db_session, test_user.id) == 15
+    assert (
+        db_session.query(models.PointsTransaction)
+        .filter_by(user_id=test_user.id, transaction_type="redeemed")
+        .count()
+        == 0
+    )
+
+
+def test_add_points_with_idempotency_key(
+    client: TestClient, auth_headers: dict, test_user
+):
+    headers = {**auth_headers, "Idempotency-Key": "abc"}
+    body = {"user_id": test_user.id, "points": 25, "transaction_type": "bonus"}
+
+    first = client.post("/api/users/points/add", json=body, headers=headers)
+    retry = client.post("/api/users/points/add", json=body, headers=headers)
+
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json()["transaction_id"] == first.json()["transaction_id"]
+    assert retry.json()["new_balance"] == 25
+
+
+def test_redeem_benefit_debits_atomically(
+    client: TestClient, auth_headers: dict, db_session: Session, test_user
+):
+    test_user.role = "premium"
+    db_session.commit()
+    benefit = _make_benefit(db_session, discount=10)
+    points_ledger.record_movement(db_session, test_user.id, 25, "bonus")
+    db_session.commit()
+
+    headers = {**auth_headers, "Idempotency-Key": "redeem-1"}
+    response = client.post(f"/api/users/benefits/{benefit.id}/redeem", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["remaining_points"] == 5
+
+    retry = client.post(f"/api/users/benefits/{benefit.id}/redeem", headers=headers)
+    assert retry.status_code == 200
+    assert retry.json()["voucher_code"] == response.json()["voucher_code"]
+    assert retry.json()["remaining_points"] == 5
+
+    other = _make_benefit(db_session, discount=10)
+    denied = client.post(f"/api/users/benefits/{other.id}/redeem", headers=auth_headers)
+    assert denied.status_code == 400
+    assert "Puntos insuficientes" in denied.json()["detail"]
+    assert points_ledger.get_balance(db_session, test_user.id) == 5
+
+
+def test_points_movements_keyset_pagination(
+    client: TestClient, auth_headers: dict, db_session: Session, test_user
+):
+    for i in range(5):
+        points_ledger.record_movement(db_session, test_user.id, i + 1, "bonus")
+    db_session.commit()
+
+    first = client.get("/api/users/points/movements?limit=2", headers=auth_headers)
+    assert first.status_code == 200
+    assert [m["points"] for m in first.json()] == [5, 4]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(
+        f"/api/users/points/movements?limit=2&cursor={cursor}", headers=auth_headers
+    )
+    assert [m["points"] for m in second.json()] == [3, 2]
+
+    last = client.get(
+        f"/api/users/points/movements?limit=2&cursor={second.headers['X-Next-Cursor']}",
+        headers=auth_headers,
+    )
+    assert [m["points"] for m in last.json()] == [1]
+    assert "X-Next-Cursor" not in last.headers
+
+
+def test_next_cursor_is_readable_cross_origin(
+    client: TestClient, auth_headers: dict, db_session: Session, test_user
+):
+    for i in range(2):
+        points_ledger.record_movement(db_session, test_user.id, i + 1, "bonus")
+    db_session.commit()
+
+    response = client.get(
+        "/api/users/points/movements?limit=1",
+        headers={**auth_headers, "Origin": "http://localhost:5173"},
+    )
+    assert response.headers["X-Next-Cursor"]
+    exposed = response.headers["Access-Control-Expose-Headers"]
+    assert "x-next-cursor" in exposed.lower()
+    # la forma de cada movimiento es la misma que devolvía el handler de users.py
+    assert set(response.json()[0]) == {
+        "id",
+        "user_id",
+        "points",
+        "transaction_type",
+        "description",
+        "reference_id",
+        "created_at",
+    }
+
+
+def test_archive_keeps_balance_reconcilable(db_session: Session, test_user):
+    from datetime import datetime, timedelta
+
+    for points in (10, 20, -5):
+        tx = points_ledger.record_movement(db_session, test_user.id, points, "bonus")
+        tx.created_at = datetime.utcnow() - timedelta(days=400)
+    points_ledger.record_movement(db_session, test_user.id, 7, "bonus")
+    db_session.commit()
+
+    moved = points_ledger.archive_transactions(db_session, older_than_days=365)
+
+    assert moved == 3
+    assert (
+        db_session.query(models.PointsTransaction).filter_by(user_id=test_user.id).count()
+        == 1
+    )
+    assert db_session.query(models.PointsTransactionArchive).count() == 3
+    assert points_ledger.get_balance(db_session, test_user.id) == 32
+    assert points_ledger.ledger_total(db_session, test_user.id) == 32
+
+
+def test_floored_deduction_records_what_was_applied(
+    client: TestClient, auth_headers: dict, db_session: Session, test_user
+):
+    add = {"user_id": test_user.id, "points": 30, "transaction_type": "bonus"}
+    deduct = {"user_id": test_user.id, "points": -50, "transaction_type": "redeemed"}
+    assert client.post("/api/users/points/add", json=add, headers=auth_headers).status_code == 200
+    r = client.post("/api/users/points/add", json=deduct, headers=auth_headers)
+    assert r.status_code == 200
+    assert r.json()["new_balance"] == 0
+
+    debit = db_session.get(models.PointsTransaction, r.json()["transaction_id"])
+    assert debit.points == -30
+    assert points_ledger.ledger_total(db_session, test_user.id) == 0
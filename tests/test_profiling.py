@@ -0,0 +1,136 @@
+import os
+import pstats
+import subprocess
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.utils import profiling
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_profiling_requires_admin(client: TestClient, auth_headers: dict):
+    response = client.get(
+        "/api/publications/public", headers={**auth_headers, "X-Profile": "sample"}
+    )
+    assert response.status_code == 403
+    assert client.get("/api/admin/profiles", headers=auth_headers).status_code == 403
+
+
+def test_no_profile_without_header(client: TestClient, admin_headers: dict):
+    response = client.get("/api/publications/public", headers=admin_headers)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+@pytest.mark.parametrize(
+    "url, headers",
+    [
+        ("/api/health?note=x__profile", {}),
+        ("/api/health?x__profile=sample", {}),
+        ("/api/health?__profile=flamegraph", {}),
+        ("/api/health", {"X-Profile": "flamegraph"}),
+    ],
+)
+def test_only_known_modes_request_profiling(client: TestClient, url, headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+def test_requested_mode_reads_query_parameter():
+    scope = {"headers": [], "query_string": b"a=1&__profile=CProfile"}
+    assert profiling.requested_mode(scope) == "cprofile"
+
+
+def test_admin_request_is_profiled_with_cprofile(
+    client: TestClient, admin_headers: dict, profile_dir
+):
+    response = client.get(
+        "/api/publications/public?__profile=cprofile", headers=admin_headers
+    )
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    listing = client.get("/api/admin/profiles", headers=admin_headers).json()
+    assert listing["profiles"] == [f"{profile_id}.prof"]
+
+    download = client.get(f"/api/admin/profiles/{profile_id}", headers=admin_headers)
+    assert download.status_code == 200
+    path = profile_dir / "descarga.prof"
+    path.write_bytes(download.content)
+    functions = {func for _, _, func in pstats.Stats(str(path)).stats}
+    assert "list_publications_public" in functions
+
+
+def test_sampling_profile_is_collapsed_stacks(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_INTERVAL_MS", 1)
+    session = profiling.ProfileSession("sample")
+
+    def endpoint_lento():
+        time.sleep(0.05)
+
+    with session.running():
+        endpoint_lento()
+    session.save()
+
+    lines = open(session.path, encoding="utf-8").read().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.split(";")[-1].startswith("endpoint_lento ")
+
+
+def test_profile_id_is_validated(client: TestClient, admin_headers: dict):
+    response = client.get("/api/admin/profiles/..%2F..%2Fetc", headers=admin_headers)
+    assert response.status_code == 404
+
+
+def test_tracemalloc_snapshot(client: TestClient, admin_headers: dict):
+    assert client.get("/api/admin/tracemalloc", headers=admin_headers).status_code == 409
+
+    assert client.post("/api/admin/tracemalloc/start", headers=admin_headers).status_code == 200
+    try:
+        retained = [bytearray(1024) for _ in range(200)]
+        data = client.get(
+            "/api/admin/tracemalloc?limit=5&since_start=true", headers=admin_headers
+        ).json()
+        assert data["traced_kib"] > 0
+        assert len(data["top"]) <= 5
+        assert "size_diff_kib" in data["top"][0]
+        del retained
+    finally:
+        client.post("/api/admin/tracemalloc/stop", headers=admin_headers)
+
+
+_ROUTES_CHECK = """
+from fastapi.routing import APIRoute
+import backend.app.main as main
+
+wrapped = [
+    r.path for r in main.app.routes
+    if isinstance(r, APIRoute) and getattr(r.dependant.call, "profiled", False)
+]
+middleware = [m.cls.__name__ for m in main.app.user_middleware]
+print(main.PROFILING_ENABLED, wrapped, "ProfilingMiddleware" in middleware)
+"""
+
+
+def test_profiling_is_off_unless_enabled(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k != "PROFILING_ENABLED"}
+    env["DATABASE_URL"] = f"sqlite:///{tmp_path / 'perfilado.db'}"
+    out = subprocess.run(
+        [sys.executable, "-c", _ROUTES_CHECK],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert out.strip().splitlines()[-1] == "False [] False"
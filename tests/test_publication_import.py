@@ -0,0 +1,146 @@
+import io
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend.app import models
+
+
+CSV_BODY = """place_name,country,province,city,address,categories,continent,climate,activities,cost_per_day,duration_min
+Glaciar Perito Moreno,Argentina,Santa Cruz,El Calafate,Ruta 11 80,"Naturaleza, aventura",America,Frío,"trekking, Navegación",120.5,240
+Bodega Norton,Argentina,Mendoza,Luján de Cuyo,Ruta 15 23,gastronomia,,Templado,,abc,
+Sin ciudad,Argentina,Mendoza,,Calle 1,,,,,,
+Cerro Catedral,Argentina,Río Negro,Bariloche,Av. de los Pioneros,aventura,south america,,esquí,,
+"""
+
+
+def test_import_csv_in_batches(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    db_session.add(models.Category(slug="aventura", name="Aventura"))
+    db_session.commit()
+
+    r = client.post(
+        "/api/publications/import?batch_size=1",
+        files={"file": ("lugares.csv", io.BytesIO(CSV_BODY.encode()), "text/csv")},
+        headers=admin_headers,
+    )
+
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["processed"], body["inserted"], body["failed"]) == (4, 2, 2)
+    assert body["batches"] == 2
+    assert [e["line"] for e in body["errors"]] == [3, 4]
+    assert "cost_per_day" in body["errors"][0]["error"]
+    assert "city" in body["errors"][1]["error"]
+
+    glaciar = (
+        db_session.query(models.Publication)
+        .filter_by(place_name="Glaciar Perito Moreno")
+        .one()
+    )
+    assert glaciar.continent == "américa"
+    assert glaciar.climate == "frío"
+    assert glaciar.activities == ["trekking", "navegación"]
+    assert glaciar.street == "Ruta 11" and glaciar.number == "80"
+    assert sorted(c.slug for c in glaciar.categories) == ["aventura", "naturaleza"]
+    assert db_session.query(models.Category).filter_by(slug="aventura").count() == 1
+
+
+def test_import_jsonl(client: TestClient, admin_headers: dict, db_session: Session):
+    lines = [
+        json.dumps(
+            {
+                "place_name": "Machu Picchu",
+                "country": "Perú",
+                "province": "Cusco",
+                "city": "Aguas Calientes",
+                "address": "Sitio arqueológico",
+                "categories": ["Cultura", "historia"],
+                "activities": ["Trekking"],
+            }
+        ),
+        "",
+        "{no es json",
+        json.dumps(["lista"]),
+    ]
+    r = client.post(
+        "/api/publications/import",
+        files={
+            "file": ("lugares.jsonl", io.BytesIO("\n".join(lines).encode()), "application/x-ndjson")
+        },
+        headers=admin_headers,
+    )
+
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["inserted"], body["failed"]) == (1, 2)
+    assert [e["line"] for e in body["errors"]] == [3, 4]
+    pub = db_session.query(models.Publication).filter_by(place_name="Machu Picchu").one()
+    assert sorted(c.slug for c in pub.categories) == ["cultura", "historia"]
+    assert pub.activities == ["trekking"]
+
+
+def test_import_requires_admin_and_known_format(
+    client: TestClient, auth_headers: dict, admin_headers: dict
+):
+    files = {"file": ("lugares.csv", io.BytesIO(CSV_BODY.encode()), "text/csv")}
+    assert client.post("/api/publications/import", files=files, headers=auth_headers).status_code == 403
+
+    r = client.post(
+        "/api/publications/import",
+        files={"file": ("lugares.txt", io.BytesIO(b"x"), "text/plain")},
+        headers=admin_headers,
+    )
+    assert r.status_code == 400
+
+
+def test_unreadable_csv_keeps_rows_already_imported(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    body = (
+        b"place_name,country,province,city,address\n"
+        b"Uno,Argentina,Salta,Cafayate,Ruta 40\n"
+        b"Dos,Argentina,Salta,Cafayate,Ruta 40\n"
+        b"Tres,Argentina,Salta,Caf\xe1yate,Ruta 40\n"
+        b"Cuatro,Argentina,Salta,Cafayate,Ruta 40\n"
+    )
+    r = client.post(
+        "/api/publications/import?batch_size=1",
+        files={"file": ("lugares.csv", io.BytesIO(body), "text/csv")},
+        headers=admin_headers,
+    )
+
+    assert r.status_code == 200, r.text
+    summary = r.json()
+    assert (summary["inserted"], summary["failed"]) == (2, 1)
+    assert summary["stopped_at_line"] == 4
+    assert summary["errors"][0]["line"] == 4
+    assert "UTF-8" in summary["errors"][0]["error"]
+    names = {p.place_name for p in db_session.query(models.Publication)}
+    assert names == {"Uno", "Dos"}
+
+
+def test_jsonl_line_with_invalid_utf8_is_a_row_error(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    row = {"country": "AR", "province": "S", "city": "C", "address": "R"}
+    body = b"\n".join(
+        [
+            json.dumps({**row, "place_name": "Uno"}).encode(),
+            b"\xff\xfe",
+            json.dumps({**row, "place_name": "Dos"}).encode(),
+        ]
+    )
+    r = client.post(
+        "/api/publications/import",
+        files={"file": ("lugares.jsonl", io.BytesIO(body), "application/x-ndjson")},
+        headers=admin_headers,
+    )
+
+    assert r.status_code == 200, r.text
+    summary = r.json()
+    assert (summary["inserted"], summary["failed"]) == (2, 1)
+    assert summary["errors"][0]["line"] == 2
+    assert summary["stopped_at_line"] is None
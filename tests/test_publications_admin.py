@@ -107,6 +107,112 @@ def test_admin_create_publication_with_photos_success(
         assert os.path.exists(abs_path)
 
 
+def _png_bytes(size=(1200, 900)) -> bytes:
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGBA", size, (200, 80, 40, 255)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def test_create_publication_generates_image_variants(
+    client: TestClient, admin_headers: dict, db_session: Session, track_created_files
+):
+    from PIL import Image
+
+    data = {
+        "place_name": "Obelisco",
+        "country": "Argentina",
+        "province": "Buenos Aires",
+        "city": "CABA",
+        "address": "Av. 9 de Julio 1000",
+        "description": "Ícono porteño",
+    }
+    files = [
+        ("photos", _fake_img("broken.jpg", "image/jpeg")),
+        ("photos", ("real.png", io.BytesIO(_png_bytes()), "image/png")),
+    ]
+    resp = client.post("/api/publications", data=data, files=files, headers=admin_headers)
+    assert resp.status_code == 201, resp.text
+    for url in resp.json()["photos"]:
+        track_created_files.append(_url_to_abspath(url))
+
+    photos = (
+        db_session.query(models.PublicationPhoto)
+        .filter_by(publication_id=resp.json()["id"])
+        .order_by(models.PublicationPhoto.index_order)
+        .all()
+    )
+    broken, variants = photos[0].variants, photos[1].variants
+    assert broken is None
+    assert set(variants) == {"thumb", "card", "full"}
+    for size in variants.values():
+        for url in size.values():
+            track_created_files.append(os.path.join("backend", "app", url.lstrip("/")))
+    with Image.open(os.path.join("backend", "app", variants["thumb"]["webp"].lstrip("/"))) as thumb:
+        assert thumb.format == "WEBP" and max(thumb.size) == 320
+    with Image.open(os.path.join("backend", "app", variants["full"]["jpeg"].lstrip("/"))) as full:
+        assert full.size == (1200, 900)
+
+    listed = client.get("/api/publications/public").json()
+    obelisco = next(p for p in listed if p["id"] == resp.json()["id"])
+    assert obelisco["photo_variants"] == [{}, variants]
+
+
+def _jpeg_with_gps() -> bytes:
+    from PIL import ExifTags, Image
+
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = "Cámara"
+    exif[ExifTags.Base.Orientation] = 6
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    gps[ExifTags.GPS.GPSLatitudeRef] = "S"
+    gps[ExifTags.GPS.GPSLatitude] = (34.0, 36.0, 12.0)
+    gps[ExifTags.GPS.GPSLongitudeRef] = "W"
+    gps[ExifTags.GPS.GPSLongitude] = (58.0, 22.0, 54.0)
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 48), (10, 120, 200)).save(
+        buf, "JPEG", exif=exif, comment=b"casa de la abuela"
+    )
+    return buf.getvalue()
+
+
+def test_stored_original_has_no_gps_metadata(
+    client: TestClient, admin_headers: dict, track_created_files
+):
+    from PIL import ExifTags, Image
+
+    original = _jpeg_with_gps()
+    with Image.open(io.BytesIO(original)) as img:
+        assert img.getexif().get_ifd(ExifTags.IFD.GPSInfo)
+
+    data = {
+        "place_name": "Cabildo",
+        "country": "Argentina",
+        "province": "Buenos Aires",
+        "city": "CABA",
+        "address": "Bolívar 65",
+        "description": "Frente a Plaza de Mayo",
+    }
+    files = [("photos", ("foto.jpg", io.BytesIO(original), "image/jpeg"))]
+    resp = client.post("/api/publications", data=data, files=files, headers=admin_headers)
+    assert resp.status_code == 201, resp.text
+    url = resp.json()["photos"][0]
+    track_created_files.append(_url_to_abspath(url))
+
+    served = client.get(url)
+    assert served.status_code == 200
+    with Image.open(io.BytesIO(served.content)) as img:
+        exif = img.getexif()
+        assert not exif.get_ifd(ExifTags.IFD.GPSInfo)
+        assert ExifTags.Base.Make not in exif
+        assert "comment" not in img.info
+        # la orientación se conserva para que la foto no se vea rotada
+        assert exif[ExifTags.Base.Orientation] == 6
+        assert img.size == (64, 48)
+    assert b"casa de la abuela" not in served.content
+
+
 def test_admin_create_publication_rejects_too_many_photos(
     client: TestClient, admin_headers: dict
 ):
@@ -183,3 +289,112 @@ def test_public_list_returns_items(
     assert resp.status_code == 200
     items = resp.json()
     assert any(it["id"] == created["id"] for it in items)
+
+
+def _pending_pub(db_session: Session, name: str, status: str = "pending") -> models.Publication:
+    pub = models.Publication(
+        place_name=name,
+        country="Argentina",
+        province="Mendoza",
+        city="Mendoza",
+        address="San Martín 100",
+        status=status,
+    )
+    db_session.add(pub)
+    db_session.commit()
+    return pub
+
+
+def test_batch_approve_and_reject_publications(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    a = _pending_pub(db_session, "Bodega A")
+    b = _pending_pub(db_session, "Bodega B")
+    c = _pending_pub(db_session, "Bodega C", status="approved")
+
+    r = client.post(
+        "/api/publications/batch/approve",
+        json={"ids": [a.id, b.id, c.id, 999999, a.id]},
+        headers=admin_headers,
+    )
+    assert r.status_code == 200, r.text
+    assert r.json() == {"updated": [a.id, b.id], "skipped": [c.id, 999999]}
+
+    d = _pending_pub(db_session, "Bodega D")
+    r = client.post(
+        "/api/publications/batch/reject",
+        json={"ids": [d.id, a.id], "reason": "duplicada"},
+        headers=admin_headers,
+    )
+    assert r.json() == {"updated": [d.id], "skipped": [a.id]}
+
+    db_session.expire_all()
+    assert [p.status for p in (a, b, c, d)] == ["approved", "approved", "approved", "rejected"]
+    assert d.rejection_reason == "duplicada"
+
+
+def test_batch_moderation_requires_admin(client: TestClient, auth_headers: dict):
+    r = client.post(
+        "/api/publications/batch/approve", json={"ids": [1]}, headers=auth_headers
+    )
+    assert r.status_code == 403
+
+
+def test_batch_deletion_requests(
+    client: TestClient, admin_headers: dict, db_session: Session, test_user
+):
+    keep = _pending_pub(db_session, "Mirador", status="approved")
+    drop = _pending_pub(db_session, "Hostel", status="approved")
+    reqs = [
+        models.DeletionRequest(
+            publication_id=pub.id, requested_by_user_id=test_user.id, reason=reason
+        )
+        for pub, reason in ((drop, "cerró"), (keep, "no sé"))
+    ]
+    db_session.add_all(reqs)
+    db_session.commit()
+
+    r = client.post(
+        "/api/publications/deletion-requests/batch/approve",
+        json={"ids": [reqs[0].id]},
+        headers=admin_headers,
+    )
+    assert r.json()["updated"] == [reqs[0].id]
+    r = client.post(
+        "/api/publications/deletion-requests/batch/reject",
+        json={"ids": [reqs[1].id, reqs[0].id], "reason": "sigue abierto"},
+        headers=admin_headers,
+    )
+    assert r.json() == {"updated": [reqs[1].id], "skipped": [reqs[0].id]}
+
+    db_session.expire_all()
+    assert drop.status == "deleted" and drop.rejection_reason == "cerró"
+    assert keep.status == "approved"
+    assert reqs[1].rejection_reason == "sigue abierto"
+
+
+def test_publication_data_matches_schema(db_session: Session):
+    """El serializador sin validación produce exactamente un PublicationOut válido."""
+    from backend.app import schemas
+    from backend.app.api.publications import publication_data
+
+    pub = _pending_pub(db_session, "Serializada", status="approved")
+    pub.photos.append(models.PublicationPhoto(url="/static/x.jpg", index_order=0))
+    db_session.commit()
+
+    data = publication_data(pub, is_favorite=True)
+    assert set(data) == set(schemas.PublicationOut.model_fields)
+    assert schemas.PublicationOut.model_validate(data).model_dump() == data
+
+
+def test_admin_lists_use_orjson(client: TestClient, admin_headers: dict, db_session: Session):
+    _pending_pub(db_session, "Pendiente")
+    _pending_pub(db_session, "Aprobada", status="approved")
+
+    pending = client.get("/api/publications/pending", headers=admin_headers)
+    assert pending.status_code == 200
+    assert pending.headers["content-type"] == "application/json"
+    assert [p["place_name"] for p in pending.json()] == ["Pendiente"]
+
+    everything = client.get("/api/publications/all", headers=admin_headers)
+    assert {p["place_name"] for p in everything.json()} == {"Pendiente", "Aprobada"}
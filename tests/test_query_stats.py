@@ -0,0 +1,105 @@
+import logging
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from backend.app import models
+from backend.app.utils.query_stats import QueryStats, QueryStatsMiddleware, fingerprint
+
+
+def test_fingerprint_ignores_values():
+    assert fingerprint("SELECT * FROM t WHERE id = 3 AND name = 'x'") == fingerprint(
+        "SELECT *\n  FROM t WHERE id = 15 AND name = 'otro'"
+    )
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?)") == fingerprint(
+        "SELECT * FROM t WHERE id IN (?)"
+    )
+
+
+def test_concurrent_records_are_not_lost():
+    stats = QueryStats()
+    start = threading.Barrier(8)
+
+    def worker():
+        start.wait()
+        for _ in range(5000):
+            stats.record("SELECT 1", 0.001)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stats.count == 40000
+    assert stats.statements[fingerprint("SELECT 1")] == 40000
+
+
+def test_server_timing_and_repeated_queries_warning(caplog):
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/n-mas-uno")
+    def n_plus_one():
+        with engine.connect() as conn:
+            for i in range(6):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {}
+
+    with caplog.at_level(logging.INFO, logger="backend.app.utils.query_stats"):
+        response = TestClient(app).get("/n-mas-uno")
+
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="6 consultas"' in response.headers["server-timing"]
+    [record] = [r for r in caplog.records if r.name == "backend.app.utils.query_stats"]
+    assert record.levelno == logging.WARNING
+    assert record.db_queries == 6
+    assert record.db_repeated == {"SELECT ?": 6}
+    engine.dispose()
+
+
+def _seed_catalog(db, user, n=6):
+    category = models.Category(slug="playa", name="Playa")
+    for i in range(n):
+        pub = models.Publication(
+            place_name=f"Lugar {i}",
+            country="Argentina",
+            province="Buenos Aires",
+            city="Mar del Plata",
+            address=f"Costanera {i}",
+            created_by_user_id=user.id,
+            photos=[models.PublicationPhoto(url=f"/static/uploads/p{i}.jpg")],
+            categories=[category],
+        )
+        db.add(pub)
+        db.flush()
+        db.add(models.Favorite(user_id=user.id, publication_id=pub.id))
+        db.add(models.DeletionRequest(publication_id=pub.id, requested_by_user_id=user.id))
+    db.commit()
+
+
+# Con 6 publicaciones: una relación lazy (photos, categories, publication)
+# recorrida por fila sumaría al menos 6 consultas y rompería el límite.
+@pytest.mark.parametrize(
+    "url,limit",
+    [
+        ("/api/publications/all", 4),
+        ("/api/publications", 4),
+        ("/api/publications/my-submissions", 5),
+        ("/api/publications/search?q=lugar", 5),
+        ("/api/publications/public", 6),
+        ("/api/publications/favorites", 5),
+        ("/api/publications/deletion-requests/pending", 4),
+        ("/api/suggestions", 3),
+    ],
+)
+def test_publication_lists_query_count(
+    client, db_session, admin_user, admin_headers, max_queries, url, limit
+):
+    _seed_catalog(db_session, admin_user)
+    with max_queries(limit):
+        response = client.get(url, headers=admin_headers)
+    assert response.status_code == 200, response.text
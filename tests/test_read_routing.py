@@ -0,0 +1,73 @@
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+
+from backend.app import db as app_db
+from backend.app.utils.read_your_writes import LAST_WRITE_COOKIE, ReadYourWritesMiddleware
+
+
+def _request(cookie: str = "") -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def _bind_for(request: Request):
+    gen = app_db.get_read_db(request)
+    session = next(gen)
+    try:
+        return session.get_bind()
+    finally:
+        gen.close()
+
+
+def test_reads_go_to_primary_right_after_a_write():
+    assert _bind_for(_request()) is app_db.read_engine
+    fresh = f"{LAST_WRITE_COOKIE}={time.time()}"
+    assert _bind_for(_request(fresh)) is app_db.engine
+    stale = f"{LAST_WRITE_COOKIE}={time.time() - 3600}"
+    assert _bind_for(_request(stale)) is app_db.read_engine
+
+
+def test_middleware_marks_successful_writes_only():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.get("/x")
+    def read():
+        return {}
+
+    @app.post("/x")
+    def write():
+        return {}
+
+    @app.post("/fail")
+    def fail():
+        raise HTTPException(status_code=400)
+
+    c = TestClient(app)
+    assert LAST_WRITE_COOKIE not in c.get("/x").cookies
+    assert LAST_WRITE_COOKIE in c.post("/x").cookies
+    assert LAST_WRITE_COOKIE not in c.post("/fail").cookies
+
+
+def test_sqlite_read_engine_is_read_only(tmp_path):
+    path = tmp_path / "rw.db"
+    writer = create_engine(f"sqlite:///{path}")
+    event.listen(writer, "connect", app_db.apply_sqlite_pragmas)
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    reader = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+    event.listen(reader, "connect", app_db.apply_sqlite_read_pragmas)
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM t")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+    reader.dispose()
+    writer.dispose()
@@ -0,0 +1,146 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.app import models, security
+
+from .conftest import engine
+
+
+def _seed_reports(db_session: Session, reports_per_review):
+    """Crea una reseña por elemento con la cantidad indicada de reportes pendientes."""
+    pub = models.Publication(
+        place_name="Cataratas",
+        country="Argentina",
+        province="Misiones",
+        city="Puerto Iguazú",
+        address="Ruta 12",
+        status="approved",
+    )
+    db_session.add(pub)
+    db_session.flush()
+    db_session.add(models.PublicationPhoto(publication_id=pub.id, url="/b.jpg", index_order=1))
+    db_session.add(models.PublicationPhoto(publication_id=pub.id, url="/a.jpg", index_order=0))
+
+    reporters = []
+    for i in range(max(reports_per_review)):
+        user = models.User(
+            username=f"reporter{i}",
+            email=f"reporter{i}@test.local",
+            hashed_password=security.hash_password("x"),
+        )
+        db_session.add(user)
+        reporters.append(user)
+    db_session.flush()
+
+    review_ids = []
+    for count in reports_per_review:
+        review = models.Review(
+            publication_id=pub.id, author_id=reporters[0].id, rating=3, comment="meh"
+        )
+        db_session.add(review)
+        db_session.flush()
+        review_ids.append(review.id)
+        for reporter in reporters[:count]:
+            db_session.add(
+                models.ReviewReport(
+                    review_id=review.id, reporter_id=reporter.id, reason="spam"
+                )
+            )
+    db_session.commit()
+    return review_ids
+
+
+def test_pending_reports_sorted_by_report_count(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    one, three, two = _seed_reports(db_session, [1, 3, 2])
+
+    response = client.get("/api/reviews/reports/pending", headers=admin_headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["review_id"] for r in data] == [three] * 3 + [two] * 2 + [one]
+    assert [r["report_count"] for r in data] == [3, 3, 3, 2, 2, 1]
+    assert data[0]["publication"]["photos"] == ["/a.jpg", "/b.jpg"]
+    assert data[0]["review"]["author_username"] == "reporter0"
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_pending_reports_keyset_pagination(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    _seed_reports(db_session, [2, 3, 1])
+    expected = client.get("/api/reviews/reports/pending", headers=admin_headers).json()
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/reviews/reports/pending?limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        page = client.get(url, headers=admin_headers)
+        assert page.status_code == 200
+        seen.extend(r["id"] for r in page.json())
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == [r["id"] for r in expected]
+
+    bad = client.get(
+        "/api/reviews/reports/pending?cursor=nope", headers=admin_headers
+    )
+    assert bad.status_code == 400
+
+
+def test_pending_reports_query_count_is_constant(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    _seed_reports(db_session, [4, 4, 4, 4])
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if "review_reports" in statement or "publication" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        response = client.get("/api/reviews/reports/pending", headers=admin_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 16
+    # consulta principal + fotos + categorías, sin importar cuántos reportes haya
+    assert len(statements) <= 3
+
+
+def test_batch_review_report_moderation_updates_ratings_once(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    first, second = _seed_reports(db_session, [2, 1])
+    reports = db_session.query(models.ReviewReport).order_by(models.ReviewReport.id).all()
+    pub = db_session.get(models.Review, first).publication
+
+    r = client.post(
+        "/api/reviews/reports/batch/approve",
+        json={"ids": [reports[0].id, reports[1].id]},
+        headers=admin_headers,
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["updated"] == [reports[0].id, reports[1].id]
+
+    db_session.expire_all()
+    assert db_session.get(models.Review, first).status == "hidden"
+    assert (pub.rating_avg, pub.rating_count) == (3.0, 1)
+
+    r = client.post(
+        "/api/reviews/reports/batch/reject",
+        json={"ids": [reports[2].id, reports[0].id], "reason": "no aplica"},
+        headers=admin_headers,
+    )
+    assert r.json() == {"updated": [reports[2].id], "skipped": [reports[0].id]}
+    db_session.expire_all()
+    assert db_session.get(models.ReviewReport, reports[2].id).rejection_reason == "no aplica"
+    assert db_session.get(models.Review, second).status == "approved"
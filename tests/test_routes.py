@@ -0,0 +1,28 @@
+import asyncio
+
+from fastapi.routing import APIRoute
+
+from backend.app.db import get_db, get_read_db
+from backend.app.main import app
+
+
+def _dependency_calls(dependant):
+    for dep in dependant.dependencies:
+        yield dep.call
+        yield from _dependency_calls(dep)
+
+
+def test_async_endpoints_do_not_use_sync_sessions():
+    """
+    Un endpoint ``async def`` corre en el event loop: si usa la Session
+    sincrónica bloquea a todos los pedidos del worker. Esos endpoints deben
+    ser ``def`` (FastAPI los corre en el threadpool).
+    """
+    offenders = [
+        f"{sorted(route.methods)} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        and asyncio.iscoroutinefunction(route.endpoint)
+        and {get_db, get_read_db} & set(_dependency_calls(route.dependant))
+    ]
+    assert offenders == []
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy import create_engine, inspect
+
+_CHECK = """
+import sys
+from fastapi.testclient import TestClient
+import backend.app.main
+
+with TestClient(backend.app.main.app) as client:
+    client.get("/api/health").raise_for_status()
+print(sorted(m for m in ("google.generativeai", "reportlab") if m in sys.modules))
+"""
+
+
+def test_cold_start_is_lazy(tmp_path):
+    """Arrancar la app no importa dependencias pesadas ni toca el esquema."""
+    db_file = tmp_path / "arranque.db"
+    out = subprocess.run(
+        [sys.executable, "-c", _CHECK],
+        env=dict(os.environ, DATABASE_URL=f"sqlite:///{db_file}"),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert out.strip().splitlines()[-1] == "[]"
+
+    engine = create_engine(f"sqlite:///{db_file}")
+    assert inspect(engine).get_table_names() == []
+    engine.dispose()
@@ -0,0 +1,89 @@
+import gzip
+import hashlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.utils.static_files import IMMUTABLE_CACHE_CONTROL, CachedStaticFiles
+
+
+@pytest.fixture
+def static_client(tmp_path):
+    sha = hashlib.sha256(b"foto").hexdigest()
+    (tmp_path / "uploads").mkdir()
+    (tmp_path / "uploads" / f"{sha}.jpg").write_bytes(b"foto")
+    (tmp_path / "uploads" / f"{sha}_thumb.webp").write_bytes(b"thumb")
+    (tmp_path / "uploads" / "pub_1_0.jpg").write_bytes(b"foto vieja")
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "index-D0yerDeH.css").write_bytes(b"body{}")
+    (tmp_path / "logo-darkmode.svg").write_bytes(b"<svg/>")
+    html = b"<html>" + b"x" * 2000 + b"</html>"
+    (tmp_path / "index.html").write_bytes(html)
+    (tmp_path / "index.html.gz").write_bytes(gzip.compress(html))
+
+    app = FastAPI()
+    app.mount("/", CachedStaticFiles(directory=tmp_path, html=True))
+    with TestClient(app) as c:
+        yield c, sha, html
+
+
+def test_hashed_upload_is_immutable(static_client):
+    c, sha, _ = static_client
+    for name in (f"{sha}.jpg", f"{sha}_thumb.webp"):
+        r = c.get(f"/uploads/{name}")
+        assert r.status_code == 200
+        assert r.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+
+def test_vite_asset_is_immutable_only_under_assets(static_client):
+    c, _, _ = static_client
+    asset = c.get("/assets/index-D0yerDeH.css")
+    assert asset.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    # misma forma nombre-xxxxxxxx.ext, pero no es un hash: tiene que revalidarse
+    logo = c.get("/logo-darkmode.svg")
+    assert logo.status_code == 200
+    assert logo.headers["cache-control"] == "no-cache"
+    assert "etag" in logo.headers
+
+
+def test_unhashed_file_revalidates_with_strong_etag(static_client):
+    c, _, _ = static_client
+    r = c.get("/uploads/pub_1_0.jpg")
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == "no-cache"
+    etag = r.headers["etag"]
+    assert not etag.startswith("W/")
+
+    r2 = c.get("/uploads/pub_1_0.jpg", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.content == b""
+
+
+def test_precompressed_sibling_is_served_when_accepted(static_client):
+    c, _, html = static_client
+    r = c.get("/", headers={"Accept-Encoding": "br, gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["content-type"].startswith("text/html")
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.content == html  # httpx descomprime
+
+    plain = c.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != r.headers["etag"]
+
+    refused = c.get("/", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
+
+
+def test_app_mounts_use_cache_headers(client):
+    r = client.get("/assets/index-D0yerDeH.css", headers={"Accept-Encoding": "br"})
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert r.headers["content-encoding"] == "br"
+
+    index = client.get("/")
+    assert index.headers["cache-control"] == "no-cache"
+    assert "etag" in index.headers
@@ -0,0 +1,195 @@
+import hashlib
+import io
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend.app import models
+from backend.app.utils import storage
+
+
+class _ClientError(Exception):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """Cliente S3 en memoria con la misma interfaz que usa S3Storage."""
+
+    class exceptions:
+        ClientError = _ClientError
+
+    def __init__(self):
+        self.objects = {}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise _ClientError("404")
+        return {"ContentLength": len(self.objects[Key][0])}
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None):
+        with open(Filename, "rb") as f:
+            self.objects[Key] = (f.read(), ExtraArgs or {})
+
+    def download_file(self, Bucket, Key, Filename):
+        with open(Filename, "wb") as f:
+            f.write(self.objects[Key][0])
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn):
+        return f"http://minio.test:9000/{Params['Bucket']}/{Params['Key']}?X-Amz-Signature=x"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    client = FakeS3Client()
+    monkeypatch.setattr(
+        storage,
+        "backend",
+        storage.S3Storage("fotos", endpoint_url="http://minio.test:9000", client=client),
+    )
+    return client
+
+
+def _png() -> bytes:
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (900, 600), (30, 160, 90)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _form(name: str) -> dict:
+    return {
+        "place_name": name,
+        "country": "Chile",
+        "province": "Magallanes",
+        "city": "Puerto Natales",
+        "address": "Torres del Paine",
+        "description": "Parque nacional",
+    }
+
+
+def test_publication_photos_go_to_s3_backend(
+    client: TestClient, admin_headers: dict, db_session: Session, s3: FakeS3Client
+):
+    r = client.post(
+        "/api/publications",
+        data=_form("Torres"),
+        files=[("photos", ("t.png", io.BytesIO(_png()), "image/png"))],
+        headers=admin_headers,
+    )
+    assert r.status_code == 201, r.text
+    url = r.json()["photos"][0]
+    key = storage.backend.key_from_url(url)
+    assert url.startswith("http://minio.test:9000/fotos/uploads/publications/")
+    assert s3.objects[key][1]["ContentType"] == "image/png"
+
+    photo = db_session.query(models.PublicationPhoto).one()
+    assert photo.variants["thumb"]["webp"].startswith("http://minio.test:9000/fotos/")
+    assert len([k for k in s3.objects if k.startswith("uploads/variants/")]) == 6
+
+    pub_id = r.json()["id"]
+    client.request("DELETE", f"/api/publications/{pub_id}", json={}, headers=admin_headers)
+    assert client.delete(f"/api/publications/{pub_id}/purge", headers=admin_headers).status_code == 200
+    assert s3.objects == {}
+
+
+def test_presigned_direct_upload_flow(
+    client: TestClient, admin_headers: dict, db_session: Session, s3: FakeS3Client
+):
+    content = b"direct-upload-bytes"
+    sha = hashlib.sha256(content).hexdigest()
+    r = client.post(
+        "/api/publications/photos/presign",
+        json={"content_type": "image/jpeg", "sha256": sha, "size": len(content)},
+        headers=admin_headers,
+    )
+    assert r.status_code == 200, r.text
+    presigned = r.json()
+    assert presigned["method"] == "PUT"
+    assert "x-amz-checksum-sha256" in presigned["headers"]
+    assert presigned["file_url"].endswith(f"/uploads/publications/{sha}.jpg")
+
+    # sin subir el archivo todavía, la publicación se rechaza
+    data = {**_form("Directa"), "photo_urls": presigned["file_url"]}
+    assert client.post("/api/publications", data=data, headers=admin_headers).status_code == 400
+
+    s3.objects[f"uploads/publications/{sha}.jpg"] = (content, {})
+    r = client.post("/api/publications", data=data, headers=admin_headers)
+    assert r.status_code == 201, r.text
+    assert r.json()["photos"] == [presigned["file_url"]]
+    assert db_session.get(models.UploadBlob, presigned["file_url"]).ref_count == 1
+
+    bad = {**_form("Trucha"), "photo_urls": "http://minio.test:9000/fotos/uploads/otra/cosa.jpg"}
+    assert client.post("/api/publications", data=bad, headers=admin_headers).status_code == 400
+
+
+def test_direct_upload_with_gps_is_replaced_by_clean_copy(
+    client: TestClient, admin_headers: dict, db_session: Session, s3: FakeS3Client
+):
+    from PIL import ExifTags, Image
+
+    exif = Image.Exif()
+    exif.get_ifd(ExifTags.IFD.GPSInfo)[ExifTags.GPS.GPSLatitude] = (51.0, 30.0, 0.0)
+    buf = io.BytesIO()
+    Image.new("RGB", (40, 30), (200, 30, 30)).save(buf, "JPEG", exif=exif)
+    content = buf.getvalue()
+    sha = hashlib.sha256(content).hexdigest()
+    raw_key = f"uploads/publications/{sha}.jpg"
+    s3.objects[raw_key] = (content, {})
+
+    data = {**_form("Con GPS"), "photo_urls": storage.backend.url(raw_key)}
+    r = client.post("/api/publications", data=data, headers=admin_headers)
+    assert r.status_code == 201, r.text
+
+    url = r.json()["photos"][0]
+    key = storage.backend.key_from_url(url)
+    assert key != raw_key and raw_key not in s3.objects
+    stored, extra = s3.objects[key]
+    assert extra["ContentType"] == "image/jpeg"
+    assert key == f"uploads/publications/{hashlib.sha256(stored).hexdigest()}.jpg"
+    with Image.open(io.BytesIO(stored)) as img:
+        assert not img.getexif().get_ifd(ExifTags.IFD.GPSInfo)
+    assert db_session.get(models.UploadBlob, url).ref_count == 1
+    assert db_session.get(models.UploadBlob, storage.backend.url(raw_key)) is None
+
+
+def test_presign_not_available_on_local_storage(client: TestClient, admin_headers: dict):
+    r = client.post(
+        "/api/publications/photos/presign",
+        json={"content_type": "image/png", "sha256": "a" * 64, "size": 10},
+        headers=admin_headers,
+    )
+    assert r.status_code == 501
+
+
+@pytest.mark.skipif(
+    not os.getenv("S3_TEST_ENDPOINT_URL"),
+    reason="definir S3_TEST_ENDPOINT_URL/S3_TEST_BUCKET para probar contra MinIO",
+)
+def test_s3_storage_against_minio():
+    pytest.importorskip("boto3")
+    store = storage.S3Storage(
+        os.getenv("S3_TEST_BUCKET", "plango-test"),
+        endpoint_url=os.environ["S3_TEST_ENDPOINT_URL"],
+        region=os.getenv("S3_REGION", "us-east-1"),
+    )
+    key = "uploads/tests/roundtrip.txt"
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(b"hola")
+    try:
+        store.put_file(f.name, key, "text/plain")
+        assert store.exists(key) and store.size(key) == 4
+        with store.local_copy(key) as path, open(path, "rb") as copy:
+            assert copy.read() == b"hola"
+    finally:
+        store.delete(key)
+        os.remove(f.name)
+    assert not store.exists(key)
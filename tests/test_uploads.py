@@ -0,0 +1,253 @@
+import hashlib
+import io
+import os
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend.app import models
+from backend.app.utils import storage, uploads
+
+
+def _path(url: str) -> str:
+    return storage.backend.path(storage.backend.key_from_url(url))
+
+
+def _publication_form(name: str) -> dict:
+    return {
+        "place_name": name,
+        "country": "Argentina",
+        "province": "Córdoba",
+        "city": "Villa General Belgrano",
+        "address": "Av. Roca 100",
+        "description": "Pueblo alpino",
+    }
+
+
+def _photo(content: bytes = b"same-photo-bytes") -> tuple:
+    return ("photos", ("foto.jpg", io.BytesIO(content), "image/jpeg"))
+
+
+def test_identical_uploads_share_one_blob(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    first = client.post(
+        "/api/publications",
+        data=_publication_form("Uno"),
+        files=[_photo(), _photo()],
+        headers=admin_headers,
+    )
+    second = client.post(
+        "/api/publications",
+        data=_publication_form("Dos"),
+        files=[_photo()],
+        headers=admin_headers,
+    )
+    assert first.status_code == 201 and second.status_code == 201
+
+    urls = first.json()["photos"] + second.json()["photos"]
+    assert len(set(urls)) == 1
+    assert os.path.basename(urls[0]) == hashlib.sha256(b"same-photo-bytes").hexdigest() + ".jpg"
+    blob = db_session.get(models.UploadBlob, urls[0])
+    assert blob.ref_count == 3
+    assert blob.size == len(b"same-photo-bytes")
+    path = _path(urls[0])
+    assert os.path.exists(path)
+
+    # purgar la primera publicación libera dos referencias, el archivo sigue
+    client.request(
+        "DELETE", f"/api/publications/{first.json()['id']}", json={}, headers=admin_headers
+    )
+    r = client.delete(
+        f"/api/publications/{first.json()['id']}/purge", headers=admin_headers
+    )
+    assert r.status_code == 200, r.text
+    db_session.expire_all()
+    assert db_session.get(models.UploadBlob, urls[0]).ref_count == 1
+    assert os.path.exists(path)
+
+    # al purgar la última, se borra el archivo
+    client.request(
+        "DELETE", f"/api/publications/{second.json()['id']}", json={}, headers=admin_headers
+    )
+    client.delete(f"/api/publications/{second.json()['id']}/purge", headers=admin_headers)
+    db_session.expire_all()
+    assert db_session.get(models.UploadBlob, urls[0]) is None
+    assert not os.path.exists(path)
+
+
+def test_purge_deletes_reviews_and_their_dependents(
+    client: TestClient, admin_headers: dict, admin_user, test_user, db_session: Session
+):
+    created = client.post(
+        "/api/publications",
+        data=_publication_form("Con reseñas"),
+        files=[_photo(b"reviewed-photo")],
+        headers=admin_headers,
+    )
+    pub_id = created.json()["id"]
+    review = models.Review(
+        publication_id=pub_id, author_id=test_user.id, rating=5, comment="Muy lindo"
+    )
+    db_session.add(review)
+    db_session.flush()
+    db_session.add(models.ReviewLike(review_id=review.id, user_id=admin_user.id))
+    db_session.add(
+        models.ReviewReport(review_id=review.id, reporter_id=admin_user.id, reason="spam")
+    )
+    db_session.add(models.Favorite(user_id=test_user.id, publication_id=pub_id))
+    db_session.commit()
+
+    client.request("DELETE", f"/api/publications/{pub_id}", json={}, headers=admin_headers)
+    r = client.delete(f"/api/publications/{pub_id}/purge", headers=admin_headers)
+
+    assert r.status_code == 200, r.text
+    db_session.expire_all()
+    assert db_session.get(models.Publication, pub_id) is None
+    assert db_session.query(models.Review).count() == 0
+    assert db_session.query(models.ReviewLike).count() == 0
+    assert db_session.query(models.ReviewReport).count() == 0
+    assert db_session.query(models.Favorite).count() == 0
+    assert not os.path.exists(_path(created.json()["photos"][0]))
+
+
+def test_purge_requires_soft_delete_first(
+    client: TestClient, admin_headers: dict
+):
+    created = client.post(
+        "/api/publications",
+        data=_publication_form("Tres"),
+        files=[_photo(b"other-bytes")],
+        headers=admin_headers,
+    )
+    r = client.delete(
+        f"/api/publications/{created.json()['id']}/purge", headers=admin_headers
+    )
+    assert r.status_code == 400
+    os.remove(_path(created.json()["photos"][0]))
+
+
+def test_upload_over_limit_is_rejected_while_streaming(
+    client: TestClient, admin_headers: dict, db_session: Session, monkeypatch
+):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 64)
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 16)
+    target_dir = storage.backend.path("uploads/publications")
+    before = set(os.listdir(target_dir))
+
+    r = client.post(
+        "/api/publications",
+        data=_publication_form("Grande"),
+        files=[_photo(b"x" * 200)],
+        headers=admin_headers,
+    )
+
+    assert r.status_code == 413
+    assert set(os.listdir(target_dir)) == before
+    assert db_session.query(models.UploadBlob).count() == 0
+
+
+def test_profile_photo_replacement_releases_previous_blob(
+    client: TestClient, auth_headers: dict, db_session: Session
+):
+    def upload(content: bytes) -> str:
+        file = ("me.jpg", io.BytesIO(content), "image/jpeg")
+        r = client.put("/api/users/me/photo", headers=auth_headers, files={"file": file})
+        assert r.status_code == 200
+        return r.json()["profile_picture_url"]
+
+    old = upload(b"old-profile")
+    assert upload(b"old-profile") == old
+    assert db_session.get(models.UploadBlob, old).ref_count == 1
+
+    new = upload(b"new-profile")
+    db_session.expire_all()
+    assert db_session.get(models.UploadBlob, old) is None
+    assert not os.path.exists(_path(old))
+    assert db_session.get(models.UploadBlob, new).ref_count == 1
+
+
+def test_size_limit_middleware_rejects_before_reading_body():
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/", endpoint, methods=["POST"])])
+    app.add_middleware(uploads.UploadSizeLimitMiddleware, max_body_bytes=300)
+    client = TestClient(app)
+
+    files = {"file": ("a.bin", b"x" * 1000, "application/octet-stream")}
+    assert client.post("/", files=files).status_code == 413
+    assert client.post("/", files={"file": ("a.bin", b"x", "text/plain")}).status_code == 200
+
+
+def test_failed_request_removes_files_it_uploaded(
+    client: TestClient, admin_headers: dict, db_session: Session, monkeypatch
+):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 64)
+    target_dir = storage.backend.path("uploads/publications")
+    before = set(os.listdir(target_dir))
+
+    r = client.post(
+        "/api/publications",
+        data=_publication_form("Dos fotos"),
+        files=[_photo(b"small-enough"), _photo(b"x" * 200)],
+        headers=admin_headers,
+    )
+
+    assert r.status_code == 413
+    assert set(os.listdir(target_dir)) == before
+    assert db_session.query(models.UploadBlob).count() == 0
+
+
+def test_delete_orphans_keeps_blob_referenced_again(
+    client: TestClient, admin_headers: dict, db_session: Session
+):
+    created = client.post(
+        "/api/publications",
+        data=_publication_form("Carrera"),
+        files=[_photo(b"raced-photo")],
+        headers=admin_headers,
+    )
+    url = created.json()["photos"][0]
+
+    orphaned = uploads.release(db_session, [url])
+    db_session.commit()
+    assert orphaned == [url]
+    # otro pedido sube el mismo contenido antes de que se borre el archivo
+    uploads._acquire(db_session, url, "x", 0)
+    db_session.commit()
+
+    uploads.delete_orphans(db_session, orphaned)
+
+    assert db_session.get(models.UploadBlob, url).ref_count == 1
+    assert os.path.exists(_path(url))
+    os.remove(_path(url))
+
+
+def test_blob_reference_is_undone_by_the_callers_rollback(db_session: Session):
+    url = storage.backend.url("uploads/publications/" + "b" * 64 + ".jpg")
+    db_session.add(models.UploadBlob(url=url, sha256="b" * 64, size=3, ref_count=1))
+    db_session.commit()
+
+    uploads._acquire(db_session, url, "b" * 64, 3)
+    new_url = storage.backend.url("uploads/publications/" + "c" * 64 + ".jpg")
+    uploads._acquire(db_session, new_url, "c" * 64, 3)
+    db_session.rollback()
+
+    assert db_session.get(models.UploadBlob, url).ref_count == 1
+    assert db_session.get(models.UploadBlob, new_url) is None
+
+
+def test_delete_orphans_locks_missing_blob_row(db_session: Session):
+    url = storage.backend.url("uploads/publications/" + "d" * 64 + ".jpg")
+    assert uploads._lock_unreferenced(db_session, url)
+    db_session.rollback()
+    db_session.add(models.UploadBlob(url=url, sha256="d" * 64, size=3, ref_count=2))
+    db_session.commit()
+    assert not uploads._lock_unreferenced(db_session, url)
+    db_session.rollback()
+    assert db_session.get(models.UploadBlob, url).ref_count == 2
@@ -20,6 +20,28 @@ def test_upload_profile_photo_success(client: TestClient, auth_headers: dict):
     assert data["profile_picture_url"].endswith(".jpg")
 
 
+def test_upload_profile_photo_generates_variants(
+    client: TestClient, auth_headers: dict, db_session: Session, test_user
+):
+    """La foto de perfil se procesa en segundo plano y guarda sus variantes."""
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (500, 400), (10, 120, 200)).save(buf, "JPEG")
+    file = ("me.jpg", io.BytesIO(buf.getvalue()), "image/jpeg")
+
+    response = client.put("/api/users/me/photo", headers=auth_headers, files={"file": file})
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    user = db_session.get(models.User, test_user.id)
+    assert user.profile_picture_variants["thumb"]["webp"].endswith("_thumb.webp")
+    assert user.profile_picture_variants["card"]["jpeg"].endswith("_card.jpg")
+
+    me = client.get("/api/auth/me", headers=auth_headers).json()
+    assert me["profile_picture_variants"] == user.profile_picture_variants
+
+
 def test_upload_invalid_file_type(client: TestClient, auth_headers: dict):
     """Prueba que se rechace un tipo de archivo no válido."""
     fake_text_bytes = b"this is not an image"